@@ -1,23 +1,47 @@
 from kfp.dsl import Input, Output, Dataset, Model, Metrics, component
 
-@component(base_image="python:3.11", packages_to_install=["pandas==2.2.2","scikit-learn==1.5.2","joblib==1.4.2"])
+@component(base_image="python:3.11", packages_to_install=["pandas==2.3.1","scikit-learn==1.7.1","joblib==1.4.2","git+https://github.com/jcorreia11/NEURONET-Project.git"])
 def evaluate_model(
     input_x_test: Input[Dataset],
     input_y_test: Input[Dataset],
+    input_meta_test: Input[Dataset],
     input_model: Input[Model],
     evaluation_metrics: Output[Metrics],
+    output_entity_metrics: Output[Dataset],
+    output_time_metrics: Output[Dataset],
+    streaming: bool = False,
+    chunk_size: int = 100000,
+    time_bucket: str = "1h",
 ):
     import pandas as pd
     import joblib
     from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-    X_test = pd.read_csv(input_x_test.path)
-    y_test = pd.read_csv(input_y_test.path).squeeze("columns")
-    model = joblib.load(input_model.path)
 
-    y_pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    if streaming:
+        # Chunked evaluation with incremental metrics, per namespace and per time bucket
+        from neuronet.models.evaluation import StreamingEvaluator
+
+        model = joblib.load(input_model.path)
+        evaluator = StreamingEvaluator(model.predict, chunk_size=chunk_size, entity_cols=["namespace"],
+                                       time_bucket=time_bucket)
+        metrics = evaluator.evaluate(input_x_test.path, input_y_test.path, input_meta_test.path)
+        mae, mse, r2 = metrics["mae"], metrics["mse"], metrics["r2"]
+        evaluator.per_entity.result().to_csv(output_entity_metrics.path, index=False)
+        evaluator.per_time.result().to_csv(output_time_metrics.path, index=False)
+    else:
+        X_test = pd.read_csv(input_x_test.path)
+        y_test = pd.read_csv(input_y_test.path).squeeze("columns")
+        model = joblib.load(input_model.path)
+
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+        # No breakdowns without streaming, keep the outputs readable with their real columns
+        from neuronet.models.evaluation import GroupedRegressionMetrics
+
+        GroupedRegressionMetrics(["namespace"]).result().to_csv(output_entity_metrics.path, index=False)
+        GroupedRegressionMetrics(["time_bucket"]).result().to_csv(output_time_metrics.path, index=False)
 
     # Log metrics so they appear in KFP UI
     evaluation_metrics.log_metric("mae", float(mae))
@@ -0,0 +1,26 @@
+from kfp.dsl import Input, Output, Dataset, Model, component
+
+@component(base_image="python:3.11", packages_to_install=["pandas==2.3.1","scikit-learn==1.7.1","joblib==1.4.2","git+https://github.com/jcorreia11/NEURONET-Project.git"])
+def export_model(
+    input_x_test: Input[Dataset],
+    input_model: Input[Model],
+    output_forest: Output[Model],
+):
+    import pandas as pd
+    import numpy as np
+    import joblib
+    import os
+    from neuronet.models.forest import export_forest, NumpyForest
+
+    model = joblib.load(input_model.path)
+    os.makedirs(os.path.dirname(output_forest.path), exist_ok=True)
+    arrays = export_forest(model, output_forest.path)
+
+    # The numpy predictor must reproduce the RandomForest exactly
+    X_test = pd.read_csv(input_x_test.path)
+    if not np.array_equal(model.predict(X_test), NumpyForest(output_forest.path).predict(X_test)):
+        raise ValueError("Exported forest predictions differ from model.predict")
+
+    output_forest.metadata["n_trees"] = len(arrays["roots"])
+    output_forest.metadata["n_nodes"] = len(arrays["value"])
+    print(f"Forest with {len(arrays['roots'])} trees exported to {output_forest.path}, verified on {len(X_test)} rows")
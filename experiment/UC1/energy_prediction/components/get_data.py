@@ -14,24 +14,23 @@ from kfp.dsl import Output, Dataset, component
 )
 def get_data(token: str, start: str, stop: str,
              output_kepler_dir: Output[Dataset],
-             output_k8s_dir: Output[Dataset]):
+             output_k8s_dir: Output[Dataset],
+             cache_dir: str = "",
+             influx_url: str = "",
+             data_source: str = ""):
     def run_query_and_save(token, start, stop, plugin, output_dir):
         import os
         import glob
         import shutil
-        import subprocess
+        import tempfile
+        from neuronet.influxdb.influxdb_query import query_plugins
 
-        tmp_dir = f"/tmp/{plugin}_raw"
-        os.makedirs(tmp_dir, exist_ok=True)
+        # Fresh directory per fetch, so CSVs of earlier runs in the same container are never copied again
+        tmp_dir = tempfile.mkdtemp(prefix=f"{plugin}_raw_")
 
-        # Run influx query, saving all CSVs in tmp_dir
-        subprocess.run([
-            "query-influxdb",
-            "--token", token,
-            "--range", f"start: {start}, stop: {stop}",
-            "--plugin", plugin,
-            "--output-dir", tmp_dir
-        ], check=True)
+        # Run the influx query in-process (same logic as the query-influxdb CLI), saving all CSVs in tmp_dir
+        query_plugins(plugin, token=token, range=f"start: {start}, stop: {stop}", output_dir=tmp_dir,
+                      **({"url": influx_url} if influx_url else {}))
 
         # Copy all CSVs to the Kubeflow artifact directory
         os.makedirs(output_dir.path, exist_ok=True)
@@ -39,7 +38,24 @@ def get_data(token: str, start: str, stop: str,
             shutil.copy(csv_file, output_dir.path)
             print(f"{plugin} CSV copied: {csv_file} -> {output_dir.path}")
 
-    run_query_and_save(token, start, stop, "kepler", output_kepler_dir)
-    run_query_and_save(token, start, stop, "k8s", output_k8s_dir)
+    from concurrent.futures import ThreadPoolExecutor
+    from neuronet.pipelines.cache import ArtifactCache
+
+    # Reuse raw CSVs fetched before for the same window; relative ranges ("-1h", "now()") are never cached
+    cache = ArtifactCache.from_env(cache_dir)
+    fixed_window = not any(t.strip().startswith(("-", "now")) for t in (start, stop))
+
+    def fetch(plugin, output_dir):
+        if cache is None or not fixed_window:
+            run_query_and_save(token, start, stop, plugin, output_dir)
+            return
+        # Key on what is queried, not where: a stand-in gets a new port per run but serves the same data_source
+        cache.run(f"get_data/{plugin}", lambda: run_query_and_save(token, start, stop, plugin, output_dir),
+                  outputs={"dir": output_dir.path},
+                  params={"plugin": plugin, "start": start, "stop": stop, "source": data_source or influx_url})
+
+    # The two plugin queries are independent, run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(fetch, ["kepler", "k8s"], [output_kepler_dir, output_k8s_dir]))
 
     print("✅ Data fetching done. CSVs saved in plugin directories.")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from kfp.dsl import Output, Input, Dataset, component
+from kfp.dsl import Output, Input, Dataset, Metrics, component
 from typing import List
 
 @component(base_image="python:3.11",
@@ -17,12 +17,36 @@ def preprocess_data(
     output_x_test: Output[Dataset],
     output_y_train: Output[Dataset],
     output_y_test: Output[Dataset],
+    output_meta_test: Output[Dataset],
+    output_quality_report: Output[Dataset],
+    quality_metrics: Output[Metrics],
+    cache_dir: str = "",
 ):
     import pandas as pd
     import os
     from sklearn.model_selection import train_test_split
     from neuronet.datasets.energy_dataset import EnergyDatasetBuilder
 
+    import time
+    from neuronet.pipelines.cache import ArtifactCache
+    from neuronet.preprocessing.quality import DataQualityReport
+
+    # Reuse the splits of an earlier run on the same raw data with the same parameters
+    cache = ArtifactCache.from_env(cache_dir)
+    outputs = {"x_train": output_x_train.path, "x_test": output_x_test.path, "y_train": output_y_train.path,
+               "y_test": output_y_test.path, "meta_test": output_meta_test.path,
+               "quality_report": output_quality_report.path}
+    if cache is not None:
+        started = time.perf_counter()
+        cache_key = cache.key("preprocess_data/energy",
+                              params={"features": features, "target": target, "test_size": test_size,
+                                      "random_state": random_state},
+                              inputs={"kepler": input_kepler_dir.path, "k8s": input_k8s_dir.path},
+                              ignore=["processed"])  # the processors write their output next to the raw CSVs
+        if cache.restore("preprocess_data/energy", cache_key, outputs):
+            DataQualityReport.load(output_quality_report.path).log_to(quality_metrics)
+            return
+
     # Import your preprocessors
     from neuronet.preprocessing.kepler import KeplerPreprocessor
     from neuronet.preprocessing.k8s import K8SProcessor
@@ -30,20 +54,30 @@ def preprocess_data(
     kepler_path = input_kepler_dir.path
     k8s_path = input_k8s_dir.path
 
-    # Step 1: Preprocess Kepler data
-    kepler_processor = KeplerPreprocessor(kepler_path)
-    kepler_processor.run(output_csv="kepler_processed.csv")
+    # Steps 1-2: Preprocess Kepler and K8S data, the two processors are independent and run in parallel processes
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        kepler_run = executor.submit(KeplerPreprocessor(kepler_path).run, output_csv="kepler_processed.csv")
+        k8s_run = executor.submit(K8SProcessor(k8s_path).run, output_csv="k8s_processed.csv")
+        kepler_run.result()
+        k8s_run.result()
+
     kepler_processed_path = os.path.join(kepler_path, 'processed', 'kepler_processed.csv')
     kepler_df = pd.read_csv(kepler_processed_path)
     print(f"Kepler processed shape: {kepler_df.shape}")
 
-    # Step 2: Preprocess K8S data
-    k8s_processor = K8SProcessor(k8s_path)
-    k8s_processor.run(output_csv="k8s_processed.csv")
     k8s_processed_path = os.path.join(k8s_path, 'processed', 'k8s_processed.csv')
     k8s_df = pd.read_csv(k8s_processed_path)
     print(f"K8S processed shape: {k8s_df.shape}")
 
+    # Data-quality report of the processed frames: coverage, gaps, duplicates, NaN runs, stuck counters, ranges
+    quality = DataQualityReport()
+    quality.add("k8s", k8s_df)
+    quality.add("kepler", kepler_df)
+    quality.save(output_quality_report.path)
+    quality.log_to(quality_metrics)
+    print(f"Data quality: {quality.metrics}")
+
     # Step 3: Combine datasets using EnergyDatasetBuilder
     builder = EnergyDatasetBuilder(k8s_df, kepler_df, interval='1min')
     energy_dataset = builder.build()
@@ -63,5 +97,10 @@ def preprocess_data(
     X_test.to_csv(output_x_test.path, index=False)
     y_train.to_csv(output_y_train.path, index=False)
     y_test.to_csv(output_y_test.path, index=False)
+    # Entity and time of every test row, for the per-entity / per-time-bucket evaluation
+    energy_dataset.loc[X_test.index, ['_time', 'namespace', 'pod_name', 'container_name']].to_csv(output_meta_test.path, index=False)
+
+    if cache is not None:
+        cache.save("preprocess_data/energy", cache_key, outputs, time.perf_counter() - started)
 
     print("✅ Preprocessing done. Artifacts saved.")
@@ -1,12 +1,15 @@
 from kfp.dsl import Input, Output, Dataset, Model, component
 
-@component(base_image="python:3.11", packages_to_install=["pandas==2.2.2","scikit-learn==1.5.2","joblib==1.4.2"])
+@component(base_image="python:3.11", packages_to_install=["git+https://github.com/jcorreia11/NEURONET-Project.git",
+                                                          "pandas==2.3.1","scikit-learn==1.7.1","joblib==1.4.2"])
 def train_model(
     input_x_train: Input[Dataset],
     input_y_train: Input[Dataset],
     n_estimators: int,
     random_state: int,
     output_model: Output[Model],
+    previous_model: str = "",
+    max_estimators: int = 0,
 ):
     import pandas as pd
     from sklearn.ensemble import RandomForestRegressor
@@ -15,8 +18,15 @@ def train_model(
     X_train = pd.read_csv(input_x_train.path)
     y_train = pd.read_csv(input_y_train.path).squeeze("columns")
 
-    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
-    model.fit(X_train, y_train)
+    if previous_model and os.path.exists(previous_model):
+        # Incremental update: add n_estimators trees fitted on this window only, evict the oldest beyond max_estimators
+        from neuronet.models.incremental import grow_forest
+
+        model = grow_forest(joblib.load(previous_model), X_train, y_train, n_estimators, max_estimators)
+        print(f"Added {n_estimators} trees on {len(X_train)} new rows, forest has {len(model.estimators_)} trees")
+    else:
+        model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
+        model.fit(X_train, y_train)
 
     os.makedirs(os.path.dirname(output_model.path), exist_ok=True)
     joblib.dump(model, output_model.path)
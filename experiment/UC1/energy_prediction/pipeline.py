@@ -6,6 +6,7 @@ from components.get_data import get_data
 from components.preprocessing import preprocess_data
 from components.training import train_model
 from components.evaluate import evaluate_model
+from components.export import export_model
 
 @dsl.pipeline(
     name="Energy Usage Regression (InfluxDB)",
@@ -20,12 +21,18 @@ def energy_pipeline(
     test_size: float = 0.2,
     random_state: int = 42,
     n_estimators: int = 100,
+    streaming_eval: bool = False,
+    eval_chunk_size: int = 100000,
+    cache_dir: str = "",
+    previous_model: str = "",
+    max_estimators: int = 0,
 ):
     # 1. Get raw data from InfluxDB (two datasets: kepler and k8s)
     data = get_data(
         token=token,
         start=start,
-        stop=stop
+        stop=stop,
+        cache_dir=cache_dir,
     )
 
     # 2. Preprocess and merge datasets using EnergyDatasetBuilder
@@ -36,6 +43,7 @@ def energy_pipeline(
         target=target,
         test_size=test_size,
         random_state=random_state,
+        cache_dir=cache_dir,
     )
 
     # 3. Train model using processed training data
@@ -43,6 +51,8 @@ def energy_pipeline(
         input_x_train=pre.outputs["output_x_train"],
         input_y_train=pre.outputs["output_y_train"],
         n_estimators=n_estimators,
+        previous_model=previous_model,
+        max_estimators=max_estimators,
         random_state=random_state,
     )
 
@@ -50,6 +60,15 @@ def energy_pipeline(
     evaluate = evaluate_model(
         input_x_test=pre.outputs["output_x_test"],
         input_y_test=pre.outputs["output_y_test"],
+        input_meta_test=pre.outputs["output_meta_test"],
+        input_model=train.outputs["output_model"],
+        streaming=streaming_eval,
+        chunk_size=eval_chunk_size,
+    )
+
+    # 5. Export the forest to numpy node arrays for the dependency-light predictor
+    export = export_model(
+        input_x_test=pre.outputs["output_x_test"],
         input_model=train.outputs["output_model"],
     )
 
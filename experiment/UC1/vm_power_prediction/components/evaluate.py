@@ -1,63 +1,88 @@
 from kfp.dsl import Input, Output, Dataset, Model, Metrics, component
 
 @component(base_image="python:3.11",
-           packages_to_install=["pandas==2.2.2",
+           packages_to_install=["pandas==2.3.1",
                                 "torch==2.2.0",
-                                "scikit-learn==1.5.2",
+                                "scikit-learn==1.7.1",
                                 "joblib==1.4.2",
-                                "numpy<2"])
+                                "numpy<2",
+                                "git+https://github.com/jcorreia11/NEURONET-Project.git"])
 def evaluate_model(
     input_x_test: Input[Dataset],
     input_y_test: Input[Dataset],
+    input_meta_test: Input[Dataset],
     input_model: Input[Model],
     evaluation_metrics: Output[Metrics],
+    output_entity_metrics: Output[Dataset],
+    output_time_metrics: Output[Dataset],
+    streaming: bool = False,
+    chunk_size: int = 100000,
+    time_bucket: str = "1h",
 ):
     import pandas as pd
     import torch
     import torch.nn as nn
     from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-    # --- Load test data ---
-    X_test = pd.read_csv(input_x_test.path)
-    y_test = pd.read_csv(input_y_test.path).squeeze("columns")
+    if streaming:
+        # Chunked evaluation with incremental metrics, per vm_id and per time bucket
+        from neuronet.models.evaluation import StreamingEvaluator
+        from neuronet.serving.predictors import MLPPredictor
 
-    # --- Load model, scaler, input dimension ---
-    checkpoint = torch.load(input_model.path, map_location=torch.device("cpu"))
-    scaler = checkpoint['scaler']
-    input_dim = checkpoint['input_dim']
+        predictor = MLPPredictor(input_model.path)
+        evaluator = StreamingEvaluator(predictor.predict, chunk_size=chunk_size, entity_cols=["vm_id"],
+                                       time_bucket=time_bucket)
+        metrics = evaluator.evaluate(input_x_test.path, input_y_test.path, input_meta_test.path)
+        mae, mse, r2 = metrics["mae"], metrics["mse"], metrics["r2"]
+        evaluator.per_entity.result().to_csv(output_entity_metrics.path, index=False)
+        evaluator.per_time.result().to_csv(output_time_metrics.path, index=False)
+    else:
+        # --- Load test data ---
+        X_test = pd.read_csv(input_x_test.path)
+        y_test = pd.read_csv(input_y_test.path).squeeze("columns")
 
-    # Normalize features using the saved scaler
-    X_test = scaler.transform(X_test)
-    X_tensor = torch.tensor(X_test, dtype=torch.float32)
+        # --- Load model, scaler, input dimension ---
+        checkpoint = torch.load(input_model.path, map_location=torch.device("cpu"), weights_only=False)
+        scaler = checkpoint['scaler']
+        input_dim = checkpoint['input_dim']
 
-    # Define the same MLP structure as training
-    class MLP(nn.Module):
-        def __init__(self, input_dim):
-            super().__init__()
-            self.model = nn.Sequential(
-                nn.Linear(input_dim, 128),
-                nn.ReLU(),
-                nn.Linear(128, 64),
-                nn.ReLU(),
-                nn.Linear(64, 1)
-            )
+        # Normalize features using the saved scaler
+        X_test = scaler.transform(X_test)
+        X_tensor = torch.tensor(X_test, dtype=torch.float32)
 
-        def forward(self, x):
-            return self.model(x)
+        # Define the same MLP structure as training
+        class MLP(nn.Module):
+            def __init__(self, input_dim):
+                super().__init__()
+                self.model = nn.Sequential(
+                    nn.Linear(input_dim, 128),
+                    nn.ReLU(),
+                    nn.Linear(128, 64),
+                    nn.ReLU(),
+                    nn.Linear(64, 1)
+                )
 
-    model = MLP(input_dim)
-    model.load_state_dict(checkpoint['model_state_dict'])
-    model.eval()
+            def forward(self, x):
+                return self.model(x)
 
-    # --- Predict ---
-    with torch.no_grad():
-        y_pred_tensor = model(X_tensor)
-    y_pred = y_pred_tensor.numpy().flatten()
+        model = MLP(input_dim)
+        model.load_state_dict(checkpoint['model_state_dict'])
+        model.eval()
 
-    # --- Calculate metrics ---
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+        # --- Predict ---
+        with torch.no_grad():
+            y_pred_tensor = model(X_tensor)
+        y_pred = y_pred_tensor.numpy().flatten()
+
+        # --- Calculate metrics ---
+        mae = mean_absolute_error(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+        # No breakdowns without streaming, keep the outputs readable with their real columns
+        from neuronet.models.evaluation import GroupedRegressionMetrics
+
+        GroupedRegressionMetrics(["vm_id"]).result().to_csv(output_entity_metrics.path, index=False)
+        GroupedRegressionMetrics(["time_bucket"]).result().to_csv(output_time_metrics.path, index=False)
 
     # --- Log metrics to Kubeflow ---
     evaluation_metrics.log_metric("mae", float(mae))
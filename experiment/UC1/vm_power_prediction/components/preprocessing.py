@@ -1,4 +1,4 @@
-from kfp.dsl import Output, Input, Dataset, component
+from kfp.dsl import Output, Input, Dataset, Metrics, component
 from typing import List
 
 
@@ -18,12 +18,36 @@ def preprocess_data(
     output_x_test: Output[Dataset],
     output_y_train: Output[Dataset],
     output_y_test: Output[Dataset],
+    output_meta_test: Output[Dataset],
+    output_quality_report: Output[Dataset],
+    quality_metrics: Output[Metrics],
+    cache_dir: str = "",
 ):
     import pandas as pd
     import os
     from sklearn.model_selection import train_test_split
     from neuronet.datasets.vm_power_dataset import VmPowerDatasetBuilder
 
+    import time
+    from neuronet.pipelines.cache import ArtifactCache
+    from neuronet.preprocessing.quality import DataQualityReport
+
+    # Reuse the splits of an earlier run on the same raw data with the same parameters
+    cache = ArtifactCache.from_env(cache_dir)
+    outputs = {"x_train": output_x_train.path, "x_test": output_x_test.path, "y_train": output_y_train.path,
+               "y_test": output_y_test.path, "meta_test": output_meta_test.path,
+               "quality_report": output_quality_report.path}
+    if cache is not None:
+        started = time.perf_counter()
+        cache_key = cache.key("preprocess_data/vm_power",
+                              params={"features": features, "target": target, "test_size": test_size,
+                                      "random_state": random_state},
+                              inputs={"proxmox": input_proxmox_dir.path, "scaphandre": input_scaphandre_dir.path},
+                              ignore=["processed"])  # the processors write their output next to the raw CSVs
+        if cache.restore("preprocess_data/vm_power", cache_key, outputs):
+            DataQualityReport.load(output_quality_report.path).log_to(quality_metrics)
+            return
+
     # Import your preprocessors
     from neuronet.preprocessing.proxmox import ProxmoxDataProcessor
     from neuronet.preprocessing.scaphandre import ScaphandreProcessor
@@ -31,20 +55,30 @@ def preprocess_data(
     proxmox_path = input_proxmox_dir.path
     scaphandre_path = input_scaphandre_dir.path
 
-    # Step 1: Preprocess proxmox data
-    proxmox_processor = ProxmoxDataProcessor(proxmox_path)
-    proxmox_processor.run(output_csv="proxmox_processed.csv")
+    # Steps 1-2: Preprocess proxmox and scaphandre data, the two processors are independent and run in parallel processes
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        proxmox_run = executor.submit(ProxmoxDataProcessor(proxmox_path).run, output_csv="proxmox_processed.csv")
+        scaphandre_run = executor.submit(ScaphandreProcessor(scaphandre_path).run, output_csv="scaphandre_processed.csv")
+        proxmox_run.result()
+        scaphandre_run.result()
+
     proxmox_processed_path = os.path.join(proxmox_path, 'processed', 'proxmox_processed.csv')
     proxmox_df = pd.read_csv(proxmox_processed_path)
     print(f"Proxmox processed shape: {proxmox_df.shape}")
 
-    # Step 2: Preprocess scaphandre data
-    scaphandre_processor = ScaphandreProcessor(scaphandre_path)
-    scaphandre_processor.run(output_csv="scaphandre_processed.csv")
     scaphandre_processed_path = os.path.join(scaphandre_path, 'processed', "vm_scaphandre_processed.csv")
     scaphandre_df = pd.read_csv(scaphandre_processed_path)
     print(f"Scaphandre processed shape: {proxmox_df.shape}")
 
+    # Data-quality report of the processed frames: coverage, gaps, duplicates, NaN runs, stuck counters, ranges
+    quality = DataQualityReport()
+    quality.add("proxmox", proxmox_df)
+    quality.add("scaphandre_vm", scaphandre_df)
+    quality.save(output_quality_report.path)
+    quality.log_to(quality_metrics)
+    print(f"Data quality: {quality.metrics}")
+
     # Step 3: Combine datasets using EnergyDatasetBuilder
     builder = VmPowerDatasetBuilder(proxmox_df, scaphandre_df, interval='1min')
     print(scaphandre_df.columns.tolist())
@@ -65,5 +99,10 @@ def preprocess_data(
     X_test.to_csv(output_x_test.path, index=False)
     y_train.to_csv(output_y_train.path, index=False)
     y_test.to_csv(output_y_test.path, index=False)
+    # Entity and time of every test row, for the per-entity / per-time-bucket evaluation
+    energy_dataset.loc[X_test.index, ['_time', 'vm_id']].to_csv(output_meta_test.path, index=False)
+
+    if cache is not None:
+        cache.save("preprocess_data/vm_power", cache_key, outputs, time.perf_counter() - started)
 
     print("✅ Preprocessing done. Artifacts saved.")
@@ -1,9 +1,10 @@
 from kfp.dsl import Input, Output, Dataset, Model, component
 
 @component(base_image="python:3.11",
-           packages_to_install=["pandas==2.2.2",
+           packages_to_install=["git+https://github.com/jcorreia11/NEURONET-Project.git",
+                                "pandas==2.3.1",
                                 "torch==2.2.0",
-                                "scikit-learn==1.5.2",
+                                "scikit-learn==1.7.1",
                                 "joblib==1.4.2"])
 def train_model(
     input_x_train: Input[Dataset],
@@ -11,6 +12,14 @@ def train_model(
     epochs: int,
     lr: float,
     output_model: Output[Model],
+    batch_size: int = 32,
+    in_memory: bool = False,
+    num_threads: int = 0,
+    val_fraction: float = 0.1,
+    patience: int = 5,
+    previous_model: str = "",
+    replay_size: int = 10000,
+    replay_ratio: float = 1.0,
 ):
     import os
     import pandas as pd
@@ -24,17 +33,64 @@ def train_model(
     X_train = pd.read_csv(input_x_train.path)
     y_train = pd.read_csv(input_y_train.path).squeeze("columns")
 
+    # --- Replay buffer: a fixed-size sample of the training rows, saved with the checkpoint ---
+    from neuronet.models.incremental import ReplayBuffer, fine_tune_mlp
+
+    if previous_model and os.path.exists(previous_model):
+        # --- Incremental update: fine-tune the previous checkpoint on this window plus replayed old rows ---
+        from neuronet.models.mlp import MLP
+
+        checkpoint = torch.load(previous_model, map_location=torch.device("cpu"), weights_only=False)
+        model = MLP(checkpoint['input_dim'])
+        model.load_state_dict(checkpoint['model_state_dict'])
+        replay = ReplayBuffer.from_checkpoint(checkpoint, replay_size)
+        model, history = fine_tune_mlp(model, checkpoint['scaler'], replay, X_train, y_train.values, epochs=epochs,
+                                       lr=lr, replay_ratio=replay_ratio, batch_size=batch_size,
+                                       num_threads=num_threads or None, val_fraction=val_fraction, patience=patience)
+
+        os.makedirs(os.path.dirname(output_model.path), exist_ok=True)
+        torch.save({
+            'model_state_dict': model.state_dict(),
+            'scaler': checkpoint['scaler'],
+            'input_dim': checkpoint['input_dim'],
+            **replay.state_dict()
+        }, output_model.path)
+
+        print(f"Model saved to {output_model.path}")
+        return
+
+    replay = ReplayBuffer(replay_size)
+    replay.add(X_train.values, y_train.values)
+
     # --- Normalize features ---
     scaler = StandardScaler()
     X_train = scaler.fit_transform(X_train)
 
+    if in_memory:
+        # --- In-memory loop: index-permutation shuffling, large batches, early stopping on a held-out split ---
+        from neuronet.models.training import fit_mlp
+
+        model, history = fit_mlp(X_train, y_train.values, epochs=epochs, lr=lr, batch_size=batch_size,
+                                 num_threads=num_threads or None, val_fraction=val_fraction, patience=patience)
+
+        os.makedirs(os.path.dirname(output_model.path), exist_ok=True)
+        torch.save({
+            'model_state_dict': model.state_dict(),
+            'scaler': scaler,
+            'input_dim': X_train.shape[1],
+            **replay.state_dict()
+        }, output_model.path)
+
+        print(f"Model saved to {output_model.path}")
+        return
+
     # --- Convert to tensors ---
     X_tensor = torch.tensor(X_train, dtype=torch.float32)
     y_tensor = torch.tensor(y_train.values, dtype=torch.float32).view(-1, 1)
 
     # --- Create dataset and loader ---
     dataset = TensorDataset(X_tensor, y_tensor)
-    loader = DataLoader(dataset, batch_size=32, shuffle=True)
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
 
     # --- Define a simple MLP ---
     class MLP(nn.Module):
@@ -74,7 +130,8 @@ def train_model(
     torch.save({
         'model_state_dict': model.state_dict(),
         'scaler': scaler,
-        'input_dim': X_tensor.shape[1]
+        'input_dim': X_tensor.shape[1],
+        **replay.state_dict()
     }, output_model.path)
 
     print(f"Model saved to {output_model.path}")
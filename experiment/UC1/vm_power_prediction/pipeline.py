@@ -26,12 +26,24 @@ def energy_pipeline(
     random_state: int = 42,
     epochs: int = 20,
     lr: float = 0.001,
+    batch_size: int = 32,
+    in_memory: bool = False,
+    num_threads: int = 0,
+    val_fraction: float = 0.1,
+    patience: int = 5,
+    streaming_eval: bool = False,
+    eval_chunk_size: int = 100000,
+    cache_dir: str = "",
+    previous_model: str = "",
+    replay_size: int = 10000,
+    replay_ratio: float = 1.0,
 ):
     # 1. Get raw data from InfluxDB (two datasets: kepler and k8s)
     data = get_data(
         token=token,
         start=start,
-        stop=stop
+        stop=stop,
+        cache_dir=cache_dir,
     )
 
     # 2. Preprocess and merge datasets using EnergyDatasetBuilder
@@ -42,6 +54,7 @@ def energy_pipeline(
         target=target,
         test_size=test_size,
         random_state=random_state,
+        cache_dir=cache_dir,
     )
 
     # 3. Train model using processed training data
@@ -50,13 +63,24 @@ def energy_pipeline(
         input_y_train=pre.outputs["output_y_train"],
         epochs=epochs,
         lr=lr,
+        batch_size=batch_size,
+        in_memory=in_memory,
+        num_threads=num_threads,
+        val_fraction=val_fraction,
+        patience=patience,
+        previous_model=previous_model,
+        replay_size=replay_size,
+        replay_ratio=replay_ratio,
     )
 
     # 4. Evaluate model on test set
     evaluate = evaluate_model(
         input_x_test=pre.outputs["output_x_test"],
         input_y_test=pre.outputs["output_y_test"],
+        input_meta_test=pre.outputs["output_meta_test"],
         input_model=train.outputs["output_model"],
+        streaming=streaming_eval,
+        chunk_size=eval_chunk_size,
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,268 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.preprocessing.counters import CounterRateCalculator
+from neuronet.preprocessing.entities import ENTITY_COLUMNS, EntityDictionary
+
+# Attribution hierarchy, finest first
+DIMENSIONS = ['node_name', 'namespace', 'pod_name', 'container_name']
+# Materialized aggregation levels and their key dimensions
+LEVELS = {
+    'container': DIMENSIONS,
+    'pod': ['node_name', 'namespace', 'pod_name'],
+    'namespace': ['namespace'],
+    'node': ['node_name'],
+    'cluster': [],
+}
+COUNTER = 'kepler_container_joules_total'
+# One Kepler counter series: the container id when exported, else its names
+SERIES_COLS = ['container_id', 'container_name', 'namespace', 'pod_name']
+
+
+def utc(value) -> pd.Timestamp:
+    value = pd.Timestamp(value)
+    return value.tz_convert('UTC') if value.tzinfo else value.tz_localize('UTC')
+
+
+class EnergyCube:
+    """Container energy from the Kepler joules counter, pre-aggregated per hierarchy level and time granularity.
+
+    Every (level, granularity) table holds the joules per bucket and level key, sorted by time. Updates only
+    re-aggregate the buckets from the oldest new sample on, and queries read the smallest table that has the
+    requested dimensions at a granularity dividing the requested one. Names are stored as EntityDictionary ids.
+    """
+
+    def __init__(self, granularities: Sequence[str] = ('1min', '1h', '1d'), max_gap: str = '5min'):
+        self.granularities = list(granularities)
+        self.steps = {g: pd.Timedelta(g).value for g in self.granularities}
+        self.max_gap = max_gap
+        self.entities = EntityDictionary()
+        self.tables: Dict[Tuple[str, str], pd.DataFrame] = {
+            (level, g): self.empty(keys) for level, keys in LEVELS.items() for g in self.granularities}
+        # Last counter sample per series, the next update continues the rates from there
+        self.counters = pd.DataFrame({'_time': pd.Series(dtype='int64'), COUNTER: pd.Series(dtype='float64'),
+                                      **{c: pd.Series(dtype='int32') for c in SERIES_COLS}})
+        # Node of every pod seen in the k8s data
+        self.pods = pd.DataFrame({c: pd.Series(dtype='int32') for c in ['namespace', 'pod_name', 'node_name']})
+
+    @staticmethod
+    def empty(keys: List[str]) -> pd.DataFrame:
+        return pd.DataFrame({'_time': pd.Series(dtype='int64'), **{k: pd.Series(dtype='int32') for k in keys},
+                             'energy_joules': pd.Series(dtype='float64')})
+
+    def encode(self, df: pd.DataFrame, columns: List[str], entities: Optional[EntityDictionary]) -> pd.DataFrame:
+        """Copy of the `columns` of `df` with the cube's ids, missing names become -1."""
+        out = df.loc[:, columns].copy()
+        names = [c for c in columns if c in SERIES_COLS or c in DIMENSIONS]
+        if entities is not None:
+            entities.decode(out, [c for c in names if c in ENTITY_COLUMNS])  # ids of the processors' dictionary
+        if 'container_id' in out:
+            out['container_id'] = out['container_id'].astype('string')  # never mistaken for encoded ids
+        self.entities.encode(out, names)
+        for col in names:
+            out[col] = out[col].fillna(-1).astype('int32')
+        if '_time' in out:
+            out['_time'] = pd.to_datetime(out['_time'], utc=True).to_numpy(dtype='datetime64[ns]').view('int64')
+        return out
+
+    def update_pods(self, k8s_df: pd.DataFrame, entities: Optional[EntityDictionary] = None):
+        pods = self.encode(k8s_df.dropna(subset=['pod_name']), ['namespace', 'pod_name', 'node_name'], entities)
+        self.pods = (pd.concat([self.pods, pods], ignore_index=True)
+                     .drop_duplicates(['namespace', 'pod_name'], keep='last').reset_index(drop=True))
+
+    def container_energy(self, kepler_df: pd.DataFrame, entities: Optional[EntityDictionary] = None) -> pd.DataFrame:
+        """Joules per new counter sample, continuing each series from the last sample of the previous update."""
+        series = [c for c in SERIES_COLS if c in kepler_df.columns]
+        samples = self.encode(kepler_df, series + ['_time', COUNTER], entities)
+        for col in SERIES_COLS:
+            if col not in samples:
+                samples[col] = np.int32(-1)
+
+        # Samples at or before the last one already counted are skipped, so overlapping windows can be re-added
+        last = samples.merge(self.counters[SERIES_COLS + ['_time']].astype({'_time': 'Int64'}),
+                             on=SERIES_COLS, how='left', suffixes=('', '_last'))['_time_last']
+        samples = samples[~(last.fillna(-1).to_numpy(dtype='int64') >= samples['_time'].to_numpy())]
+
+        combined = pd.concat([self.counters, samples[self.counters.columns]], ignore_index=True)
+        calculator = CounterRateCalculator(SERIES_COLS, max_gap=self.max_gap)
+        rates = calculator.compute(combined, [COUNTER], elapsed_col='elapsed')
+        joules = (rates[f'{COUNTER}_rate'] * rates['elapsed']).to_numpy()[len(self.counters):]
+
+        self.counters = (combined.sort_values('_time', kind='stable')
+                         .drop_duplicates(SERIES_COLS, keep='last').reset_index(drop=True))
+        energy = samples.assign(energy_joules=joules)
+        return energy[energy['energy_joules'].notna()]
+
+    def update(self, kepler_df: pd.DataFrame, k8s_df: Optional[pd.DataFrame] = None,
+               entities: Optional[EntityDictionary] = None) -> int:
+        """Add new processed Kepler (and k8s, for the pod -> node map) data, returning the samples attributed.
+
+        `entities` is the dictionary the processors encoded the inputs with, if any.
+        """
+        if k8s_df is not None:
+            self.update_pods(k8s_df, entities)
+        energy = self.container_energy(kepler_df, entities)
+        if energy.empty:
+            return 0
+        energy = energy.merge(self.pods, on=['namespace', 'pod_name'], how='left')
+        energy['node_name'] = energy['node_name'].fillna(-1).astype('int32')
+
+        for g in self.granularities:
+            step = self.steps[g]
+            facts = energy.assign(_time=energy['_time'] // step * step)
+            # Coarser levels are rolled up from the (smaller) container level partial
+            partial = facts.groupby(['_time'] + DIMENSIONS, sort=False)['energy_joules'].sum().reset_index()
+            for level, keys in LEVELS.items():
+                rolled = partial if keys == DIMENSIONS else \
+                    partial.groupby(['_time'] + keys, sort=False)['energy_joules'].sum().reset_index()
+                self.merge(level, g, rolled)
+        return len(energy)
+
+    def merge(self, level: str, granularity: str, partial: pd.DataFrame):
+        """Add `partial` into the table, re-aggregating only the buckets from its oldest one on."""
+        table = self.tables[(level, granularity)]
+        keys = ['_time'] + LEVELS[level]
+        cut = np.searchsorted(table['_time'].to_numpy(), partial['_time'].min())
+        tail = pd.concat([table.iloc[cut:], partial], ignore_index=True)
+        tail = tail.groupby(keys, sort=True)['energy_joules'].sum().reset_index()
+        self.tables[(level, granularity)] = pd.concat([table.iloc[:cut], tail], ignore_index=True)
+
+    def source(self, keys: List[str], step: int, bounds: Sequence[int] = ()) -> Tuple[str, str]:
+        """Smallest materialized table with the `keys` dimensions at a granularity dividing `step` and aligned
+        with the query `bounds` (ns), so no bucket straddles the start or stop of the range."""
+        granularities = [g for g in self.granularities if step % self.steps[g] == 0]
+        if not granularities:
+            raise ValueError(f"Granularity must be a multiple of one of {self.granularities}")
+        granularities = [g for g in granularities if all(bound % self.steps[g] == 0 for bound in bounds)]
+        if not granularities:
+            finest = min(self.granularities, key=self.steps.get)
+            raise ValueError(f"start and stop must be aligned to the finest materialized granularity ({finest})")
+        granularity = max(granularities, key=self.steps.get)
+        levels = [level for level, dims in LEVELS.items() if set(keys) <= set(dims)]
+        level = min(levels, key=lambda level: len(self.tables[(level, granularity)]))
+        return level, granularity
+
+    def query(self, by: Union[str, Sequence[str]] = 'cluster', granularity: str = '1h', start=None, stop=None,
+              **filters) -> pd.DataFrame:
+        """Energy (J) and mean power (W) per `granularity` bucket and `by` level (or list of dimensions).
+
+        Filters select dimension values, e.g. query('namespace', '1d', node_name='flux-node1') or
+        query('pod', '15min', namespace=['default', 'kepler']). Only samples in [start, stop) are counted, the
+        bounds are read from the coarsest granularity they are aligned to (and must be aligned to the finest).
+        """
+        keys = list(LEVELS[by]) if isinstance(by, str) else list(by)
+        unknown = set(keys) | set(filters)
+        unknown -= set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimensions {sorted(unknown)}, expected {DIMENSIONS}")
+        step = pd.Timedelta(granularity).value
+        start = utc(start).value if start is not None else None
+        stop = utc(stop).value if stop is not None else None
+        level, source = self.source(keys + list(filters), step, [t for t in (start, stop) if t is not None])
+        table = self.tables[(level, source)]
+
+        times = table['_time'].to_numpy()
+        lo = np.searchsorted(times, start) if start is not None else 0
+        hi = np.searchsorted(times, stop) if stop is not None else len(times)
+        table = table.iloc[lo:hi]
+
+        mask = np.ones(len(table), dtype=bool)
+        for dim, values in filters.items():
+            values = [values] if isinstance(values, str) else values
+            mask &= np.isin(table[dim].to_numpy(), [self.entities.ids.get(v, -2) for v in values])
+        table = table[mask]
+
+        if keys != LEVELS[level] or step != self.steps[source]:
+            table = table.assign(_time=table['_time'] // step * step)
+            table = table.groupby(['_time'] + keys, sort=True)['energy_joules'].sum().reset_index()
+        result = table.loc[:, ['_time'] + keys + ['energy_joules']].reset_index(drop=True)
+        self.entities.decode(result, keys)
+        result['_time'] = pd.to_datetime(result['_time'], utc=True)
+        # Mean over the whole bucket, a bucket still filling up reads low
+        result['power_watts'] = result['energy_joules'] / (step / 1e9)
+        return result
+
+    def save(self, path: str):
+        arrays = {'meta': np.array(json.dumps({'granularities': self.granularities, 'max_gap': self.max_gap})),
+                  'names': np.array(self.entities.names, dtype=str)}
+        frames = {'counters': self.counters, 'pods': self.pods,
+                  **{f'{level}@{g}': table for (level, g), table in self.tables.items()}}
+        for name, frame in frames.items():
+            for col in frame.columns:
+                arrays[f'{name}/{col}'] = frame[col].to_numpy()
+        with open(path, 'wb') as f:  # np.savez would append .npz to a bare path
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'EnergyCube':
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            cube = cls(meta['granularities'], meta['max_gap'])
+            cube.entities = EntityDictionary([str(name) for name in arrays['names']])
+            read = lambda name, frame: pd.DataFrame({col: arrays[f'{name}/{col}'] for col in frame.columns})
+            cube.counters = read('counters', cube.counters)
+            cube.pods = read('pods', cube.pods)
+            for (level, g), table in cube.tables.items():
+                cube.tables[(level, g)] = read(f'{level}@{g}', table)
+        return cube
+
+
+@click.command()
+@click.option('--cube', 'cube_path', required=True, help='Cube file, created when missing and updated in place')
+@click.option('--data-dir', default=None, help='Processed data to add (kepler_processed.csv, k8s_processed.csv and their entity dictionaries)')
+@click.option('--granularities', default='1min,1h,1d', show_default=True, help='Materialized granularities of a new cube')
+@click.option('--by', default=None, help='Query level (container, pod, namespace, node, cluster) or comma-separated dimensions')
+@click.option('--granularity', default='1h', show_default=True, help='Query bucket size, a multiple of a materialized one')
+@click.option('--start', default=None, help='Query start (inclusive), e.g. 2025-08-04T06:00:00Z')
+@click.option('--stop', default=None, help='Query stop (exclusive)')
+@click.option('--filter', 'filters', multiple=True, help='dimension=value, repeat to select several values')
+@click.option('--output', default=None, help='Write the query result to this CSV instead of printing it')
+def main(cube_path, data_dir, granularities, by, granularity, start, stop, filters, output):
+    """
+    Maintain and query the energy attribution cube.
+
+    e.g., "energy-cube --cube cube.npz --data-dir experiment_data/" after each export, then
+    "energy-cube --cube cube.npz --by namespace --granularity 1h --filter node_name=flux-node1"
+    """
+    cube = EnergyCube.load(cube_path) if os.path.exists(cube_path) else EnergyCube(granularities.split(','))
+    if data_dir:
+        if os.path.isdir(os.path.join(data_dir, 'processed')):
+            data_dir = os.path.join(data_dir, 'processed')
+        kepler_path = os.path.join(data_dir, 'kepler_processed.csv')
+        k8s_path = os.path.join(data_dir, 'k8s_processed.csv')
+        k8s_df = None
+        if os.path.exists(k8s_path):
+            k8s_df = pd.read_csv(k8s_path, usecols=['namespace', 'pod_name', 'node_name'])
+            # The k8s ids may come from another dictionary than the Kepler ones, pass names instead
+            k8s_entities = EntityDictionary.load_for(k8s_path)
+            if k8s_entities is not None:
+                k8s_entities.decode(k8s_df)
+        started = time.perf_counter()
+        added = cube.update(pd.read_csv(kepler_path), k8s_df, EntityDictionary.load_for(kepler_path))
+        cube.save(cube_path)
+        click.echo(f"✅ Added {added} Kepler samples in {time.perf_counter() - started:.2f}s, saved to {cube_path}")
+
+    if by:
+        selected: Dict[str, List[str]] = {}
+        for item in filters:
+            dim, value = item.split('=', 1)
+            selected.setdefault(dim, []).append(value)
+        started = time.perf_counter()
+        result = cube.query(by if by in LEVELS else by.split(','), granularity, start, stop, **selected)
+        elapsed = time.perf_counter() - started
+        if output:
+            result.to_csv(output, index=False)
+            click.echo(f"✅ {len(result)} rows written to {output} ({elapsed * 1000:.1f} ms)")
+        else:
+            click.echo(result.to_string(index=False))
+            click.echo(f"⏱️ {len(result)} rows in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,72 @@
+from typing import List, Optional
+
 import pandas as pd
 
+from neuronet.datasets.memory import StageMemoryReport
+from neuronet.preprocessing.counters import CounterRateCalculator
+from neuronet.preprocessing.entities import EntityDictionary
+
 class EnergyDatasetBuilder:
-    def __init__(self, k8s_df: pd.DataFrame, kepler_df: pd.DataFrame, interval: str = '1min'):
-        self.k8s_df = k8s_df.copy()
-        self.kepler_df = kepler_df.copy()
+    # Columns required from each input, anything else is dropped when joining
+    k8s_cols = [
+        '_time', 'container_name', 'namespace', 'pod_name',
+        'cpu_usage_nanocores', 'memory_usage_bytes',
+        'logsfs_used_bytes', 'logsfs_capacity_bytes'
+    ]
+    kepler_cols = ['_time', 'container_name', 'namespace', 'pod_name', 'kepler_container_joules_total']
+
+    # Stored plugins passed as k8s_df and kepler_df by TimeSeriesStore.builder
+    store_plugins = ['k8s', 'kepler']
+
+    # Every row belongs to exactly one container, used to shard the inputs for parallel builds
+    entity_keys = ['namespace', 'pod_name', 'container_name']
+
+    # Build stages, run in order by build()
+    stages = ['preprocess_time', 'aggregate_kepler', 'join_data', 'engineer_features', 'decode_entities']
+
+    def __init__(self, k8s_df: pd.DataFrame, kepler_df: pd.DataFrame, interval: str = '1min',
+                 power_from_counter: bool = False, max_gap: str = '5min', copy: bool = True,
+                 passthrough_cols: Optional[List[str]] = None, entities: Optional[EntityDictionary] = None):
+        # Extra K8S columns carried unchanged to the output
+        self.passthrough_cols = passthrough_cols or []
+        # Dictionary the processors encoded container_name & co. with, the joins then run on integer ids
+        self.entities = entities
         self.interval = interval
+        # Derive power from the real elapsed time between Kepler counter samples instead of joules / 60
+        self.power_from_counter = power_from_counter
+        self.max_gap = max_gap
+        # copy=False borrows the inputs: only the needed columns are projected up front, the inputs are
+        # never modified and the frame memory held after each stage is recorded in memory_report
+        self.copy = copy
+        self.memory_report = StageMemoryReport() if not copy else None
+        if copy:
+            self.k8s_df = k8s_df.copy()
+            self.kepler_df = kepler_df.copy()
+        else:
+            kepler_cols = list(self.kepler_cols)
+            if power_from_counter and 'container_id' in kepler_df.columns:
+                kepler_cols.insert(1, 'container_id')
+            self.k8s_df = k8s_df.loc[:, self.k8s_cols + self.passthrough_cols]
+            self.kepler_df = kepler_df.loc[:, kepler_cols]
         self.dataset = None
 
+    def record_memory(self, stage: str):
+        if self.memory_report is not None:
+            self.memory_report.record(stage, self.k8s_df, self.kepler_df, self.dataset)
+
+    def compute_kepler_power(self):
+        """Turn the cumulative kepler_container_joules_total counter into watts per container."""
+        entity_cols = ['container_id'] if 'container_id' in self.kepler_df.columns else []
+        entity_cols += ['container_name', 'namespace', 'pod_name']
+        calculator = CounterRateCalculator(entity_cols, max_gap=self.max_gap)
+        rates = calculator.compute(self.kepler_df, ['kepler_container_joules_total'])
+        self.kepler_df['container_power_watts'] = rates['kepler_container_joules_total_rate']
+
     def preprocess_time(self):
+        if self.power_from_counter:
+            self.kepler_df['_time'] = pd.to_datetime(self.kepler_df['_time'])
+            self.compute_kepler_power()
+
         # Align all times to the given interval (e.g., 1min)
         for df in [self.k8s_df, self.kepler_df]:
             df['_time'] = pd.to_datetime(df['_time'])
@@ -15,24 +74,30 @@ class EnergyDatasetBuilder:
 
     def aggregate_kepler(self):
         """Group Kepler by _time + container_name + namespace + pod_name and sum joules."""
+        agg_cols = {'kepler_container_joules_total': 'sum'}
+        if self.power_from_counter:
+            agg_cols['container_power_watts'] = 'mean'
         kepler_grouped = (
             self.kepler_df
             .groupby(['_time', 'container_name', 'namespace', 'pod_name'], as_index=False)
-            .agg({'kepler_container_joules_total': 'sum'})
+            .agg(agg_cols)
         )
         self.kepler_df = kepler_grouped
 
     def join_data(self):
         # Filter only required columns to reduce memory
-        k8s_cols = [
-            '_time', 'container_name', 'namespace', 'pod_name',
-            'cpu_usage_nanocores', 'memory_usage_bytes',
-            'logsfs_used_bytes', 'logsfs_capacity_bytes'
-        ]
-        kepler_cols = ['_time', 'container_name', 'namespace', 'pod_name', 'kepler_container_joules_total']
+        kepler_cols = list(self.kepler_cols)
+        if self.power_from_counter:
+            kepler_cols.append('container_power_watts')
 
-        k8s_filtered = self.k8s_df[k8s_cols].dropna()
-        kepler_filtered = self.kepler_df[kepler_cols].dropna()
+        if self.copy:
+            k8s_filtered = self.k8s_df[self.k8s_cols + self.passthrough_cols].dropna()
+            kepler_filtered = self.kepler_df[kepler_cols].dropna()
+        else:
+            # Borrowed inputs are already projected to the required columns
+            k8s_filtered = self.k8s_df.dropna()
+            kepler_filtered = self.kepler_df.dropna()
+            self.k8s_df = self.kepler_df = None
 
         # Merge on multiple keys
         self.dataset = pd.merge(
@@ -42,35 +107,55 @@ class EnergyDatasetBuilder:
             how='inner'
         )
 
-    def engineer_features(self):
-        df = self.dataset
-
+    @staticmethod
+    def add_features(df: pd.DataFrame):
         # Unit conversions
         df['cpu_millicores'] = df['cpu_usage_nanocores'] / 1e6
         df['memory_usage_mb'] = df['memory_usage_bytes'] / (1024 ** 2)
 
         # Avoid divide-by-zero
-        df['logsfs_usage_percent'] = df.apply(
-            lambda x: (x['logsfs_used_bytes'] / x['logsfs_capacity_bytes'] * 100)
-            if x['logsfs_capacity_bytes'] > 0 else 0,
-            axis=1
+        df['logsfs_usage_percent'] = (
+            (df['logsfs_used_bytes'] / df['logsfs_capacity_bytes'] * 100)
+            .where(df['logsfs_capacity_bytes'] > 0, 0)
         )
 
-        # Target: power in watts = joules per 60s interval
-        df['container_power_watts'] = df['kepler_container_joules_total'] / 60
+    def engineer_features(self):
+        df = self.dataset
+        self.add_features(df)
+
+        # Target: power in watts = joules per 60s interval (already derived from the counter otherwise)
+        if not self.power_from_counter:
+            df['container_power_watts'] = df['kepler_container_joules_total'] / 60
 
         # Final dataset
         self.dataset = df[[
             '_time', 'container_name', 'namespace', 'pod_name',
             'cpu_millicores', 'memory_usage_mb', 'logsfs_usage_percent',
             'container_power_watts'
-        ]].dropna()
+        ] + self.passthrough_cols].dropna()
+
+    def decode_entities(self):
+        """Turn entity id columns back into names when the inputs were encoded with an EntityDictionary."""
+        if self.entities is not None:
+            self.entities.decode(self.dataset)
+
+    def build_features(self) -> pd.DataFrame:
+        """Feature rows from the K8S input alone, without the Kepler target, e.g. to estimate live power."""
+        df = self.k8s_df.loc[:, self.k8s_cols + self.passthrough_cols] if self.copy else self.k8s_df
+        df['_time'] = pd.to_datetime(df['_time']).dt.floor(self.interval)
+        df = df.dropna()
+        self.add_features(df)
+        features = df.loc[:, ['_time', 'container_name', 'namespace', 'pod_name',
+                           'cpu_millicores', 'memory_usage_mb', 'logsfs_usage_percent'] + self.passthrough_cols]
+        if self.entities is not None:
+            self.entities.decode(features)
+        return features
 
     def build(self) -> pd.DataFrame:
-        self.preprocess_time()
-        self.aggregate_kepler()
-        self.join_data()
-        self.engineer_features()
+        self.record_memory('input')
+        for stage in self.stages:
+            getattr(self, stage)()
+            self.record_memory(stage)
         return self.dataset
 
 if __name__ == "__main__":
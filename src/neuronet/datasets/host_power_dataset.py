@@ -0,0 +1,155 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+from neuronet.datasets.memory import StageMemoryReport
+from neuronet.preprocessing.entities import EntityDictionary
+
+SERVER_COL = 'inventory-server-id'
+
+
+class HostPowerDatasetBuilder:
+    # Columns required from each input
+    pdu_cols = ['_time', SERVER_COL, 'placement', 'activePower']
+    scaphandre_host_cols = ['_time', 'url', 'scaph_host_power_microwatts']
+    prox_cols = ['_time', SERVER_COL, 'vm_id', 'cpuload', 'mem_used', 'mem_total']
+
+    # Store plugins of the three inputs, in constructor order
+    store_plugins = ['pdu', 'scaphandre_host', 'proxmox']
+
+    # Build stages, run in order by build()
+    stages = ['build_server_index', 'preprocess_time', 'aggregate_sources', 'join_data', 'engineer_features',
+              'decode_entities']
+
+    def __init__(self, pdu_df: pd.DataFrame, scaphandre_host_df: pd.DataFrame, proxmox_df: pd.DataFrame,
+                 interval: str = '1min', url_to_server: Optional[Dict[str, str]] = None, copy: bool = True,
+                 entities: Optional[EntityDictionary] = None):
+        # Dictionary the processors encoded url & inventory-server-id with, the joins then run on integer ids
+        self.entities = entities
+        # copy=False borrows the inputs: only the needed columns are projected up front, the inputs are
+        # never modified and the frame memory held after each stage is recorded in memory_report
+        self.copy = copy
+        self.memory_report = StageMemoryReport() if not copy else None
+        if copy:
+            self.pdu_df = pdu_df.copy()
+            self.scaphandre_host_df = scaphandre_host_df.copy()
+            self.proxmox_df = proxmox_df.copy()
+        else:
+            self.pdu_df = pdu_df.loc[:, self.pdu_cols]
+            self.scaphandre_host_df = scaphandre_host_df.loc[:, self.scaphandre_host_cols]
+            self.proxmox_df = proxmox_df.loc[:, self.prox_cols]
+        self.interval = interval
+        # Optional explicit url -> inventory-server-id mapping, the host name of the url is used otherwise
+        self.url_to_server = url_to_server or {}
+        self.server_index: pd.Series = pd.Series(dtype='object')
+        self.sources = []
+        self.dataset = None
+
+    def record_memory(self, stage: str):
+        if self.memory_report is not None:
+            self.memory_report.record(stage, self.pdu_df, self.scaphandre_host_df, self.proxmox_df,
+                                      *self.sources, self.dataset)
+
+    def build_server_index(self):
+        """Map every distinct Scaphandre url to its inventory-server-id once (e.g. http://flux-node3.av.it.pt:8080 -> flux-node3)."""
+        urls = pd.Index(self.scaphandre_host_df['url'].dropna().unique())
+        encoded = self.entities is not None and pd.api.types.is_numeric_dtype(urls)
+        url_names = pd.Index(self.entities.names, dtype=object)[urls.astype('int64')] if encoded else urls
+        servers = pd.Series(url_names.str.extract(r'^(?:\w+://)?([^.:/]+)', expand=False), index=url_names)
+        if self.url_to_server:
+            overrides = pd.Series(self.url_to_server)
+            servers.update(overrides[overrides.index.isin(url_names)])
+        if encoded:
+            servers = servers.map(self.entities.add)
+        self.server_index = pd.Series(servers.to_numpy(), index=urls)
+
+    def preprocess_time(self):
+        # PDUDataProcessor repeats each outlet reading once per PDU url of the server
+        self.pdu_df = self.pdu_df.drop_duplicates(subset=['_time', SERVER_COL, 'placement'])
+
+        # Align all times to the given interval (e.g., 1min)
+        for df in [self.pdu_df, self.scaphandre_host_df, self.proxmox_df]:
+            df['_time'] = pd.to_datetime(df['_time'])
+            df['_time'] = df['_time'].dt.floor(self.interval)
+
+        # Resolve the server of each Scaphandre row through the precomputed url index
+        self.scaphandre_host_df = self.scaphandre_host_df.dropna(subset=['url'])
+        codes, uniques = pd.factorize(self.scaphandre_host_df['url'])
+        self.scaphandre_host_df[SERVER_COL] = self.server_index.reindex(uniques).to_numpy()[codes]
+
+    def aggregate_sources(self):
+        """Aggregate every source to one row per _time + inventory-server-id."""
+        keys = ['_time', SERVER_COL]
+
+        # PDU: average each outlet (left/right feed) over the interval, then sum the outlets of a server
+        pdu_power = (
+            self.pdu_df
+            .groupby(keys + ['placement'])['activePower']
+            .mean()
+            .groupby(level=keys)
+            .sum()
+            .rename('activePower')
+        )
+
+        scaph_power = (
+            self.scaphandre_host_df
+            .groupby(keys)['scaph_host_power_microwatts']
+            .mean()
+        )
+
+        # Proxmox: aggregated VM load per server
+        vm_load = self.proxmox_df.groupby(keys).agg(
+            vm_count=('vm_id', 'nunique'),
+            vm_cpuload_sum=('cpuload', 'sum'),
+            vm_cpuload_mean=('cpuload', 'mean'),
+            vm_mem_used_bytes=('mem_used', 'sum'),
+            vm_mem_total_bytes=('mem_total', 'sum'),
+        )
+
+        self.sources = [pdu_power.to_frame(), scaph_power.to_frame(), vm_load]
+        if not self.copy:
+            self.pdu_df = self.scaphandre_host_df = self.proxmox_df = None
+
+    def join_data(self):
+        # Single multi-way alignment on the shared (_time, server) index instead of pairwise merges
+        self.dataset = pd.concat(self.sources, axis=1, join='inner').reset_index()
+        self.sources = []
+
+    def engineer_features(self):
+        df = self.dataset
+
+        df['scaph_host_power_watts'] = df['scaph_host_power_microwatts'] / 1e6
+        df['vm_mem_used_percentage'] = (df['vm_mem_used_bytes'] / df['vm_mem_total_bytes'] * 100).where(df['vm_mem_total_bytes'] > 0, 0)
+
+        # Target: wall power measured by the PDU outlets of the server
+        df['host_power_watts'] = df['activePower']
+
+        self.dataset = df[[
+            '_time', SERVER_COL,
+            'vm_count', 'vm_cpuload_sum', 'vm_cpuload_mean',
+            'vm_mem_used_bytes', 'vm_mem_total_bytes', 'vm_mem_used_percentage',
+            'scaph_host_power_watts', 'host_power_watts'
+        ]].dropna()
+
+    def decode_entities(self):
+        """Turn entity id columns back into names when the inputs were encoded with an EntityDictionary."""
+        if self.entities is not None:
+            self.entities.decode(self.dataset)
+
+    def build(self) -> pd.DataFrame:
+        self.record_memory('input')
+        for stage in self.stages:
+            getattr(self, stage)()
+            self.record_memory(stage)
+        return self.dataset
+
+if __name__ == "__main__":
+    # Example usage
+    pdu_df = pd.read_csv("experiment/processed/pdu_processed.csv")  # Load your PDU data
+    scaphandre_host_df = pd.read_csv("experiment/processed/host_scaphandre_processed.csv")  # Load your Scaphandre host data
+    proxmox_df = pd.read_csv("experiment/processed/proxmox_processed.csv")  # Load your Proxmox data
+
+    builder = HostPowerDatasetBuilder(pdu_df, scaphandre_host_df, proxmox_df)
+    host_dataset = builder.build()
+    host_dataset.to_csv("experiment/datasets/host_power_dataset.csv", index=False)
+    print("✅ Host Power Dataset built and saved to host_power_dataset.csv")
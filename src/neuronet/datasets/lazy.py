@@ -0,0 +1,386 @@
+"""Lazy handles over the processed plugin CSVs, the built datasets and the local time-series store.
+
+Selections (time range, entity values, columns, row limit) are only recorded until the data is requested with
+to_pandas()/to_numpy(), then pushed down to the scan: CSV files are read through a sidecar row-group index
+(byte offset, time range and entity values of every `group_rows` lines) so non-matching groups are never read
+or parsed, and only the needed columns are parsed; the store prunes whole partitions and loads only the
+selected arrays.
+"""
+import io
+import itertools
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.datasets.store import TIERS, TimeSeriesStore, to_ns
+from neuronet.preprocessing.entities import ENTITY_COLUMNS, EntityDictionary
+
+# Columns whose distinct values are kept per row group, so entity filters can skip groups
+INDEX_COLUMNS = ENTITY_COLUMNS + ['vm_id']
+GROUP_ROWS = 50_000
+# Groups with more distinct values of a column than this store None for it and are always read
+MAX_DISTINCT = 1024
+
+
+def normalize(value) -> str:
+    """Text form used to compare filter values with CSV fields: 100, '100' and '100.0' are the same value."""
+    text = str(value)
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def times_ns(values: pd.Series) -> np.ndarray:
+    """UTC nanoseconds of a time column, NaT as the int64 minimum."""
+    return pd.to_datetime(values, utc=True, format='mixed').to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def index_path(path: str) -> str:
+    return f'{path}.index.json'
+
+
+def build_index(path: str, time_col: str = '_time', group_rows: int = GROUP_ROWS) -> Dict[str, Any]:
+    """Row-group index of a CSV: offset, size and row count of every `group_rows` lines, with their time range and
+    entity values. Assumes one record per line, as written by the processors and dataset builders."""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+        header = pd.read_csv(io.BytesIO(header_line), nrows=0).columns.tolist()
+        indexed = [c for c in INDEX_COLUMNS if c in header]
+        usecols = ([time_col] if time_col in header else []) + indexed
+        groups, offset = [], len(header_line)
+        while True:
+            block = b''.join(itertools.islice(f, group_rows))
+            if not block:
+                break
+            group: Dict[str, Any] = {'offset': offset, 'bytes': len(block), 'min_time': None, 'max_time': None,
+                                     'values': {}}
+            frame = pd.read_csv(io.BytesIO(block), header=None, names=header, usecols=usecols or [0],
+                                dtype={c: str for c in indexed})
+            group['rows'] = len(frame)
+            if time_col in frame:
+                times = times_ns(frame[time_col])
+                times = times[times != np.iinfo('int64').min]
+                if len(times):
+                    group['min_time'], group['max_time'] = int(times.min()), int(times.max())
+            for col in indexed:
+                uniques = {normalize(v) for v in frame[col].dropna().unique()}
+                group['values'][col] = sorted(uniques) if len(uniques) <= MAX_DISTINCT else None
+            groups.append(group)
+            offset += len(block)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'header': header, 'time_col': time_col,
+            'group_rows': group_rows, 'groups': groups}
+
+
+def load_index(path: str, time_col: str = '_time', group_rows: int = GROUP_ROWS) -> Dict[str, Any]:
+    """Sidecar index of `path`, rebuilt (and saved when the directory is writable) if missing or stale."""
+    stat = os.stat(path)
+    if os.path.exists(index_path(path)):
+        with open(index_path(path)) as f:
+            index = json.load(f)
+        if (index['size'], index['mtime_ns'], index['time_col'], index['group_rows']) == \
+                (stat.st_size, stat.st_mtime_ns, time_col, group_rows):
+            return index
+    started = time.perf_counter()
+    index = build_index(path, time_col, group_rows)
+    print(f"🔄 Indexed {len(index['groups'])} row groups of {path} in {time.perf_counter() - started:.2f}s")
+    try:
+        with open(f'{index_path(path)}.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(f'{index_path(path)}.tmp', index_path(path))
+    except OSError as e:
+        print(f"⚠️ Could not save the index of {path}: {e}")
+    return index
+
+
+class CsvSource:
+    """Processed plugin CSV or built dataset CSV, scanned through its row-group index when filtered.
+
+    Entity columns encoded as ids (processed CSVs saved with their <name>.entities.json) are filtered by name
+    and decoded on materialization.
+    """
+
+    def __init__(self, path: str, entities: Optional[EntityDictionary] = None, time_col: str = '_time',
+                 use_index: bool = True, group_rows: int = GROUP_ROWS, chunk_size: int = 100_000):
+        self.path = path
+        self.entities = entities if entities is not None else EntityDictionary.load_for(path)
+        self.time_col = time_col
+        self.use_index = use_index
+        self.group_rows = group_rows
+        self.chunk_size = chunk_size
+        self.columns = pd.read_csv(path, nrows=0).columns.tolist()
+
+    def describe(self) -> str:
+        return f'csv {self.path}'
+
+    def candidates(self, col: str, values: Sequence) -> List[str]:
+        """Normalized values to look for in `col`: the values themselves, plus their ids for entity columns."""
+        found = [normalize(v) for v in values]
+        if self.entities is not None and col in ENTITY_COLUMNS:
+            found += [normalize(self.entities.ids[str(v)]) for v in values if str(v) in self.entities.ids]
+        return found
+
+    def groups(self, start: Optional[int], stop: Optional[int], filters: Dict[str, List],
+               stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Row groups that can hold matching rows, contiguous groups merged into one read."""
+        index = load_index(self.path, self.time_col, self.group_rows)
+        wanted = {col: set(self.candidates(col, values)) for col, values in filters.items()}
+        blocks: List[Dict[str, Any]] = []
+        for group in index['groups']:
+            if group['min_time'] is not None and (
+                    (start is not None and group['max_time'] < start) or (stop is not None and group['min_time'] >= stop)):
+                continue
+            if any(group['values'].get(col) is not None and not wanted[col].intersection(group['values'][col])
+                   for col in wanted):
+                continue
+            if blocks and blocks[-1]['offset'] + blocks[-1]['bytes'] == group['offset']:
+                blocks[-1]['bytes'] += group['bytes']
+            else:
+                blocks.append({'offset': group['offset'], 'bytes': group['bytes']})
+            stats['groups_read'] += 1
+        stats['groups'] = len(index['groups'])
+        return blocks
+
+    def chunks(self, usecols: Optional[List[str]], blocks: Optional[List[Dict[str, Any]]]) -> Iterator[pd.DataFrame]:
+        if blocks is None:
+            yield from pd.read_csv(self.path, usecols=usecols, chunksize=self.chunk_size)
+            return
+        with open(self.path, 'rb') as f:
+            for block in blocks:
+                f.seek(block['offset'])
+                yield from pd.read_csv(io.BytesIO(f.read(block['bytes'])), header=None, names=self.columns,
+                                       usecols=usecols, chunksize=self.chunk_size)
+
+    def mask(self, frame: pd.DataFrame, col: str, values: Sequence) -> np.ndarray:
+        series = frame[col]
+        wanted = set(self.candidates(col, values))
+        if pd.api.types.is_numeric_dtype(series):
+            return series.isin(pd.to_numeric(pd.Series(list(wanted)), errors='coerce').dropna()).to_numpy()
+        # Normalize the distinct values only, rows are matched through the factorize codes
+        codes, uniques = pd.factorize(series)
+        hits = np.array([normalize(value) in wanted for value in uniques] + [False])
+        return hits[codes]
+
+    def scan(self, columns: Optional[List[str]], start: Optional[int], stop: Optional[int],
+             filters: Dict[str, List], limit: Optional[int], stats: Dict[str, Any]) -> pd.DataFrame:
+        timed = start is not None or stop is not None
+        if timed and self.time_col not in self.columns:
+            raise KeyError(f"{self.path} has no {self.time_col} column for a time range")
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(columns + list(filters) + ([self.time_col] if timed else [])))
+        blocks = self.groups(start, stop, filters, stats) if self.use_index and (timed or filters) else None
+        if blocks is not None:
+            stats['bytes_read'] = sum(block['bytes'] for block in blocks)
+        else:
+            stats['bytes_read'] = os.path.getsize(self.path)
+
+        frames, rows = [], 0
+        for chunk in self.chunks(usecols, blocks):
+            stats['rows_scanned'] += len(chunk)
+            keep = np.ones(len(chunk), dtype=bool)
+            if timed:
+                times = times_ns(chunk[self.time_col])
+                if start is not None:
+                    keep &= times >= start
+                if stop is not None:
+                    keep &= (times < stop) & (times != np.iinfo('int64').min)
+            for col, values in filters.items():
+                keep &= self.mask(chunk, col, values)
+            chunk = chunk[keep]
+            frames.append(chunk if columns is None else chunk[columns])
+            rows += len(chunk)
+            if limit is not None and rows >= limit:
+                break
+
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns or self.columns)
+        if limit is not None:
+            frame = frame.iloc[:limit]
+        if self.entities is not None:
+            self.entities.decode(frame, [c for c in ENTITY_COLUMNS if c in frame.columns])
+        if self.time_col in frame.columns:
+            frame[self.time_col] = pd.to_datetime(frame[self.time_col], utc=True, format='mixed')
+        return frame
+
+
+class StoreSource:
+    """One plugin of a TimeSeriesStore, read at the coarsest tier with a step of at most `resolution`."""
+
+    def __init__(self, store: TimeSeriesStore, plugin: str, resolution: Optional[str] = None):
+        if plugin not in store.plugins:
+            raise KeyError(f"No {plugin} data in {store.root}, stored plugins: {store.plugins}")
+        self.store = store
+        self.plugin = plugin
+        self.resolution = resolution
+        self.time_col = '_time'
+        self.columns = ['_time'] + store.config['plugins'][plugin]['columns']
+
+    def describe(self) -> str:
+        return f'store {self.store.root} {self.plugin} ({self.store.tier_for(self.resolution)} tier)'
+
+    def scan(self, columns: Optional[List[str]], start: Optional[int], stop: Optional[int],
+             filters: Dict[str, List], limit: Optional[int], stats: Dict[str, Any]) -> pd.DataFrame:
+        tier = self.store.tier_for(self.resolution)
+        span = pd.Timedelta(TIERS[tier][1]).value
+        partitions = self.store.partitions(self.plugin, tier)
+        stats['groups'] = len(partitions)
+        stats['groups_read'] = sum(1 for first in partitions if not (
+            (start is not None and first + span <= start) or (stop is not None and first >= stop)))
+        strings = self.store.config['plugins'][self.plugin]['strings']
+        # Numeric tags (e.g. vm_id) are stored as numbers, filter values may come in as text
+        filters = {col: values if col in strings else pd.to_numeric(pd.Series(values, dtype=object)).tolist()
+                   for col, values in filters.items()}
+        frame = self.store.read(self.plugin, start, stop, self.resolution,
+                                [c for c in columns if c != '_time'] if columns is not None else None, **filters)
+        stats['rows_scanned'] = len(frame)
+        if columns is not None:
+            frame = frame[columns]
+        return frame.iloc[:limit] if limit is not None else frame
+
+
+class LazyDataset:
+    """Recorded selections over a CSV or store source, read only by to_pandas()/to_numpy().
+
+    Every selection returns a new handle, so a base handle can be narrowed in several ways, e.g.
+    LazyDataset.csv('datasets/vm_power_dataset.csv').between('2025-08-04', '2025-08-05').where(vm_id=[100, 115])
+    .select('cpuload', 'mem_used').to_numpy().
+    """
+
+    def __init__(self, source, columns: Optional[List[str]] = None, start: Optional[int] = None,
+                 stop: Optional[int] = None, filters: Optional[Dict[str, List]] = None, limit: Optional[int] = None):
+        self.source = source
+        self.columns = columns
+        self.start = start
+        self.stop = stop
+        self.filters = filters or {}
+        self.limit = limit
+        self.last_scan: Dict[str, Any] = {}
+
+    @classmethod
+    def csv(cls, path: str, entities: Optional[EntityDictionary] = None, time_col: str = '_time',
+            use_index: bool = True, group_rows: int = GROUP_ROWS) -> 'LazyDataset':
+        return cls(CsvSource(path, entities, time_col, use_index, group_rows))
+
+    @classmethod
+    def store(cls, store, plugin: str, resolution: Optional[str] = None) -> 'LazyDataset':
+        """Handle on a plugin of a TimeSeriesStore (or the store directory)."""
+        if isinstance(store, str):
+            store = TimeSeriesStore(store)
+        return cls(StoreSource(store, plugin, resolution))
+
+    def replace(self, **changes) -> 'LazyDataset':
+        state = {'columns': self.columns, 'start': self.start, 'stop': self.stop, 'filters': self.filters,
+                 'limit': self.limit, **changes}
+        return LazyDataset(self.source, **state)
+
+    def select(self, *columns: str) -> 'LazyDataset':
+        columns = list(columns[0]) if len(columns) == 1 and not isinstance(columns[0], str) else list(columns)
+        missing = [c for c in columns if c not in self.source.columns]
+        if missing:
+            raise KeyError(f"Unknown columns {missing} in {self.source.describe()}")
+        if self.columns is not None:
+            outside = [c for c in columns if c not in self.columns]
+            if outside:
+                raise KeyError(f"Columns {outside} are not in the current selection {self.columns}")
+        return self.replace(columns=columns)
+
+    def between(self, start=None, stop=None) -> 'LazyDataset':
+        """Keep rows with start <= time < stop, narrowing any earlier range."""
+        start = to_ns(start) if start is not None else None
+        stop = to_ns(stop) if stop is not None else None
+        if self.start is not None:
+            start = self.start if start is None else max(start, self.start)
+        if self.stop is not None:
+            stop = self.stop if stop is None else min(stop, self.stop)
+        return self.replace(start=start, stop=stop)
+
+    def where(self, **filters) -> 'LazyDataset':
+        """Keep rows whose columns take one of the given values, e.g. where(namespace='default', vm_id=[100, 115])."""
+        combined = dict(self.filters)
+        for col, values in filters.items():
+            if col not in self.source.columns:
+                raise KeyError(f"Unknown column {col} in {self.source.describe()}")
+            values = [values] if isinstance(values, (str, int, float)) else list(values)
+            if col in combined:
+                # Filtering the same column twice keeps the values in both
+                allowed = {normalize(v) for v in values}
+                values = [v for v in combined[col] if normalize(v) in allowed]
+            combined[col] = values
+        return self.replace(filters=combined)
+
+    def head(self, n: int) -> 'LazyDataset':
+        return self.replace(limit=n if self.limit is None else min(n, self.limit))
+
+    def explain(self) -> str:
+        lines = [f'scan {self.source.describe()}',
+                 f"  columns: {', '.join(self.columns) if self.columns is not None else 'all'}"]
+        if self.start is not None or self.stop is not None:
+            bounds = [pd.Timestamp(t, tz='UTC').isoformat() if t is not None else '...' for t in (self.start, self.stop)]
+            lines.append(f'  time: [{bounds[0]}, {bounds[1]})')
+        lines += [f'  {col} in {values}' for col, values in self.filters.items()]
+        if self.limit is not None:
+            lines.append(f'  limit: {self.limit}')
+        return '\n'.join(lines)
+
+    def to_pandas(self) -> pd.DataFrame:
+        started = time.perf_counter()
+        stats = {'groups': 0, 'groups_read': 0, 'rows_scanned': 0}
+        frame = self.source.scan(self.columns, self.start, self.stop, self.filters, self.limit, stats)
+        self.last_scan = {**stats, 'rows': len(frame), 'seconds': time.perf_counter() - started}
+        return frame
+
+    def to_numpy(self, dtype: Optional[str] = 'float64') -> np.ndarray:
+        """Selected columns as one array (a float64 feature matrix by default)."""
+        return self.to_pandas().to_numpy(dtype=dtype)
+
+
+@click.command()
+@click.option('--path', default=None, help='Processed plugin CSV or built dataset CSV')
+@click.option('--store', 'store_root', default=None, help='TimeSeriesStore directory (with --plugin)')
+@click.option('--plugin', default=None, help='Plugin to read from --store')
+@click.option('--resolution', default=None, help='Coarsest acceptable step of the store tier, e.g. 1h')
+@click.option('--start', default=None, help='Start time (inclusive)')
+@click.option('--stop', default=None, help='Stop time (exclusive)')
+@click.option('--filter', 'filters', multiple=True, help='column=value[,value...], e.g. vm_id=100,115')
+@click.option('--columns', default=None, help='Comma-separated columns to read')
+@click.option('--limit', default=None, type=int, help='Stop after this many matching rows')
+@click.option('--output', default=None, help='Write the result to this CSV')
+def main(path, store_root, plugin, resolution, start, stop, filters, columns, limit, output):
+    """
+    Read a filtered slice of a processed/built CSV or a store plugin, reading only the matching row groups.
+
+    e.g., "scan-dataset --path datasets/vm_power_dataset.csv --start 2025-08-04 --filter vm_id=100 --columns _time,cpuload"
+    """
+    if bool(path) == bool(store_root):
+        raise click.UsageError('Pass either --path or --store with --plugin')
+    dataset = LazyDataset.csv(path) if path else LazyDataset.store(store_root, plugin, resolution)
+    dataset = dataset.between(start, stop)
+    for item in filters:
+        col, values = item.split('=', 1)
+        dataset = dataset.where(**{col: values.split(',')})
+    if columns:
+        dataset = dataset.select(*columns.split(','))
+    if limit is not None:
+        dataset = dataset.head(limit)
+    click.echo(dataset.explain())
+
+    frame = dataset.to_pandas()
+    scan = dataset.last_scan
+    read = f"{scan['groups_read']}/{scan['groups']} row groups" if scan['groups'] else 'a full scan'
+    click.echo(f"⏱️ {scan['rows']} rows from {read} ({scan['rows_scanned']} scanned) in {scan['seconds'] * 1000:.1f} ms")
+    if output:
+        frame.to_csv(output, index=False)
+        click.echo(f"✅ Written to {output}")
+    else:
+        click.echo(frame.head(20).to_string())
+
+
+if __name__ == '__main__':
+    main()
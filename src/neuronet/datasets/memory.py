@@ -0,0 +1,27 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+def frame_nbytes(*frames: Optional[pd.DataFrame]) -> int:
+    """Total memory held by the given frames, including the payload of string columns."""
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames if df is not None))
+
+
+class StageMemoryReport:
+    """Record the frame memory held by a dataset builder after each build stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, int] = {}
+
+    def record(self, stage: str, *frames: Optional[pd.DataFrame]):
+        self.stages[stage] = frame_nbytes(*frames)
+
+    @property
+    def peak(self) -> int:
+        return max(self.stages.values(), default=0)
+
+    def summary(self) -> str:
+        lines = [f"{stage}: {nbytes / 1024 ** 2:.2f} MB" for stage, nbytes in self.stages.items()]
+        lines.append(f"peak: {self.peak / 1024 ** 2:.2f} MB")
+        return "\n".join(lines)
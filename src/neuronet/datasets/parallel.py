@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Position of each row of the first input, carried through the shard builds to restore the build() order
+ROW_ID = '_row_id'
+
+
+def canonical_keys(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Entity keys as text, so 100 (int64), 100.0 (float64, e.g. after a NaN) and '100' land in the same shard."""
+    columns = {}
+    for key in keys:
+        codes, uniques = pd.factorize(df[key])
+        names = [str(int(v)) if isinstance(v, (int, float, np.number)) and float(v).is_integer() else str(v)
+                 for v in uniques]
+        columns[key] = np.array(names + [''], dtype=object)[codes]
+    return pd.DataFrame(columns)
+
+
+def shard_ids(df: pd.DataFrame, keys: List[str], n_shards: int) -> np.ndarray:
+    """Stable hash partition of the rows of `df` by entity key, rows with a missing key all go to shard 0."""
+    ids = pd.util.hash_pandas_object(canonical_keys(df, keys), index=False).to_numpy() % n_shards
+    ids[df[keys].isna().any(axis=1).to_numpy()] = 0
+    return ids.astype('int64')
+
+
+def split_frame(df: pd.DataFrame, keys: List[str], n_shards: int) -> List[pd.DataFrame]:
+    """Split `df` into `n_shards` frames, keeping the relative row order inside each shard."""
+    ids = shard_ids(df, keys, n_shards)
+    order = np.argsort(ids, kind='stable')
+    bounds = np.searchsorted(ids[order], np.arange(1, n_shards))
+    return [df.take(rows) for rows in np.split(order, bounds)]
+
+
+def build_shard(builder_cls, frames: Tuple[pd.DataFrame, ...], builder_kwargs: dict):
+    """Run all build stages on one shard, returning the dataset and the row ids that survived the join."""
+    builder = builder_cls(*frames, passthrough_cols=[ROW_ID], **builder_kwargs)
+    joined = np.empty(0, dtype='int64')
+    for stage in builder.stages:
+        getattr(builder, stage)()
+        if stage == 'join_data':
+            joined = builder.dataset[ROW_ID].to_numpy()
+    return builder.dataset, joined
+
+
+class ShardedDatasetBuilder:
+    """Build a dataset in a process pool by hash-partitioning the inputs on the builder's entity keys.
+
+    All inputs are split with the same hash so every entity lands in exactly one shard; the
+    shard outputs are concatenated and reordered so the result is identical to builder_cls(...).build().
+    """
+
+    def __init__(self, builder_cls, *frames: pd.DataFrame, n_shards: Optional[int] = None,
+                 max_workers: Optional[int] = None, **builder_kwargs):
+        self.builder_cls = builder_cls
+        self.frames = frames
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.n_shards = n_shards or self.max_workers
+        self.builder_kwargs = builder_kwargs
+        self.dataset = None
+
+    def partition(self) -> List[Tuple[pd.DataFrame, ...]]:
+        keys = self.builder_cls.entity_keys
+        first = self.frames[0].assign(**{ROW_ID: np.arange(len(self.frames[0]))})
+        for df in self.frames:
+            missing = int(df[keys].isna().any(axis=1).sum())
+            if missing:
+                # Kept together in one shard, so they join (or not) exactly as in the single build
+                print(f"⚠️ {missing} rows with a missing {'/'.join(keys)} key, all built in shard 0")
+        splits = [split_frame(df, keys, self.n_shards) for df in (first,) + self.frames[1:]]
+        return list(zip(*splits))
+
+    def build(self) -> pd.DataFrame:
+        shards = self.partition()
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(shards))) as executor:
+            futures = [executor.submit(build_shard, self.builder_cls, shard, self.builder_kwargs) for shard in shards]
+            results = [future.result() for future in futures]
+
+        datasets = [dataset for dataset, _ in results if not dataset.empty] or [results[0][0]]
+        dataset = pd.concat(datasets)
+
+        # The single build joins in the order of the first input and numbers the joined rows 0..n-1,
+        # rows dropped afterwards leave gaps in that index: rebuild it from the joined row ids
+        joined = np.sort(np.concatenate([ids for _, ids in results]))
+        dataset.index = np.searchsorted(joined, dataset[ROW_ID].to_numpy())
+        dataset = dataset.sort_index().drop(columns=ROW_ID)
+        if len(dataset) == len(joined):
+            dataset.index = pd.RangeIndex(len(joined))
+        self.dataset = dataset
+        return self.dataset
+
+
+if __name__ == "__main__":
+    # Example usage
+    from neuronet.datasets.vm_power_dataset import VmPowerDatasetBuilder
+
+    proxmox_df = pd.read_csv("experiment/processed/proxmox_processed.csv")  # Load your Proxmox data
+    scaphandre_vm_df = pd.read_csv("experiment/processed/vm_scaphandre_processed.csv")  # Load your Scaphandre VM data
+
+    builder = ShardedDatasetBuilder(VmPowerDatasetBuilder, proxmox_df, scaphandre_vm_df, interval='1min')
+    final_dataset = builder.build()
+    print(f"✅ VM Power Dataset built in {builder.n_shards} shards: {final_dataset.shape}")
@@ -0,0 +1,306 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.preprocessing.entities import ENTITY_COLUMNS, EntityDictionary
+from neuronet.preprocessing.quality import PLUGIN_CHECKS
+
+# Tier -> (downsampling step, partition span), raw keeps the samples as written
+TIERS = {'raw': (None, '1D'), '1min': ('1min', '1D'), '1h': ('1h', '30D')}
+DEFAULT_RETENTION = {'raw': '7D', '1min': '90D', '1h': None}
+
+
+def to_ns(value) -> int:
+    value = pd.Timestamp(value)
+    return (value.tz_convert('UTC') if value.tzinfo else value.tz_localize('UTC')).value
+
+
+class TimeSeriesStore:
+    """Embedded file-based store for the processed plugin frames, with downsampled tiers and per-tier retention.
+
+    Each tier keeps one .npz file per time partition and plugin under `<root>/<tier>/<plugin>/`, text columns
+    stored as EntityDictionary ids. Text columns and the plugin's entity columns are the tags: the 1min and 1h
+    tiers hold the mean of every other column per tag set and bucket (the last value for counters), recomputed
+    from the raw tier for the buckets each write touches. Retention is relative to the newest sample of the
+    plugin and drops whole partitions.
+    """
+
+    def __init__(self, root: str, retention: Optional[Dict[str, Optional[str]]] = None):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.config = {'retention': dict(DEFAULT_RETENTION), 'plugins': {}}
+        if os.path.exists(self.path('store.json')):
+            with open(self.path('store.json')) as f:
+                self.config = json.load(f)
+        self.config['retention'].update(retention or {})
+        names_path = self.path('entities.json')
+        self.entities = EntityDictionary.load(names_path) if os.path.exists(names_path) else EntityDictionary()
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    @property
+    def plugins(self) -> List[str]:
+        return list(self.config['plugins'])
+
+    def save_config(self):
+        self.entities.save(self.path('entities.json'))
+        with open(self.path('store.json'), 'w') as f:
+            json.dump(self.config, f, indent=2)
+
+    def tier_for(self, resolution: Optional[str] = None) -> str:
+        """Coarsest tier whose step is at most `resolution` (raw when None)."""
+        if resolution is None:
+            return 'raw'
+        limit = pd.Timedelta(resolution)
+        tiers = [tier for tier, (step, _) in TIERS.items() if step is None or pd.Timedelta(step) <= limit]
+        return max(tiers, key=lambda tier: pd.Timedelta(TIERS[tier][0] or 0))
+
+    # Writing
+
+    def encode(self, plugin: str, df: pd.DataFrame, entities: Optional[EntityDictionary]) -> pd.DataFrame:
+        """Numeric copy of `df` (int64 ns times, text as ids), extending the plugin schema with new columns."""
+        frame = df.copy()
+        if entities is not None:
+            entities.decode(frame, [c for c in ENTITY_COLUMNS if c in frame.columns])
+        schema = self.config['plugins'].setdefault(plugin, {'columns': [], 'strings': [], 'tags': [], 'latest': None})
+        check = PLUGIN_CHECKS.get(plugin)
+        for col in frame.columns:
+            if col == '_time' or col in schema['columns']:
+                continue
+            schema['columns'].append(col)
+            if not pd.api.types.is_numeric_dtype(frame[col]):
+                schema['strings'].append(col)
+            if col in schema['strings'] or (check is not None and col in check.entity_cols):
+                schema['tags'].append(col)
+        strings = [c for c in schema['strings'] if c in frame.columns]
+        for col in strings:
+            frame[col] = frame[col].astype('string')
+        self.entities.encode(frame, strings)
+        for col in strings:
+            frame[col] = frame[col].fillna(-1).astype('int32')
+        frame['_time'] = pd.to_datetime(frame['_time'], utc=True, format='mixed').to_numpy(dtype='datetime64[ns]').view('int64')
+        return frame
+
+    def downsample(self, plugin: str, frame: pd.DataFrame, step: int) -> pd.DataFrame:
+        schema = self.config['plugins'][plugin]
+        check = PLUGIN_CHECKS.get(plugin)
+        counters = check.counters if check is not None else []
+        tags = [c for c in schema['tags'] if c in frame.columns]
+        fields = [c for c in frame.columns if c != '_time' and c not in tags]
+        frame = frame.assign(_time=frame['_time'] // step * step).sort_values('_time', kind='stable')
+        return (frame.groupby(['_time'] + tags, sort=False, dropna=False)
+                .agg({c: 'last' if c in counters else 'mean' for c in fields}).reset_index())
+
+    def partitions(self, plugin: str, tier: str) -> Dict[int, str]:
+        """Partition start (ns) -> file of a tier."""
+        directory = self.path(tier, plugin)
+        if not os.path.isdir(directory):
+            return {}
+        return {to_ns(name[:-4]): os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if name.endswith('.npz')}
+
+    def upsert(self, plugin: str, tier: str, frame: pd.DataFrame):
+        """Merge `frame` into the tier, later rows replace earlier ones with the same time and tags."""
+        span = pd.Timedelta(TIERS[tier][1]).value
+        keys = ['_time'] + [c for c in self.config['plugins'][plugin]['tags'] if c in frame.columns]
+        os.makedirs(self.path(tier, plugin), exist_ok=True)
+        existing = self.partitions(plugin, tier)
+        for start, rows in frame.groupby(frame['_time'] // span * span, sort=True):
+            if start in existing:
+                rows = pd.concat([self.load_file(plugin, existing[start]), rows], ignore_index=True)
+            rows = rows.drop_duplicates(keys, keep='last').sort_values('_time', kind='stable')
+            name = pd.Timestamp(start, tz='UTC').strftime('%Y%m%dT%H%M%S')
+            self.save_file(self.path(tier, plugin, f'{name}.npz'), rows)
+
+    @staticmethod
+    def save_file(path: str, frame: pd.DataFrame):
+        with open(f'{path}.tmp', 'wb') as f:
+            np.savez(f, **{col: frame[col].to_numpy() for col in frame.columns})
+        os.replace(f'{path}.tmp', path)  # readers never see a partial partition
+
+    def write(self, plugin: str, df: pd.DataFrame, entities: Optional[EntityDictionary] = None) -> int:
+        """Add a processed frame (e.g. K8SProcessor.final_df) to every tier, returning the rows stored.
+
+        `entities` is the dictionary the processors encoded the frame with, if any. Rows older than the raw
+        retention cannot be downsampled correctly any more and are dropped.
+        """
+        if df.empty:
+            return 0
+        frame = self.encode(plugin, df, entities)
+        schema = self.config['plugins'][plugin]
+        cutoff = self.cutoff(plugin, 'raw')
+        if cutoff is not None and (frame['_time'] < cutoff).any():
+            print(f"⚠️ {plugin}: dropping {int((frame['_time'] < cutoff).sum())} rows older than the raw retention")
+            frame = frame[frame['_time'] >= cutoff]
+            if frame.empty:
+                return 0
+
+        self.upsert(plugin, 'raw', frame)
+        first, last = int(frame['_time'].min()), int(frame['_time'].max())
+        for tier, (step, _) in TIERS.items():
+            if step is None:
+                continue
+            step = pd.Timedelta(step).value
+            # Whole buckets touched by the new rows, re-aggregated from every raw row they hold
+            lo, hi = first // step * step, last // step * step + step
+            raw = self.load(plugin, 'raw', lo, hi)
+            self.upsert(plugin, tier, self.downsample(plugin, raw, step))
+
+        schema['latest'] = max(last, schema['latest'] or last)
+        self.enforce_retention(plugin)
+        self.save_config()
+        return len(frame)
+
+    def cutoff(self, plugin: str, tier: str) -> Optional[int]:
+        schema = self.config['plugins'].get(plugin)
+        retention = self.config['retention'].get(tier)
+        if schema is None or schema['latest'] is None or retention is None:
+            return None
+        return schema['latest'] - pd.Timedelta(retention).value
+
+    def enforce_retention(self, plugin: str):
+        """Delete the partitions entirely older than each tier's retention."""
+        for tier, (_, span) in TIERS.items():
+            cutoff = self.cutoff(plugin, tier)
+            if cutoff is None:
+                continue
+            for start, path in self.partitions(plugin, tier).items():
+                if start + pd.Timedelta(span).value <= cutoff:
+                    os.remove(path)
+
+    # Reading
+
+    def load_file(self, plugin: str, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        schema = self.config['plugins'][plugin]
+        columns = ['_time'] + [c for c in (columns or schema['columns']) if c != '_time']
+        with np.load(path, allow_pickle=False) as arrays:
+            # Columns added to the schema after this partition was written read as missing
+            return pd.DataFrame({col: arrays[col] if col in arrays.files else
+                                 np.full(len(arrays['_time']), -1 if col in schema['strings'] else np.nan)
+                                 for col in columns})
+
+    def load(self, plugin: str, tier: str, start: Optional[int] = None, stop: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Encoded rows of a tier in [start, stop) (ns), reading only the overlapping partitions."""
+        span = pd.Timedelta(TIERS[tier][1]).value
+        frames = []
+        for first, path in self.partitions(plugin, tier).items():
+            if (start is not None and first + span <= start) or (stop is not None and first >= stop):
+                continue
+            frame = self.load_file(plugin, path, columns)
+            times = frame['_time'].to_numpy()
+            lo = np.searchsorted(times, start) if start is not None else 0
+            hi = np.searchsorted(times, stop) if stop is not None else len(times)
+            frames.append(frame.iloc[lo:hi])
+        if not frames:
+            return self.load_empty(plugin, columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def load_empty(self, plugin: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        schema = self.config['plugins'][plugin]
+        columns = [c for c in (columns or schema['columns']) if c != '_time']
+        return pd.DataFrame({'_time': pd.Series(dtype='int64'),
+                             **{c: pd.Series(dtype='int32' if c in schema['strings'] else 'float64') for c in columns}})
+
+    def read(self, plugin: str, start=None, stop=None, resolution: Optional[str] = None,
+             columns: Optional[Sequence[str]] = None, **filters) -> pd.DataFrame:
+        """Processed frame of `plugin` in [start, stop) from the coarsest tier with a step <= `resolution`.
+
+        Filters select tag values, e.g. read('k8s', resolution='1min', namespace=['default', 'kepler']).
+        """
+        if plugin not in self.config['plugins']:
+            raise KeyError(f"No {plugin} data in {self.root}, stored plugins: {self.plugins}")
+        schema = self.config['plugins'][plugin]
+        tier = self.tier_for(resolution)
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + list(filters)))
+        frame = self.load(plugin, tier, to_ns(start) if start is not None else None,
+                          to_ns(stop) if stop is not None else None, columns)
+
+        for col, values in filters.items():
+            values = [values] if isinstance(values, (str, int, float)) else list(values)
+            if col in schema['strings']:
+                values = [self.entities.ids.get(str(v), -2) for v in values]
+            frame = frame[np.isin(frame[col].to_numpy(), values)]
+        frame = frame.reset_index(drop=True)
+        self.entities.decode(frame, [c for c in schema['strings'] if c in frame.columns])
+        frame['_time'] = pd.to_datetime(frame['_time'], utc=True)
+        return frame
+
+    def builder(self, builder_cls, start=None, stop=None, interval: str = '1min', **kwargs):
+        """Dataset builder over the stored inputs it needs (its `store_plugins`), read at `interval` resolution."""
+        frames = [self.read(plugin, start, stop, resolution=interval) for plugin in builder_cls.store_plugins]
+        return builder_cls(*frames, interval=interval, **kwargs)
+
+    def summary(self) -> pd.DataFrame:
+        rows = []
+        for plugin in self.plugins:
+            for tier in TIERS:
+                partitions = self.partitions(plugin, tier)
+                if not partitions:
+                    continue
+                times = [np.load(path, allow_pickle=False)['_time'] for path in partitions.values()]
+                rows.append({'plugin': plugin, 'tier': tier, 'partitions': len(partitions),
+                             'rows': sum(len(t) for t in times),
+                             'first': pd.Timestamp(min(t.min() for t in times if len(t)), tz='UTC'),
+                             'last': pd.Timestamp(max(t.max() for t in times if len(t)), tz='UTC'),
+                             'bytes': sum(os.path.getsize(path) for path in partitions.values()),
+                             'retention': self.config['retention'].get(tier)})
+        return pd.DataFrame(rows)
+
+
+@click.command()
+@click.option('--root', required=True, help='Store directory, created when missing')
+@click.option('--add-dir', default=None, help='Add the processed CSVs of this directory (or its processed/ subdirectory)')
+@click.option('--retention', 'retentions', multiple=True, help='tier=duration (e.g. raw=14D, 1h=none), kept in the store')
+@click.option('--plugin', default=None, type=click.Choice(list(PLUGIN_CHECKS)), help='Query this plugin')
+@click.option('--start', default=None, help='Query start (inclusive)')
+@click.option('--stop', default=None, help='Query stop (exclusive)')
+@click.option('--resolution', default=None, help='Coarsest acceptable step, e.g. 1min or 1h (default: raw)')
+@click.option('--columns', default=None, help='Comma-separated columns to read')
+@click.option('--output', default=None, help='Write the query result to this CSV')
+def main(root, add_dir, retentions, plugin, start, stop, resolution, columns, output):
+    """
+    Keep processed plugin data in a local tiered time-series store and query it.
+
+    e.g., "timeseries-store --root store/ --add-dir experiment_data/" after each export, then
+    "timeseries-store --root store/ --plugin kepler --resolution 1h --output kepler_hourly.csv"
+    """
+    retention = {}
+    for item in retentions:
+        tier, value = item.split('=', 1)
+        retention[tier] = None if value.lower() == 'none' else value
+    store = TimeSeriesStore(root, retention)
+
+    if add_dir:
+        if os.path.isdir(os.path.join(add_dir, 'processed')):
+            add_dir = os.path.join(add_dir, 'processed')
+        for name, check in PLUGIN_CHECKS.items():
+            path = os.path.join(add_dir, check.file)
+            if os.path.exists(path):
+                started = time.perf_counter()
+                rows = store.write(name, pd.read_csv(path), EntityDictionary.load_for(path))
+                click.echo(f"✅ {name}: stored {rows} rows in {time.perf_counter() - started:.2f}s")
+    elif retentions:
+        store.save_config()
+
+    if plugin:
+        started = time.perf_counter()
+        result = store.read(plugin, start, stop, resolution, columns.split(',') if columns else None)
+        click.echo(f"⏱️ {len(result)} rows from the {store.tier_for(resolution)} tier in "
+                   f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        if output:
+            result.to_csv(output, index=False)
+            click.echo(f"✅ Written to {output}")
+    else:
+        click.echo(store.summary().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import click
+import numpy as np
+import pandas as pd
+
+# Leading columns of every query-influxdb export, the series tags follow in alphabetical order
+RESULT_COLS = ['result', 'table', '_start', '_stop', '_time', '_value', '_field', '_measurement']
+COMPUTATIONAL = 'computational_measurements'
+ENERGY = 'energy_measurements'
+
+CLUSTER, RACK, K8S_SERVER = 'flux', 'r4', 'Neuronet-Cluster'
+KEPLER_URL = 'http://10.255.40.9:30118/metrics'
+NAMESPACES = ['kube-system', 'knative-serving', 'kepler', 'monitoring', 'kubeflow', 'istio-system', 'cert-manager',
+              'default', 'longhorn-system', 'ingress-nginx', 'kserve', 'neuronet', 'argo', 'minio']
+GIB = 1024 ** 3
+
+# Offset of the first sample of every plugin after the range start, as in the real exports
+PHASES = {'k8s': 18, 'kepler': 0, 'pdu': 31, 'proxmox': 51, 'scaphandre_host': 1, 'scaphandre_vm': 0}
+
+# A group of series sharing their tag columns: the tags of each entity and {field: (measurement, values[time, entity])}
+SeriesGroup = Tuple[pd.DataFrame, Dict[str, Tuple[str, np.ndarray]]]
+
+
+class TelemetryGenerator:
+    """Generate raw exports of all five plugins in the long format query-influxdb writes.
+
+    The topology has `servers` Proxmox servers with `vms_per_server` VMs each, half of them k8s nodes
+    (vm_name contains 'k8s') running `pods` pods of `containers_per_pod` containers; `scale` multiplies
+    the servers and the pods. Every entity follows a smooth daily load with noise, and the plugins are
+    derived from it consistently: Kepler power follows container CPU, Scaphandre VM power follows the VM
+    cpuload, the host power is the sum of its VMs plus idle power and the PDU outlets see the host power
+    plus PSU losses. Counters only increase, across chunks too.
+
+    Files are written in chunks of about `chunk_rows` rows, so the rows are ordered by time chunk, then
+    by table (series), then by time; the processors do not depend on the row order.
+    """
+
+    def __init__(self, servers: int = 4, vms_per_server: int = 4, pods: int = 40, containers_per_pod: int = 2,
+                 start: str = '2025-08-04T06:00:00Z', duration: str = '1h', interval: str = '60s', scale: int = 1,
+                 seed: int = 42, chunk_rows: int = 1_000_000):
+        if scale < 1 or servers < 1 or vms_per_server < 2 or pods < 1 or containers_per_pod < 1:
+            raise ValueError("scale, servers, pods and containers_per_pod must be >= 1 and vms_per_server >= 2")
+        self.n_servers = servers * scale
+        self.vms_per_server = vms_per_server
+        self.n_pods = pods * scale
+        self.containers_per_pod = containers_per_pod
+        self.start = pd.Timestamp(start).tz_convert('UTC') if pd.Timestamp(start).tzinfo else pd.Timestamp(start, tz='UTC')
+        self.stop = self.start + pd.Timedelta(duration)
+        self.interval = pd.Timedelta(interval)
+        self.chunk_rows = chunk_rows
+        self.rng = np.random.default_rng(seed)
+        # Running value of every counter, keyed by plugin/field, carried from one chunk to the next
+        self.counters: Dict[str, np.ndarray] = {}
+        self.build_topology()
+
+    def load_params(self, n: int, base: Tuple[float, float]) -> pd.DataFrame:
+        """Parameters of the daily load of `n` entities: base level, amplitude, period and phase."""
+        return pd.DataFrame({
+            'load_base': self.rng.uniform(*base, n),
+            'load_amp': self.rng.uniform(0.05, 0.3, n),
+            'load_period': self.rng.choice([3600.0, 6 * 3600.0, 24 * 3600.0], n),
+            'load_phase': self.rng.uniform(0, 2 * np.pi, n),
+        })
+
+    def build_topology(self):
+        rng = self.rng
+        self.servers = pd.DataFrame({'server': [f'flux-node{i + 1}' for i in range(self.n_servers)]})
+        self.servers['idle_w'] = rng.uniform(45, 60, self.n_servers)
+
+        n_vms = self.n_servers * self.vms_per_server
+        vms = self.load_params(n_vms, (0.1, 0.5))
+        vms['server_idx'] = np.repeat(np.arange(self.n_servers), self.vms_per_server)
+        vms['server'] = self.servers['server'].to_numpy()[vms['server_idx']]
+        vms['vm_id'] = 100 + np.arange(n_vms)
+        vms['k8s'] = np.tile(np.arange(self.vms_per_server) < (self.vms_per_server + 1) // 2, self.n_servers)
+        vms['vm_name'] = np.where(vms['k8s'], 'neuronet-k8s-w', 'neuronet-vm') + (np.arange(n_vms) + 1).astype(str)
+        vms['cores'] = rng.choice([2, 4, 8], n_vms)
+        vms['mem_total'] = rng.choice([4, 8, 16, 32], n_vms) * GIB
+        vms['disk_total'] = rng.choice([32, 64, 128], n_vms) * GIB
+        vms['disk_used_fraction'] = rng.uniform(0.1, 0.6, n_vms)
+        vms['uptime0'] = rng.integers(3600, 90 * 86400, n_vms)
+        vms['uuid'] = [f'{u[:8]}-{u[8:12]}-{u[12:16]}-{u[16:20]}-{u[20:32]}' for u in self.hex_ids(n_vms, 32)]
+        self.vms = vms
+
+        # The k8s VMs are the cluster nodes, pods are spread round-robin over nodes and namespaces
+        nodes = vms.loc[vms['k8s'], ['vm_name', 'mem_total', 'cores']].reset_index(drop=True)
+        nodes['fs_capacity'] = 62241562624
+        self.nodes = nodes
+        pods = pd.DataFrame({'node_idx': np.arange(self.n_pods) % len(nodes),
+                             'namespace': np.array(NAMESPACES)[np.arange(self.n_pods) % len(NAMESPACES)]})
+        apps = [f'app{i}' for i in range(self.n_pods)]
+        pods['app'] = apps
+        pods['pod_name'] = [f'{app}-{h[:9]}-{h[9:14]}' for app, h in zip(apps, self.hex_ids(self.n_pods, 14))]
+        pods['node_name'] = nodes['vm_name'].to_numpy()[pods['node_idx']]
+        self.pods = pods
+
+        n_containers = self.n_pods * self.containers_per_pod
+        containers = self.load_params(n_containers, (0.05, 0.6))
+        containers['pod_idx'] = np.repeat(np.arange(self.n_pods), self.containers_per_pod)
+        pod = pods.iloc[containers['pod_idx']].reset_index(drop=True)
+        suffix = np.tile(np.array([''] + [f'-sidecar{i}' for i in range(1, self.containers_per_pod)]), self.n_pods)
+        containers['container_name'] = pod['app'] + suffix
+        for col in ['namespace', 'pod_name', 'node_name', 'node_idx']:
+            containers[col] = pod[col]
+        containers['container_id'] = self.hex_ids(n_containers, 64)
+        containers['cores'] = np.clip(rng.lognormal(-2.0, 1.0, n_containers), 0.001, 4.0)
+        containers['mem_bytes'] = np.clip(rng.lognormal(np.log(150e6), 1.0, n_containers), 5e6, 8e9)
+        containers['logs_bytes'] = rng.lognormal(np.log(40e3), 1.0, n_containers)
+        self.containers = containers
+
+    def hex_ids(self, n: int, length: int) -> List[str]:
+        digits = self.rng.integers(0, 16, (n, length))
+        return [''.join(row) for row in np.array(list('0123456789abcdef'))[digits]]
+
+    def load(self, params: pd.DataFrame, t: np.ndarray, noise: float = 0.05) -> np.ndarray:
+        """Load in [0, 1] of every entity (columns) at the epoch seconds `t` (rows)."""
+        smooth = params['load_base'].to_numpy() + params['load_amp'].to_numpy() * np.sin(
+            2 * np.pi * t[:, None] / params['load_period'].to_numpy() + params['load_phase'].to_numpy())
+        return np.clip(smooth + self.rng.normal(0, noise, smooth.shape), 0, 1)
+
+    def counter(self, key: str, increments: np.ndarray, initial: np.ndarray) -> np.ndarray:
+        """Cumulative counter over the rows of `increments`, continuing from the previous chunk."""
+        values = self.counters.get(key, initial) + np.cumsum(increments, axis=0)
+        self.counters[key] = values[-1]
+        return values
+
+    @staticmethod
+    def per_parent(values: np.ndarray, parent_idx: np.ndarray, n_parents: int) -> np.ndarray:
+        """Sum the columns of `values` by parent (containers by node, VMs by server)."""
+        out = np.zeros((len(values), n_parents))
+        np.add.at(out.T, parent_idx, values.T)
+        return out
+
+    def times(self, plugin: str, interval: pd.Timedelta) -> pd.DatetimeIndex:
+        first = self.start + pd.Timedelta(seconds=PHASES[plugin])
+        return pd.date_range(first, self.stop - pd.Timedelta(seconds=1), freq=interval)
+
+    # --- Plugins: each returns the series groups of one chunk of timestamps -----------------------------------
+
+    def k8s(self, t: np.ndarray, dt: float) -> List[SeriesGroup]:
+        c, nodes, pods = self.containers, self.nodes, self.pods
+        n_steps, n_c = len(t), len(c)
+        load = self.load(c, t)
+        nanocores = load * c['cores'].to_numpy() * 1e9
+        memory = c['mem_bytes'].to_numpy() * (0.8 + 0.2 * load)
+        logs = c['logs_bytes'].to_numpy() + self.counter('k8s/logs', np.full((n_steps, n_c), 20.0 * dt), 0.0)
+        node_used = 0.35 * nodes['fs_capacity'].to_numpy() + self.per_parent(logs, c['node_idx'].to_numpy(), len(nodes))
+        capacity = nodes['fs_capacity'].to_numpy()[c['node_idx']]
+        available = (capacity - node_used[:, c['node_idx']])
+        faults = self.rng.poisson(load * 50 * dt)
+        container_fields = {
+            'cpu_usage_core_nanoseconds': self.counter('k8s/cpu', nanocores * dt, self.rng.uniform(1e12, 1e14, n_c)),
+            'cpu_usage_nanocores': nanocores,
+            'logsfs_available_bytes': available,
+            'logsfs_capacity_bytes': np.broadcast_to(capacity, (n_steps, n_c)),
+            'logsfs_used_bytes': logs,
+            'memory_major_page_faults': self.counter('k8s/major', self.rng.poisson(0.001 * dt, (n_steps, n_c)), 0),
+            'memory_page_faults': self.counter('k8s/faults', faults, self.rng.integers(0, 10 ** 7, n_c)),
+            'memory_rss_bytes': 0.7 * memory,
+            'memory_usage_bytes': memory,
+            'memory_working_set_bytes': 0.9 * memory,
+            'rootfs_available_bytes': available,
+            'rootfs_capacity_bytes': np.broadcast_to(capacity, (n_steps, n_c)),
+            'rootfs_used_bytes': np.broadcast_to(np.full(n_c, 24576.0), (n_steps, n_c)),
+        }
+
+        n_p = len(pods)
+        pod_load = self.per_parent(load, c['pod_idx'].to_numpy(), n_p) / self.containers_per_pod
+        pod_capacity = nodes['fs_capacity'].to_numpy()[pods['node_idx']]
+        pod_used = self.counter('k8s/pod_fs', np.full((n_steps, n_p), 5.0 * dt), 8192.0)
+        pod_fields = {
+            'available_bytes': pod_capacity - pod_used,
+            'capacity_bytes': np.broadcast_to(pod_capacity, (n_steps, n_p)),
+            'rx_bytes': self.counter('k8s/rx', pod_load * 2e4 * dt, self.rng.uniform(1e6, 1e10, n_p)),
+            'rx_errors': np.zeros((n_steps, n_p)),
+            'tx_bytes': self.counter('k8s/tx', pod_load * 1e4 * dt, self.rng.uniform(1e6, 1e10, n_p)),
+            'tx_errors': np.zeros((n_steps, n_p)),
+            'used_bytes': pod_used,
+        }
+
+        n_n = len(nodes)
+        node_idx = c['node_idx'].to_numpy()
+        node_nanocores = self.per_parent(nanocores, node_idx, n_n) + 0.2e9
+        node_memory = self.per_parent(memory, node_idx, n_n) + 1.5 * GIB
+        node_rx = self.per_parent(pod_fields['rx_bytes'], pods['node_idx'].to_numpy(), n_n)
+        node_fields = {
+            'cpu_usage_core_nanoseconds': self.counter('k8s/node_cpu', node_nanocores * dt, self.rng.uniform(1e14, 1e16, n_n)),
+            'cpu_usage_nanocores': node_nanocores,
+            'fs_available_bytes': nodes['fs_capacity'].to_numpy() - node_used,
+            'fs_capacity_bytes': np.broadcast_to(nodes['fs_capacity'].to_numpy(), (n_steps, n_n)),
+            'fs_used_bytes': node_used,
+            'memory_available_bytes': nodes['mem_total'].to_numpy() - 0.9 * node_memory,
+            'memory_major_page_faults': self.counter('k8s/node_major', self.rng.poisson(0.01 * dt, (n_steps, n_n)), 0),
+            'memory_page_faults': self.counter('k8s/node_faults', self.per_parent(faults, node_idx, n_n), 10 ** 8),
+            'memory_rss_bytes': 0.7 * node_memory,
+            'memory_usage_bytes': node_memory,
+            'memory_working_set_bytes': 0.9 * node_memory,
+            'network_rx_bytes': node_rx,
+            'network_rx_errors': np.zeros((n_steps, n_n)),
+            'network_tx_bytes': 0.5 * node_rx,
+            'network_tx_errors': np.zeros((n_steps, n_n)),
+            'runtime_image_fs_available_bytes': nodes['fs_capacity'].to_numpy() - node_used,
+            'runtime_image_fs_capacity_bytes': np.broadcast_to(nodes['fs_capacity'].to_numpy(), (n_steps, n_n)),
+            'runtime_image_fs_used_bytes': np.broadcast_to(np.full(n_n, 6.5 * GIB), (n_steps, n_n)),
+        }
+
+        def tags(container_name, namespace, pod_name, node_name) -> pd.DataFrame:
+            return pd.DataFrame({'container_name': container_name, 'inventory-cluster-id': CLUSTER,
+                                 'inventory-rack-id': RACK, 'inventory-server-id': K8S_SERVER,
+                                 'namespace': namespace, 'node_name': node_name, 'plugin': 'k8s',
+                                 'pod_name': pod_name})
+
+        as_long = {name: values.round().astype('int64') for name, values in container_fields.items()}
+        return [
+            (tags(c['container_name'], c['namespace'], c['pod_name'], c['node_name']),
+             {name: (COMPUTATIONAL, values) for name, values in as_long.items()}),
+            (tags(None, pods['namespace'], pods['pod_name'], pods['node_name']),
+             {name: (COMPUTATIONAL, values.round().astype('int64')) for name, values in pod_fields.items()}),
+            (tags(None, None, None, nodes['vm_name']),
+             {name: (COMPUTATIONAL, values.round().astype('int64')) for name, values in node_fields.items()}),
+        ]
+
+    def kepler(self, t: np.ndarray, dt: float) -> List[SeriesGroup]:
+        c = self.containers
+        cores_used = self.load(c, t) * c['cores'].to_numpy()
+        watts = 0.3 + 9.0 * cores_used + 0.4 * c['mem_bytes'].to_numpy() / GIB
+        watts *= self.rng.normal(1, 0.03, watts.shape)
+        joules = self.counter('kepler/joules', watts * dt, self.rng.uniform(1e2, 1e5, len(c)))
+        tags = pd.DataFrame({'container_id': c['container_id'], 'container_name': c['container_name'],
+                             'inventory-cluster-id': CLUSTER, 'inventory-rack-id': RACK,
+                             'inventory-server-id': K8S_SERVER, 'namespace': c['namespace'], 'plugin': 'kepler',
+                             'pod_name': c['pod_name'], 'url': KEPLER_URL})
+        return [(tags, {'kepler_container_joules_total': (ENERGY, joules.round(3)),
+                        'kepler_container_microwatts_consumption_total': (ENERGY, (watts * 1e6).round())})]
+
+    def vm_power(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(load, watts) of every VM at `t`."""
+        load = self.load(self.vms, t)
+        watts = (1.5 + 6.0 * load * self.vms['cores'].to_numpy()) * self.rng.normal(1, 0.05, load.shape)
+        return load, watts
+
+    def host_power(self, t: np.ndarray) -> np.ndarray:
+        _, watts = self.vm_power(t)
+        return self.servers['idle_w'].to_numpy() + self.per_parent(watts, self.vms['server_idx'].to_numpy(), len(self.servers))
+
+    def proxmox(self, t: np.ndarray, dt: float) -> List[SeriesGroup]:
+        v = self.vms
+        n_steps, n_v = len(t), len(v)
+        load = self.load(v, t)
+        mem_total = np.broadcast_to(v['mem_total'].to_numpy().astype(float), (n_steps, n_v))
+        mem_used = mem_total * (0.45 + 0.4 * load)
+        disk_total = np.broadcast_to(v['disk_total'].to_numpy().astype(float), (n_steps, n_v))
+        disk_used = disk_total * v['disk_used_fraction'].to_numpy()
+        zeros = np.zeros((n_steps, n_v))
+        tags = pd.DataFrame({'inventory-cluster-id': CLUSTER, 'inventory-rack-id': RACK,
+                             'inventory-server-id': v['server'], 'node_fqdn': v['server'] + '.av.it.pt',
+                             'plugin': 'proxmox', 'status': 'running', 'vm_id': v['vm_id'], 'vm_name': v['vm_name']})
+        fields = {
+            'cpuload': load * 0.8,
+            'disk_free': disk_total - disk_used,
+            'disk_total': disk_total,
+            'disk_used': disk_used,
+            'disk_used_percentage': disk_used / disk_total * 100,
+            'mem_free': mem_total - mem_used,
+            'mem_total': mem_total,
+            'mem_used': mem_used.round(),
+            'mem_used_percentage': mem_used.round() / mem_total * 100,
+            'status': np.full((n_steps, n_v), 'running', dtype=object),
+            'swap_free': zeros,
+            'swap_total': zeros,
+            'swap_used': zeros,
+            'swap_used_percentage': zeros,
+            'uptime': v['uptime0'].to_numpy() + (t[:, None] - self.start.timestamp()),
+        }
+        return [(tags, {name: (COMPUTATIONAL, values) for name, values in fields.items()})]
+
+    def scaphandre_vm(self, t: np.ndarray, dt: float) -> List[SeriesGroup]:
+        v = self.vms
+        n_steps, n_v = len(t), len(v)
+        load, watts = self.vm_power(t)
+        memory = v['mem_total'].to_numpy() * (0.45 + 0.4 * load)
+        read = self.rng.exponential(2e5, (n_steps, n_v)) * load
+        write = self.rng.exponential(5e5, (n_steps, n_v)) * load
+        cmdline = [f'/usr/bin/kvm-id{vm_id}-name{name},debug-threads=on-no-shutdown-chardevsocket,id=qmp,'
+                   f'path=/var/run/qemu-server/{vm_id}.qmp,server=on,wait=off-pidfile/var/run/qemu-server/{vm_id}.pid'
+                   f'-daemonize-smbiostype=1,uuid={uuid}-smp{cores},sockets=1,cores={cores},maxcpus={cores}'
+                   f'-m{mem // 1024 ** 2}-machinetype=pc+pve1'
+                   for vm_id, name, uuid, cores, mem in
+                   zip(v['vm_id'], v['vm_name'], v['uuid'], v['cores'], v['mem_total'])]
+        tags = pd.DataFrame({'cmdline': cmdline, 'exe': '/usr/bin/qemu-system-x86_64', 'granularity': 'host+process',
+                             'inventory-cluster-id': CLUSTER, 'inventory-rack-id': RACK, 'plugin': 'scaphandre',
+                             'system_type': 'kvm', 'url': 'http://' + v['server'] + '.av.it.pt:8080/metrics',
+                             'uuid': v['uuid'], 'vm_id': v['vm_id'], 'vm_name': v['vm_name']})
+        fields = {
+            'scaph_process_cpu_usage_percentage': (COMPUTATIONAL, (load * v['cores'].to_numpy() * 100 / 32).round(7)),
+            'scaph_process_disk_read_bytes': (COMPUTATIONAL, read.round()),
+            'scaph_process_disk_total_read_bytes': (COMPUTATIONAL, self.counter('scaph/read', read.round(), 1e9)),
+            'scaph_process_disk_total_write_bytes': (COMPUTATIONAL, self.counter('scaph/write', write.round(), 1e10)),
+            'scaph_process_disk_write_bytes': (COMPUTATIONAL, write.round()),
+            'scaph_process_memory_bytes': (COMPUTATIONAL, memory.round()),
+            'scaph_process_memory_virtual_bytes': (COMPUTATIONAL, (v['mem_total'].to_numpy() + 2.5 * GIB) * np.ones((n_steps, 1))),
+            'scaph_process_power_consumption_microwatts': (ENERGY, (watts * 1e6).round()),
+        }
+        return [(tags, fields)]
+
+    def scaphandre_host(self, t: np.ndarray, dt: float, server: int) -> List[SeriesGroup]:
+        name = self.servers['server'].iloc[server]
+        watts = self.host_power(t)[:, [server]] * self.rng.normal(1, 0.02, (len(t), 1))
+        tags = pd.DataFrame({'granularity': ['host+process'], 'inventory-cluster-id': CLUSTER, 'inventory-rack-id': RACK,
+                             'plugin': 'scaphandre', 'url': f'http://{name}.av.it.pt:8080/metrics'})
+        return [(tags, {'scaph_host_power_microwatts': (ENERGY, (watts * 1e6).round())})]
+
+    def pdu(self, t: np.ndarray, dt: float, server: int) -> List[SeriesGroup]:
+        name = self.servers['server'].iloc[server]
+        # Dual PSUs, one on each PDU, sharing the host load plus ~12% conversion losses
+        share = np.array([0.52, 0.48])
+        active = self.host_power(t)[:, [server]] * 1.12 * share * self.rng.normal(1, 0.02, (len(t), 2))
+        power_factor = np.clip(self.rng.normal(0.985, 0.004, active.shape), 0.9, 1.0)
+        apparent = active / power_factor
+        increments = active * dt / 3600
+        energy = self.counter(f'pdu/{server}', increments, self.rng.uniform(5e4, 2e5, 2))
+        # partialEnergy is the same meter, reset some time before the range
+        outlet, pdu = server % 24 + 1, 145 + 2 * (server // 24)
+        tags = pd.DataFrame({'inventory-rack-id': RACK, 'inventory-server-id': name, 'placement': ['left', 'right'],
+                             'plugin': 'pdu',
+                             'url': [f'https://192.168.88.{pdu + i}/rest/mbdetnrs/2.0/powerDistributions/1/outlets/'
+                                     f'{outlet}/measures' for i in range(2)]})
+        fields = {
+            'activePower': active,
+            'apparentPower': apparent,
+            'cumulatedEnergy': energy,
+            'current': apparent / 230,
+            'currentTHD': self.rng.normal(11, 1.5, active.shape),
+            'partialEnergy': self.counter(f'pdu/{server}/partial', increments, self.rng.uniform(1e2, 1e4, 2)),
+            'peakFactor': self.rng.normal(1.6, 0.03, active.shape),
+            'powerFactor': power_factor,
+            'reactivePower': -np.sqrt(np.maximum(apparent ** 2 - active ** 2, 0)),
+        }
+        return [(tags, {field: (ENERGY, values.round(3)) for field, values in fields.items()})]
+
+    # --- Writing ---------------------------------------------------------------------------------------------
+
+    def long_format(self, groups: List[SeriesGroup], times: pd.DatetimeIndex) -> pd.DataFrame:
+        """One chunk in the query-influxdb layout: one table per (field, entity) series, rows by time."""
+        time_text = np.asarray(times.strftime('%Y-%m-%d %H:%M:%S+00:00'), dtype=object)
+        n_steps, table, frames = len(times), 0, []
+        for tags, fields in groups:
+            n_entities, n_fields = len(tags), len(fields)
+            rows = n_fields * n_entities * n_steps
+            # values[time, entity] -> entity-major, so every series is contiguous
+            values = [np.asarray(v).T.reshape(-1) for _, v in fields.values()]
+            frame = pd.DataFrame({
+                'result': '_result',
+                'table': table + np.repeat(np.arange(n_fields * n_entities), n_steps),
+                '_start': str(self.start),
+                '_stop': str(self.stop),
+                '_time': np.tile(time_text, n_fields * n_entities),
+                '_value': np.concatenate(values) if len({v.dtype for v in values}) == 1
+                else np.concatenate([v.astype(object) for v in values]),
+                '_field': np.repeat(np.array(list(fields), dtype=object), n_entities * n_steps),
+                '_measurement': np.repeat(np.array([m for m, _ in fields.values()], dtype=object), n_entities * n_steps),
+            }, index=pd.RangeIndex(rows))
+            tag_rows = tags.iloc[np.tile(np.repeat(np.arange(n_entities), n_steps), n_fields)].reset_index(drop=True)
+            frames.append(pd.concat([frame, tag_rows], axis=1))
+            table += n_fields * n_entities
+        columns = RESULT_COLS + sorted(frames[0].columns.difference(RESULT_COLS))
+        return pd.concat(frames, ignore_index=True)[columns]
+
+    def write(self, path: str, plugin: str, series: Callable[[np.ndarray, float], List[SeriesGroup]],
+              interval: pd.Timedelta) -> int:
+        """Write one export file chunk by chunk, returning its number of rows."""
+        times = self.times(plugin, interval)
+        dt = interval.total_seconds()
+        rows, first, step = 0, 0, 1
+        while first < len(times):
+            chunk = times[first:first + step]
+            frame = self.long_format(series(chunk.asi8 / 1e9, dt), chunk)
+            frame.to_csv(path, mode='w' if first == 0 else 'a', header=first == 0, index=False)
+            if first == 0:
+                # The first chunk is one timestamp, size the others from its rows
+                step = max(1, self.chunk_rows // max(len(frame), 1))
+            rows += len(frame)
+            first += len(chunk)
+        return rows
+
+    def exports(self) -> Iterator[Tuple[str, str, Callable[[np.ndarray, float], List[SeriesGroup]], pd.Timedelta]]:
+        """(file prefix, plugin, series, interval) of every export, named as query-influxdb names them."""
+        yield 'k8s_Neuronet', 'k8s', self.k8s, self.interval
+        yield 'kepler_Neuronet', 'kepler', self.kepler, self.interval
+        for i, server in enumerate(self.servers['server']):
+            # The PDUs sample twice as often as the other plugins
+            yield f'pdu_{server}', 'pdu', lambda t, dt, i=i: self.pdu(t, dt, i), self.interval / 2
+        yield 'proxmox_neuronet', 'proxmox', self.proxmox, self.interval
+        for i, server in enumerate(self.servers['server']):
+            yield f'scaphandre_{server}', 'scaphandre_host', lambda t, dt, i=i: self.scaphandre_host(t, dt, i), self.interval
+        yield 'scaphandre_neuronet', 'scaphandre_vm', self.scaphandre_vm, self.interval
+
+    def generate(self, output_dir: str, log: Callable[[str], None] = print) -> pd.DataFrame:
+        """Write all exports to `output_dir`, returning the rows and size of every file."""
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = self.stop.strftime('%Y%m%d_%H%M%S')
+        summary = []
+        for prefix, plugin, series, interval in self.exports():
+            started = time.perf_counter()
+            path = os.path.join(output_dir, f'{prefix}_{stamp}.csv')
+            rows = self.write(path, plugin, series, interval)
+            summary.append({'file': os.path.basename(path), 'plugin': plugin, 'rows': rows,
+                            'mb': os.path.getsize(path) / 1024 ** 2, 'seconds': time.perf_counter() - started})
+        summary = pd.DataFrame(summary)
+        log(f"✅ {len(summary)} exports, {summary['rows'].sum()} rows ({summary['mb'].sum():.1f} MB) in {output_dir}")
+        return summary
+
+
+@click.command()
+@click.option('--output-dir', required=True, help='Directory the raw CSV exports are written to')
+@click.option('--servers', default=4, show_default=True, help='Proxmox servers (each with a Scaphandre host and two PDU outlets)')
+@click.option('--vms-per-server', default=4, show_default=True, help='VMs per server, half of them k8s nodes')
+@click.option('--pods', default=40, show_default=True, help='k8s pods, spread over the k8s nodes')
+@click.option('--containers-per-pod', default=2, show_default=True, help='Containers per pod')
+@click.option('--scale', default=1, show_default=True, help='Multiply the servers and pods')
+@click.option('--start', default='2025-08-04T06:00:00Z', show_default=True, help='Range start')
+@click.option('--duration', default='1h', show_default=True, help='Range length (pandas Timedelta)')
+@click.option('--interval', default='60s', show_default=True, help='Sampling interval, the PDUs sample at half of it')
+@click.option('--seed', default=42, show_default=True, help='Random seed')
+def main(output_dir, servers, vms_per_server, pods, containers_per_pod, scale, start, duration, interval, seed):
+    """Generate realistic raw exports of the k8s, Kepler, PDU, Proxmox and Scaphandre plugins."""
+    generator = TelemetryGenerator(servers=servers, vms_per_server=vms_per_server, pods=pods,
+                                   containers_per_pod=containers_per_pod, start=start, duration=duration,
+                                   interval=interval, scale=scale, seed=seed)
+    summary = generator.generate(output_dir, log=click.echo)
+    click.echo(summary.round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
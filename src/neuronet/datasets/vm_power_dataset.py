@@ -1,16 +1,77 @@
+from typing import List, Optional
+
 import pandas as pd
 
+from neuronet.datasets.memory import StageMemoryReport
+from neuronet.preprocessing.entities import EntityDictionary
+
 class VmPowerDatasetBuilder:
-    def __init__(self, proxmox_df: pd.DataFrame, scaphandre_vm_df: pd.DataFrame, interval='1min'):
-        self.proxmox_df = proxmox_df.copy()
-        # keep only k8s VMs
-        self.proxmox_df = self.proxmox_df[self.proxmox_df['vm_name'].str.contains('k8s', na=False)]
-        self.scaphandre_vm_df = scaphandre_vm_df.copy()
-        # keep only k8s VMs
-        self.scaphandre_vm_df = self.scaphandre_vm_df[self.scaphandre_vm_df['vm_name'].str.contains('k8s', na=False)]
+    # Stored plugins for proxmox_df and scaphandre_vm_df (TimeSeriesStore.builder)
+    store_plugins = ['proxmox', 'scaphandre_vm']
+
+    # Aggregation of the Scaphandre numeric columns by _time and vm_id
+    scaphandre_agg_cols = {
+        'scaph_process_cpu_usage_percentage': 'mean',
+        'scaph_process_disk_read_bytes': 'sum',
+        'scaph_process_disk_total_read_bytes': 'sum',
+        'scaph_process_disk_total_write_bytes': 'sum',
+        'scaph_process_disk_write_bytes': 'sum',
+        'scaph_process_memory_bytes': 'mean',
+        'scaph_process_memory_virtual_bytes': 'mean',
+        'scaph_process_power_consumption_microwatts': 'sum'
+    }
+    # Relevant Proxmox columns — all numeric plus vm_id and _time
+    prox_cols = [
+        '_time', 'vm_id', 'cpuload', 'disk_free', 'disk_total', 'disk_used', 'disk_used_percentage',
+        'mem_free', 'mem_total', 'mem_used', 'mem_used_percentage',
+        'swap_free', 'swap_total', 'swap_used', 'swap_used_percentage',
+        'uptime', 'disk_free_gb', 'disk_total_gb', 'disk_used_gb', 'disk_usage_percent'
+    ]
+
+    # Every row belongs to exactly one VM, used to shard the inputs for parallel builds
+    entity_keys = ['vm_id']
+
+    # Build stages, run in order by build()
+    stages = ['preprocess_time', 'aggregate_scaphandre', 'join_data', 'engineer_features', 'decode_entities']
+
+    def __init__(self, proxmox_df: pd.DataFrame, scaphandre_vm_df: pd.DataFrame, interval='1min', copy: bool = True,
+                 passthrough_cols: Optional[List[str]] = None, entities: Optional[EntityDictionary] = None):
+        # Extra Proxmox columns carried unchanged to the output
+        self.passthrough_cols = passthrough_cols or []
+        # Dictionary the processors encoded vm_name & co. with, the joins then run on integer ids
+        self.entities = entities
+        # copy=False borrows the inputs: only the needed columns of the k8s VMs are projected up front, the
+        # inputs are never modified and the frame memory held after each stage is recorded in memory_report
+        self.copy = copy
+        self.memory_report = StageMemoryReport() if not copy else None
+        if copy:
+            self.proxmox_df = proxmox_df.copy()
+            # keep only k8s VMs
+            self.proxmox_df = self.proxmox_df[self.k8s_vms(self.proxmox_df)]
+            self.scaphandre_vm_df = scaphandre_vm_df.copy()
+            # keep only k8s VMs
+            self.scaphandre_vm_df = self.scaphandre_vm_df[self.k8s_vms(self.scaphandre_vm_df)]
+        else:
+            self.proxmox_df = proxmox_df.loc[
+                self.k8s_vms(proxmox_df), self.prox_cols + self.passthrough_cols
+            ]
+            scaph_cols = ['_time', 'vm_id'] + list(self.scaphandre_agg_cols)
+            self.scaphandre_vm_df = scaphandre_vm_df.loc[
+                self.k8s_vms(scaphandre_vm_df), scaph_cols
+            ]
         self.interval = interval
         self.dataset = None
 
+    def k8s_vms(self, df: pd.DataFrame) -> pd.Series:
+        """Mask of the rows of k8s VMs, matched on the dictionary names when vm_name holds ids."""
+        if self.entities is not None and pd.api.types.is_numeric_dtype(df['vm_name']):
+            return df['vm_name'].isin(self.entities.ids_matching('k8s'))
+        return df['vm_name'].str.contains('k8s', na=False)
+
+    def record_memory(self, stage: str):
+        if self.memory_report is not None:
+            self.memory_report.record(stage, self.proxmox_df, self.scaphandre_vm_df, self.dataset)
+
     def preprocess_time(self):
         for df in [self.proxmox_df, self.scaphandre_vm_df]:
             df['_time'] = pd.to_datetime(df['_time'])
@@ -18,39 +79,26 @@ class VmPowerDatasetBuilder:
 
     def aggregate_scaphandre(self):
         # Aggregate all relevant Scaphandre numeric columns by _time and vm_id
-        agg_cols = {
-            'scaph_process_cpu_usage_percentage': 'mean',
-            'scaph_process_disk_read_bytes': 'sum',
-            'scaph_process_disk_total_read_bytes': 'sum',
-            'scaph_process_disk_total_write_bytes': 'sum',
-            'scaph_process_disk_write_bytes': 'sum',
-            'scaph_process_memory_bytes': 'mean',
-            'scaph_process_memory_virtual_bytes': 'mean',
-            'scaph_process_power_consumption_microwatts': 'sum'
-        }
         self.scaphandre_vm_df = (
             self.scaphandre_vm_df
             .groupby(['_time', 'vm_id'], as_index=False)
-            .agg(agg_cols)
+            .agg(self.scaphandre_agg_cols)
         )
 
     def join_data(self):
-        # Select relevant Proxmox columns — all numeric plus vm_id and _time
-        prox_cols = [
-            '_time', 'vm_id', 'cpuload', 'disk_free', 'disk_total', 'disk_used', 'disk_used_percentage',
-            'mem_free', 'mem_total', 'mem_used', 'mem_used_percentage',
-            'swap_free', 'swap_total', 'swap_used', 'swap_used_percentage',
-            'uptime', 'disk_free_gb', 'disk_total_gb', 'disk_used_gb', 'disk_usage_percent'
-        ]
-        prox_clean = self.proxmox_df[prox_cols].dropna()
+        # Borrowed inputs are already projected to prox_cols
+        prox_cols = self.prox_cols + self.passthrough_cols
+        prox_clean = (self.proxmox_df[prox_cols] if self.copy else self.proxmox_df).dropna()
 
         # Merge
         merged = pd.merge(prox_clean, self.scaphandre_vm_df, on=['_time', 'vm_id'], how='inner')
+        if not self.copy:
+            self.proxmox_df = self.scaphandre_vm_df = None
 
         self.dataset = merged
 
     def engineer_features(self):
-        df = self.dataset.copy()
+        df = self.dataset.copy() if self.copy else self.dataset
 
         # Convert uptime seconds to hours
         df['uptime_hours'] = df['uptime'] / 3600
@@ -70,11 +118,16 @@ class VmPowerDatasetBuilder:
         # Keep _time and vm_id for reference, all Proxmox numeric cols, all Scaphandre numeric cols, and engineered features
         self.dataset = df.dropna()
 
+    def decode_entities(self):
+        """Turn entity id columns back into names when the inputs were encoded with an EntityDictionary."""
+        if self.entities is not None:
+            self.entities.decode(self.dataset)
+
     def build(self) -> pd.DataFrame:
-        self.preprocess_time()
-        self.aggregate_scaphandre()
-        self.join_data()
-        self.engineer_features()
+        self.record_memory('input')
+        for stage in self.stages:
+            getattr(self, stage)()
+            self.record_memory(stage)
         return self.dataset
 
 if __name__ == "__main__":
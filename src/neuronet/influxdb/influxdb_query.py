@@ -1,18 +1,66 @@
 from pathlib import Path
+from types import SimpleNamespace
 
 import click
 import os
-import pandas as pd
-from influxdb_client import InfluxDBClient
+import time
 from datetime import datetime
-from dotenv import load_dotenv
 
-load_dotenv()
+from neuronet.influxdb.metrics import FetchMetrics
+
+# pandas, influxdb_client and dotenv are imported on the code paths that use them, so `--help`, importing
+# build_query and the in-process fetch from the pipeline components do not pay for them up front
 
 ALL_PLUGINS = ["proxmox", "pdu", "scaphandre", "k8s", "kepler"]
 
-def get_inventory_ids(url, token, org, bucket, range, vm_name_filter):
-    """Query Proxmox data to extract unique inventory-server-id values."""
+
+def load_env():
+    """Load a .env file into the environment (e.g. INFLUXDB_TOKEN), once per process."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def make_client(url, token, org, retries=0):
+    """InfluxDB client retrying failed connections and 429/5xx answers `retries` times with exponential backoff."""
+    from influxdb_client import InfluxDBClient
+    from urllib3 import Retry
+
+    # allowed_methods=None: the Flux queries are POSTs, which urllib3 does not retry by default
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=None)
+    return InfluxDBClient(url=url, token=token, org=org, retries=retry)
+
+
+def fetch(query_api, flux_query, query, retries=0):
+    """Run a Flux query and parse its tables, filling latency, bytes, retries and parse time of the `query` record."""
+    from influxdb_client.client.flux_csv_parser import FluxCsvParser, FluxSerializationMode
+    from urllib3.exceptions import MaxRetryError
+
+    started = time.perf_counter()
+    try:
+        response = query_api.query_raw(flux_query)
+    except MaxRetryError:
+        query['retries'] = retries
+        raise
+    try:
+        body = response.data
+    finally:
+        response.release_conn()
+    query['latency_s'] = time.perf_counter() - started
+    query['bytes'] = len(body)
+    query['retries'] = len(response.retries.history) if response.retries is not None else 0
+
+    # Parsed from the buffered body, so the parse time does not include the transfer
+    started = time.perf_counter()
+    parser = FluxCsvParser(response=SimpleNamespace(closed=True, data=body, close=lambda: None),
+                           serialization_mode=FluxSerializationMode.tables)
+    list(parser.generator())
+    query['parse_s'] = time.perf_counter() - started
+    return parser.table_list()
+
+
+def get_inventory_ids(url, token, org, bucket, range, vm_name_filter, retries=0, metrics=None, plugin=None, field=None):
+    """Query Proxmox data to extract unique inventory-server-id values (the lookup is labelled with `plugin` in `metrics`)."""
     flux_query = f'''
     from(bucket: "{bucket}")
       |> range({range})
@@ -21,18 +69,21 @@ def get_inventory_ids(url, token, org, bucket, range, vm_name_filter):
         r.plugin == "proxmox")
     '''
 
-    client = InfluxDBClient(url=url, token=token, org=org)
+    client = make_client(url, token, org, retries)
     query_api = client.query_api()
     inventory_ids = set()
+    metrics = metrics if metrics is not None else FetchMetrics()
 
     try:
         click.echo(f"🔄 Running query to get inventory IDs: {flux_query.strip()}")
-        result = query_api.query(flux_query)
-        for table in result:
-            for record in table.records:
-                inv_id = record.values.get("inventory-server-id")
-                if inv_id and inv_id.strip():
-                    inventory_ids.add(inv_id.strip())
+        with metrics.query(plugin or "proxmox", field, kind="inventory") as query:
+            result = fetch(query_api, flux_query, query, retries)
+            for table in result:
+                query['rows'] += len(table.records)
+                for record in table.records:
+                    inv_id = record.values.get("inventory-server-id")
+                    if inv_id and inv_id.strip():
+                        inventory_ids.add(inv_id.strip())
     except Exception as e:
         click.echo(f"⚠️ Error while retrieving inventory IDs: {e}")
     finally:
@@ -40,9 +91,8 @@ def get_inventory_ids(url, token, org, bucket, range, vm_name_filter):
 
     return sorted(inventory_ids)
 
-def run_query(url, token, org, bucket, range, plugin, field=None, inventory_id=None, vm_name_filter=None,
-              url_match=None, output_dir="data"):
-    """Run a query for one inventory ID and save to file."""
+def build_query(bucket, range, plugin, field=None, inventory_id=None, vm_name_filter=None, url_match=None):
+    """Build the Flux query of one plugin, returning it with the inventory ID it filters on."""
     flux_query = f'''
     from(bucket: "{bucket}")
         |> range({range})
@@ -63,19 +113,37 @@ def run_query(url, token, org, bucket, range, plugin, field=None, inventory_id=N
     if url_match and field:
         flux_query += f'''  |> filter(fn: (r) => r.url =~ /{url_match}/)\n'''
 
-    client = InfluxDBClient(url=url, token=token, org=org)
+    return flux_query, inventory_id
+
+
+def run_query(url, token, org, bucket, range, plugin, field=None, inventory_id=None, vm_name_filter=None,
+              url_match=None, output_dir="data", retries=0, metrics=None):
+    """Run a query for one inventory ID and save to file, returning the file written (None without data).
+
+    The latency, bytes, rows, parse time, retries and error of the query are recorded in `metrics` (a FetchMetrics).
+    """
+    import pandas as pd
+
+    flux_query, inventory_id = build_query(bucket, range, plugin, field, inventory_id, vm_name_filter, url_match)
+
+    client = make_client(url, token, org, retries)
     query_api = client.query_api()
+    metrics = metrics if metrics is not None else FetchMetrics()
 
     click.echo(f"🔄 Running query: {flux_query.strip()}")
 
     try:
-        result = query_api.query(flux_query)
-        records = []
-        for table in result:
-            for record in table.records:
-                records.append(record.values)
+        with metrics.query(plugin, field, inventory_id) as query:
+            result = fetch(query_api, flux_query, query, retries)
+            started = time.perf_counter()
+            records = []
+            for table in result:
+                for record in table.records:
+                    records.append(record.values)
 
-        df = pd.DataFrame(records)
+            df = pd.DataFrame(records)
+            query['rows'] = len(df)
+            query['parse_s'] += time.perf_counter() - started
         if df.empty:
             click.echo(f"⚠️ No data for {inventory_id}")
             return
@@ -86,6 +154,7 @@ def run_query(url, token, org, bucket, range, plugin, field=None, inventory_id=N
         filename = output_path / f"{plugin}_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         df.to_csv(filename, index=False)
         click.echo(f"✅ Saved data for {name} to {filename}")
+        return filename
 
     except Exception as e:
         click.echo(f"❌ Error querying for {inventory_id}: {e}")
@@ -94,16 +163,18 @@ def run_query(url, token, org, bucket, range, plugin, field=None, inventory_id=N
         client.close()
 
 def run_plugin(plugin, field=None, url=None, token=None, org=None, bucket=None, range=None, vm_name_filter=None,
-               output_dir="data"):
+               output_dir="data", retries=0, metrics=None):
+    """Run the queries of one plugin (one per inventory ID for the PDU and Scaphandre host data), returning the files written."""
     # First extract inventory IDs using Proxmox
-    inventory_ids = get_inventory_ids(url, token, org, bucket, range, vm_name_filter)
+    inventory_ids = get_inventory_ids(url, token, org, bucket, range, vm_name_filter, retries, metrics, plugin, field)
     if not inventory_ids:
         click.echo("❌ No inventory-server-id found.")
-        return
+        return []
 
+    files = []
     if (plugin == "scaphandre" and field) or plugin == "pdu":
         for inv_id in inventory_ids:
-            run_query(
+            files.append(run_query(
                 url=url,
                 token=token,
                 org=org,
@@ -113,10 +184,12 @@ def run_plugin(plugin, field=None, url=None, token=None, org=None, bucket=None,
                 field=field,
                 inventory_id=inv_id,
                 url_match=inv_id,
-                output_dir=output_dir
-            )
+                output_dir=output_dir,
+                retries=retries,
+                metrics=metrics
+            ))
     else:
-        run_query(
+        files.append(run_query(
             url=url,
             token=token,
             org=org,
@@ -125,8 +198,34 @@ def run_plugin(plugin, field=None, url=None, token=None, org=None, bucket=None,
             plugin=plugin,
             field=field,
             vm_name_filter=vm_name_filter,
-            output_dir=output_dir
-        )
+            output_dir=output_dir,
+            retries=retries,
+            metrics=metrics
+        ))
+    return [f for f in files if f is not None]
+
+
+def query_plugins(plugins, token=None, range='start: -10m', url='http://10.255.40.16:8086', org='nextworks',
+                  bucket='monitoring', vm_name_filter='^neuronet-', output_dir='data', retries=2, metrics=None):
+    """Fetch the given plugins ("all" for every plugin) to CSV files in `output_dir`, as `query-influxdb` does.
+
+    Meant to be called in-process (e.g. from the get_data components) instead of running the CLI per plugin;
+    returns the files written. Pass a FetchMetrics as `metrics` to collect the per-query measurements.
+    """
+    if not token:
+        load_env()
+        token = os.getenv('INFLUXDB_TOKEN')
+    if isinstance(plugins, str):
+        plugins = ALL_PLUGINS if plugins == "all" else [plugins]
+
+    files = []
+    for plg in plugins:
+        click.echo(f"🔄 Running queries for plugin: {plg}")
+        fields = [None, "scaph_host_power_microwatts"] if plg == "scaphandre" else [None]
+        for field in fields:
+            files += run_plugin(plg, field=field, url=url, token=token, org=org, bucket=bucket, range=range,
+                                vm_name_filter=vm_name_filter, output_dir=output_dir, retries=retries, metrics=metrics)
+    return files
 
 
 @click.command()
@@ -138,7 +237,10 @@ def run_plugin(plugin, field=None, url=None, token=None, org=None, bucket=None,
 @click.option('--plugin', required=True, help='Plugin to filter by (e.g., proxmox, pdu, scaphandre) Use "all" to run all plugins.')
 @click.option('--vm-name-filter', default='^neuronet-', show_default=True, help='Optional regex filter for vm_name (e.g., ^neuronet-)')
 @click.option('--output-dir', default='data', show_default=True, help='Output directory to save output files (default: data)')
-def main(url, token, org, bucket, range, plugin, vm_name_filter, output_dir):
+@click.option('--retries', default=2, show_default=True, help='Retries of a query on connection errors and 429/5xx answers')
+@click.option('--metrics-json', default=None, help='Write the per-query fetch metrics and run summary to this JSON file')
+@click.option('--prometheus-textfile', default=None, help='Write the fetch metrics as a Prometheus textfile (e.g. for node_exporter)')
+def main(url, token, org, bucket, range, plugin, vm_name_filter, output_dir, retries, metrics_json, prometheus_textfile):
     """
     Query InfluxDB for data based on specified parameters and save results to CSV files.
 
@@ -151,20 +253,18 @@ def main(url, token, org, bucket, range, plugin, vm_name_filter, output_dir):
     - kepler: Queries Kepler data. e.g., "query-influxdb --plugin kepler"
     """
 
-    token = token or os.getenv('INFLUXDB_TOKEN')
-
-    plugins_to_run = ALL_PLUGINS if plugin == "all" else [plugin]
+    metrics = FetchMetrics()
+    query_plugins(plugin, token=token, range=range, url=url, org=org, bucket=bucket, vm_name_filter=vm_name_filter,
+                  output_dir=output_dir, retries=retries, metrics=metrics)
 
-    for plg in plugins_to_run:
-        click.echo(f"🔄 Running queries for plugin: {plg}")
-        if plg == "scaphandre":
-            run_plugin(plg, field=None, url=url, token=token, org=org, bucket=bucket, range=range,
-                       vm_name_filter=vm_name_filter, output_dir=output_dir)
-            run_plugin(plg, field="scaph_host_power_microwatts", url=url, token=token, org=org, bucket=bucket,
-                       range=range, vm_name_filter=vm_name_filter, output_dir=output_dir)
-        else:
-            run_plugin(plg, field=None, url=url, token=token, org=org, bucket=bucket, range=range,
-                       vm_name_filter=vm_name_filter, output_dir=output_dir)
+    summary = metrics.summary()
+    click.echo(f"📊 {summary['queries']} queries, {summary['errors']} errors, {summary['retries']} retries, "
+               f"{summary['bytes'] / 1e6:.1f} MB, {summary['rows']} rows, "
+               f"p95 latency {summary['latency_s']['p95']:.2f}s")
+    if metrics_json:
+        metrics.save_json(metrics_json)
+    if prometheus_textfile:
+        metrics.save_prometheus(prometheus_textfile)
 
 
 if __name__ == '__main__':
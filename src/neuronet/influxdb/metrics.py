@@ -0,0 +1,123 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+# Labels of every query record, in Prometheus label order
+LABELS = ['plugin', 'field', 'inventory_id', 'kind']
+# Per-query measurements exported to the textfile: record key -> (metric name, help)
+QUERY_METRICS = {
+    'latency_s': ('query_influxdb_query_latency_seconds', 'Time from sending the query to its last response byte'),
+    'bytes': ('query_influxdb_query_response_bytes', 'Bytes of annotated CSV received'),
+    'rows': ('query_influxdb_query_rows', 'Records parsed from the response'),
+    'parse_s': ('query_influxdb_query_parse_seconds', 'Time spent parsing the response into records and a DataFrame'),
+    'retries': ('query_influxdb_query_retries', 'HTTP retries before the response (or the failure)'),
+    'error': ('query_influxdb_query_errors', 'Whether the query failed (1) or not (0)'),
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class FetchMetrics:
+    """Latency, bytes, rows, parse time, retries and errors of every query of a query-influxdb run.
+
+    Records are plain dicts labelled by plugin, field, inventory ID and kind ('inventory' for the Proxmox
+    inventory lookup, 'data' for the exports), summarized to JSON and written as a Prometheus textfile.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.queries: List[Dict] = []
+
+    @contextmanager
+    def query(self, plugin: str, field: Optional[str] = None, inventory_id: Optional[str] = None,
+              kind: str = 'data') -> Iterator[Dict]:
+        """Record one query, the caller fills latency_s/bytes/rows/parse_s/retries; exceptions are recorded and re-raised."""
+        record = {'plugin': plugin, 'field': field or '', 'inventory_id': inventory_id or '', 'kind': kind,
+                  'started': time.time(), 'latency_s': 0.0, 'bytes': 0, 'rows': 0, 'parse_s': 0.0, 'retries': 0,
+                  'status': 'ok', 'error': None}
+        self.queries.append(record)
+        try:
+            yield record
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['elapsed_s'] = time.time() - record['started']
+            if record['status'] == 'ok' and record['rows'] == 0:
+                record['status'] = 'empty'
+
+    def summary(self) -> Dict:
+        """Run totals, latency percentiles and per-plugin totals, plus every query record."""
+        latencies = [q['latency_s'] for q in self.queries if q['status'] != 'error']
+        plugins: Dict[str, Dict] = {}
+        for q in self.queries:
+            totals = plugins.setdefault(q['plugin'], {'queries': 0, 'errors': 0, 'empty': 0, 'retries': 0, 'bytes': 0,
+                                                      'rows': 0, 'latency_s': 0.0, 'max_latency_s': 0.0,
+                                                      'parse_s': 0.0})
+            totals['queries'] += 1
+            totals['errors'] += q['status'] == 'error'
+            totals['empty'] += q['status'] == 'empty'
+            for key in ['retries', 'bytes', 'rows', 'latency_s', 'parse_s']:
+                totals[key] += q[key]
+            totals['max_latency_s'] = max(totals['max_latency_s'], q['latency_s'])
+        return {
+            'started': datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            'duration_s': time.time() - self.started,
+            'queries': len(self.queries),
+            'errors': sum(q['status'] == 'error' for q in self.queries),
+            'retries': sum(q['retries'] for q in self.queries),
+            'bytes': sum(q['bytes'] for q in self.queries),
+            'rows': sum(q['rows'] for q in self.queries),
+            'latency_s': {'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95),
+                          'max': max(latencies, default=0.0)},
+            'plugins': plugins,
+            'records': self.queries,
+        }
+
+    def save_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the run, one sample per query and metric."""
+        per_labels: Dict[tuple, Dict[str, float]] = {}
+        for q in self.queries:
+            values = per_labels.setdefault(tuple(q[label] for label in LABELS), dict.fromkeys(QUERY_METRICS, 0))
+            for key in QUERY_METRICS:
+                # Queries sharing all labels (e.g. the same inventory ID twice) add up
+                values[key] += (q['status'] == 'error') if key == 'error' else q[key]
+
+        lines = []
+        for key, (name, help_text) in QUERY_METRICS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for labels, values in per_labels.items():
+                label_text = ','.join(f'{label}="{escape(value)}"' for label, value in zip(LABELS, labels))
+                lines.append(f'{name}{{{label_text}}} {float(values[key])!r}')
+        summary = self.summary()
+        for name, help_text, value in [
+            ('query_influxdb_run_timestamp_seconds', 'Start of the last query-influxdb run', self.started),
+            ('query_influxdb_run_duration_seconds', 'Wall time of the last query-influxdb run', summary['duration_s']),
+            ('query_influxdb_run_queries', 'Queries of the last run', summary['queries']),
+            ('query_influxdb_run_errors', 'Failed queries of the last run', summary['errors']),
+        ]:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {float(value)!r}']
+        return '\n'.join(lines) + '\n'
+
+    def save_prometheus(self, path: str):
+        """Write the textfile atomically, as the node_exporter textfile collector expects."""
+        with open(f'{path}.tmp', 'w') as f:
+            f.write(self.prometheus())
+        os.replace(f'{path}.tmp', path)
@@ -0,0 +1,340 @@
+import io
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.preprocessing.sources import read_csv_files
+
+# Columns added by the Flux engine, not stored with the points
+RESULT_COLS = ['result', 'table', '_start', '_stop']
+POINT_COLS = ['_time', '_value', '_field', '_measurement']
+# Per-point rendering metadata kept next to the tags
+HIDDEN_COLS = ['_time_text', '_series', '_schema']
+VALUE_TYPES = ['string', 'double', 'long']
+
+DURATION_UNITS = {'ns': 1e-9, 'us': 1e-6, 'ms': 1e-3, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+# Nanoseconds per unit of the write API `precision` parameter
+PRECISION_NS = {'ns': 1, 'us': 1_000, 'ms': 1_000_000, 's': 1_000_000_000}
+
+
+def parse_time(value: str, now: pd.Timestamp) -> pd.Timestamp:
+    """Flux range bound: RFC3339, now() or a relative duration such as -10m or -1h30m."""
+    value = value.strip()
+    if value == 'now()':
+        return now
+    match = re.fullmatch(r'(-?)((?:\d+(?:ns|us|ms|s|m|h|d|w))+)', value)
+    if match:
+        seconds = sum(int(amount) * DURATION_UNITS[unit]
+                      for amount, unit in re.findall(r'(\d+)(ns|us|ms|s|m|h|d|w)', match.group(2)))
+        return now - pd.Timedelta(seconds=seconds) if match.group(1) else now + pd.Timedelta(seconds=seconds)
+    return pd.Timestamp(value).tz_convert('UTC') if pd.Timestamp(value).tzinfo else pd.Timestamp(value, tz='UTC')
+
+
+def parse_flux(flux: str, now: Optional[pd.Timestamp] = None) -> Tuple[pd.Timestamp, pd.Timestamp, List[Tuple[str, str, str]]]:
+    """Extract the range and the (column, operator, value) filters of the queries built by influxdb_query.
+
+    Supports `range(start:, stop:)` and filters made of `r.col == "v"` / `r["col"] =~ /re/`
+    predicates joined with `and`, which is everything run_query and get_inventory_ids generate.
+    """
+    now = now or pd.Timestamp.now(tz='UTC')
+    range_match = re.search(r'range\(([^)]*)\)', flux)
+    bounds = dict(re.findall(r'(start|stop)\s*:\s*([^,]+)', range_match.group(1))) if range_match else {}
+    start = parse_time(bounds['start'], now) if 'start' in bounds else pd.Timestamp.min.tz_localize('UTC')
+    stop = parse_time(bounds['stop'], now) if 'stop' in bounds else now
+
+    filters = []
+    for body in re.findall(r'filter\(fn:\s*\(r\)\s*=>(.*?)\)\s*(?:\||$)', flux, flags=re.S):
+        for column, column_quoted, op, literal, regex in re.findall(
+                r'r(?:\.([\w-]+)|\["([^"]+)"\])\s*(==|=~)\s*(?:"([^"]*)"|/((?:[^/\\]|\\.)*)/)', body):
+            filters.append((column or column_quoted, op, literal if op == '==' else regex))
+    return start, stop, filters
+
+
+def parse_bucket(flux: str) -> Optional[str]:
+    match = re.search(r'from\(\s*bucket\s*:\s*"([^"]+)"\s*\)', flux)
+    return match.group(1) if match else None
+
+
+def unescape(text: str) -> str:
+    return re.sub(r'\\([,= ])', r'\1', text)
+
+
+def parse_line_protocol(body: str, precision: str = 'ns', now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Points of a line protocol body, one row per field, in the long format of the query results."""
+    now = now or pd.Timestamp.now(tz='UTC')
+    rows = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = re.split(r'(?<!\\) ', line)
+        measurement, *tag_pairs = re.split(r'(?<!\\),', parts[0])
+        tags = dict(tuple(unescape(x) for x in re.split(r'(?<!\\)=', pair, maxsplit=1)) for pair in tag_pairs)
+        time = (pd.Timestamp(int(parts[2]) * PRECISION_NS[precision], unit='ns', tz='UTC')
+                if len(parts) > 2 else now)
+        for field in re.split(r'(?<!\\),', parts[1]):
+            key, value = re.split(r'(?<!\\)=', field, maxsplit=1)
+            if value.startswith('"'):
+                value = value[1:-1].replace('\\"', '"')
+            elif value.endswith(('i', 'u')):
+                value = int(value[:-1])
+            elif value in ('t', 'T', 'true', 'True', 'f', 'F', 'false', 'False'):
+                value = str(value[0] in 'tT').lower()
+            else:
+                value = float(value)
+            rows.append({'_time': time, '_value': value, '_field': unescape(key),
+                         '_measurement': unescape(measurement), **tags})
+    return pd.DataFrame(rows)
+
+
+def value_types(values: pd.Series) -> np.ndarray:
+    """Index in VALUE_TYPES of every value: long for integers, double for other numbers, else string."""
+    if pd.api.types.is_integer_dtype(values):
+        return np.full(len(values), VALUE_TYPES.index('long'))
+    if pd.api.types.is_float_dtype(values):
+        return np.full(len(values), VALUE_TYPES.index('double'))
+    is_integer = values.map(lambda v: isinstance(v, (int, np.integer)) and not isinstance(v, bool)).to_numpy(bool)
+    is_numeric = (pd.to_numeric(values, errors='coerce').notna() | values.isna()).to_numpy()
+    return np.where(is_integer, VALUE_TYPES.index('long'),
+                    np.where(is_numeric, VALUE_TYPES.index('double'), VALUE_TYPES.index('string')))
+
+
+def tag_columns(points: pd.DataFrame) -> List[str]:
+    return [c for c in points.columns if c not in POINT_COLS + HIDDEN_COLS]
+
+
+def format_time(values: pd.Series) -> pd.Series:
+    # Scrape timestamps repeat across every series, so only the distinct ones are formatted
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques).dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ').to_numpy()
+    return pd.Series(text[codes], index=values.index)
+
+
+def read_export(source: Union[str, IO[bytes]]) -> pd.DataFrame:
+    """Read a query-influxdb CSV keeping every column but `_value` as text."""
+    if not isinstance(source, str):
+        # Archive members are streamed once, buffer them to read the header first
+        source = io.BytesIO(source.read())
+    header = pd.read_csv(source, nrows=0).columns
+    if not isinstance(source, str):
+        source.seek(0)
+    frame = pd.read_csv(source, dtype={c: str for c in header if c != '_value'}, float_precision='round_trip')
+    # Value type per file before the concat upcasts integer fields (e.g. k8s counters) to float
+    frame['_kind'] = value_types(frame['_value'])
+    frame['_value'] = frame['_value'].astype(object)
+    return frame
+
+
+class InfluxStandIn:
+    """In-memory stand-in for the InfluxDB v2 query and write APIs over long-format points.
+
+    Points are rows with `_time`, `_value`, `_field`, `_measurement` and one column per tag, i.e.
+    the CSVs written by query-influxdb. Queries return annotated CSV with one table per series,
+    so the real influxdb_client (run_query, get_inventory_ids) can run against it unchanged.
+    Line protocol writes are kept per bucket; queries on any other bucket read the loaded points.
+    """
+
+    def __init__(self, points: pd.DataFrame):
+        self.lock = threading.Lock()
+        self.points = self.normalize(points)
+        # Points written through the write API, per bucket; other buckets read the loaded points
+        self.written: Dict[str, List[pd.DataFrame]] = {}
+        self.buckets: Dict[str, pd.DataFrame] = {}
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @staticmethod
+    def normalize(points: pd.DataFrame) -> pd.DataFrame:
+        points = points.drop(columns=[c for c in RESULT_COLS + HIDDEN_COLS if c in points.columns])
+        kind = points.pop('_kind').to_numpy() if '_kind' in points else value_types(points['_value'])
+        points['_time'] = pd.to_datetime(points['_time'], utc=True, format='mixed')
+        tags = [c for c in points.columns if c not in POINT_COLS]
+        points[tags] = points[tags].astype('string')
+
+        # Rendering metadata computed once instead of per query: RFC3339 text, series id and the
+        # row schema as a bit mask (which tags are set) plus the value type above the tag bits
+        points['_time_text'] = format_time(points['_time'])
+        points['_series'] = points.groupby(['_measurement', '_field'] + tags, dropna=False, sort=False).ngroup()
+        tag_bits = points[tags].notna().to_numpy() @ (1 << np.arange(len(tags), dtype=np.int64))
+        points['_schema'] = tag_bits + (kind.astype(np.int64) << len(tags))
+        return points.sort_values('_time', kind='stable').reset_index(drop=True)
+
+    @property
+    def tags(self) -> List[str]:
+        return tag_columns(self.points)
+
+    @classmethod
+    def from_csv_dir(cls, directory: str) -> 'InfluxStandIn':
+        """Load every CSV written by query-influxdb from a directory or an archive such as experiment_data.tar.xz."""
+        frames = [frame for _, frame in sorted(read_csv_files(directory, '', read=read_export), key=lambda item: item[0])]
+        if not frames:
+            raise ValueError(f"No CSV files in {directory}")
+        return cls(pd.concat(frames, ignore_index=True))
+
+    def write(self, bucket: str, body: str, precision: str = 'ns') -> int:
+        """Store line protocol points in `bucket`, returning the number of points written."""
+        points = parse_line_protocol(body, precision)
+        if points.empty:
+            return 0
+        with self.lock:
+            self.written.setdefault(bucket, []).append(points)
+            self.buckets[bucket] = self.normalize(pd.concat(self.written[bucket], ignore_index=True))
+        return len(points)
+
+    def select(self, flux: str) -> Tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp]:
+        start, stop, filters = parse_flux(flux)
+        with self.lock:
+            points = self.buckets.get(parse_bucket(flux), self.points)
+        mask = (points['_time'] >= start) & (points['_time'] < stop)
+        for column, op, value in filters:
+            if column not in points:
+                return points.iloc[:0], start, stop
+            if op == '==':
+                mask &= points[column] == value
+            else:
+                mask &= points[column].str.contains(value, regex=True, na=False)
+        return points.loc[mask.fillna(False)], start, stop
+
+    def annotated_csv(self, flux: str, chunk_rows: int = 50_000) -> Iterator[str]:
+        """Query result as Flux annotated CSV with one table per series (group key), in chunks.
+
+        Series sharing the same tag columns and value type share one annotated block; blocks are
+        rendered `chunk_rows` at a time so large responses start streaming immediately.
+        """
+        selected, start, stop = self.select(flux)
+        if selected.empty:
+            return
+        tags = tag_columns(selected)
+        start = max(start, selected['_time'].min())
+        selected = selected.sort_values(['_series', '_time'], kind='stable')
+        for block, (code, rows) in enumerate(selected.groupby('_schema', sort=False)):
+            series_tags = [tag for i, tag in enumerate(tags) if code >> i & 1]
+            value_type = VALUE_TYPES[code >> len(tags)]
+            columns = ['result', 'table', '_start', '_stop', '_time', '_value', '_field', '_measurement'] + series_tags
+            datatypes = ['string', 'long', 'dateTime:RFC3339', 'dateTime:RFC3339', 'dateTime:RFC3339',
+                         value_type, 'string', 'string'] + ['string'] * len(series_tags)
+            groups = ['false', 'false', 'true', 'true', 'false', 'false', 'true', 'true'] + ['true'] * len(series_tags)
+            yield (('\n' if block else '')
+                   + '#datatype,' + ','.join(datatypes) + '\n'
+                   + '#group,' + ','.join(groups) + '\n'
+                   + '#default,_result' + ',' * (len(columns) - 1) + '\n'
+                   + ',' + ','.join(columns) + '\n')
+            for offset in range(0, len(rows), chunk_rows):
+                chunk = rows.iloc[offset:offset + chunk_rows]
+                body = pd.DataFrame({
+                    '': '',
+                    'result': '',
+                    'table': chunk['_series'],
+                    '_start': start.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                    '_stop': stop.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                    '_time': chunk['_time_text'],
+                    '_value': chunk['_value'],
+                    '_field': chunk['_field'],
+                    '_measurement': chunk['_measurement'],
+                    **{c: chunk[c] for c in series_tags},
+                })
+                yield body.to_csv(header=False, index=False, lineterminator='\n')
+
+    def handler(self):
+        standin = self
+
+        class StandInHandler(BaseHTTPRequestHandler):
+            def send_body(self, status: int, body: str, content_type: str = 'application/json'):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.startswith(('/health', '/ping')):
+                    self.send_body(200, json.dumps({'status': 'pass', 'name': 'neuronet-standin'}))
+                else:
+                    self.send_body(404, json.dumps({'code': 'not found', 'message': self.path}))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    import gzip
+
+                    body = gzip.decompress(body)
+                body = body.decode()
+                if self.path.startswith('/api/v2/write'):
+                    params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                    try:
+                        standin.write(params['bucket'], body, params.get('precision', 'ns'))
+                    except Exception as e:
+                        self.send_body(400, json.dumps({'code': 'invalid', 'message': str(e)}))
+                        return
+                    self.send_response(204)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if not self.path.startswith('/api/v2/query'):
+                    self.send_body(404, json.dumps({'code': 'not found', 'message': self.path}))
+                    return
+                try:
+                    flux = json.loads(body)['query'] if body.lstrip().startswith('{') else body
+                    chunks = standin.annotated_csv(flux)
+                    first = next(chunks, '')
+                except Exception as e:
+                    self.send_body(400, json.dumps({'code': 'invalid', 'message': str(e)}))
+                    return
+                # HTTP/1.0 without Content-Length: the body streams until the connection closes, so the
+                # client starts parsing before the whole result is rendered
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.end_headers()
+                for chunk in itertools.chain([first], chunks):
+                    self.wfile.write(chunk.encode())
+
+            def log_message(self, format, *args):
+                pass
+
+        return StandInHandler
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve in a background thread, returning the URL to pass as --url / influx_url."""
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+@click.command()
+@click.option('--data-dir', required=True, help='Directory or archive (tar.xz, tar.gz, zip) with query-influxdb CSVs, e.g. experiment_data.tar.xz')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', default=8086, show_default=True, help='Port to listen on')
+def main(data_dir, host, port):
+    """
+    Serve local CSVs through the InfluxDB v2 query API for offline runs.
+
+    e.g., "influxdb-standin --data-dir data" then "query-influxdb --url http://127.0.0.1:8086 --plugin kepler ..."
+    """
+    standin = InfluxStandIn.from_csv_dir(data_dir)
+    click.echo(f"✅ Loaded {len(standin.points)} points from {data_dir} "
+               f"({standin.points['_time'].min()} - {standin.points['_time'].max()})")
+    url = standin.start(host, port)
+    click.echo(f"🔄 InfluxDB stand-in listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == '__main__':
+    main()
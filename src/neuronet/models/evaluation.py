@@ -0,0 +1,177 @@
+import json
+from itertools import zip_longest
+from typing import Callable, Dict, List, Optional
+
+import click
+import numpy as np
+import pandas as pd
+
+# Sufficient statistics kept per group: count, error sums and the mean/M2 of the target (for R²)
+STAT_COLS = ['n', 'abs_err', 'sq_err', 'y_mean', 'y_m2']
+
+
+def chunk_stats(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    errors = y_true - y_pred
+    n = len(y_true)
+    y_mean = float(y_true.mean()) if n else 0.0
+    return {
+        'n': n,
+        'abs_err': float(np.abs(errors).sum()),
+        'sq_err': float(np.square(errors).sum()),
+        'y_mean': y_mean,
+        'y_m2': float(np.square(y_true - y_mean).sum()),
+    }
+
+
+def merge_stats(a, b):
+    """Chan et al. pairwise update of (n, mean, M2); works on scalars or aligned pandas objects."""
+    n = a['n'] + b['n']
+    delta = b['y_mean'] - a['y_mean']
+    safe_n = np.where(n > 0, n, 1)
+    return {
+        'n': n,
+        'abs_err': a['abs_err'] + b['abs_err'],
+        'sq_err': a['sq_err'] + b['sq_err'],
+        'y_mean': a['y_mean'] + delta * b['n'] / safe_n,
+        'y_m2': a['y_m2'] + b['y_m2'] + delta ** 2 * a['n'] * b['n'] / safe_n,
+    }
+
+
+def finalize(stats) -> Dict[str, float]:
+    """MAE/MSE/R² from accumulated statistics, with scikit-learn's convention for a constant target."""
+    n = np.maximum(stats['n'], 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(stats['y_m2'] > 0, 1 - stats['sq_err'] / stats['y_m2'],
+                      np.where(stats['sq_err'] == 0, 1.0, 0.0))
+    return {'n': stats['n'], 'mae': stats['abs_err'] / n, 'mse': stats['sq_err'] / n, 'r2': r2}
+
+
+class RegressionMetrics:
+    """MAE, MSE and R² updated chunk by chunk in constant memory."""
+
+    def __init__(self):
+        self.stats = {'n': 0, 'abs_err': 0.0, 'sq_err': 0.0, 'y_mean': 0.0, 'y_m2': 0.0}
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray):
+        self.stats = merge_stats(self.stats, chunk_stats(np.asarray(y_true, dtype='float64'),
+                                                         np.asarray(y_pred, dtype='float64')))
+
+    def result(self) -> Dict[str, float]:
+        return {key: int(value) if key == 'n' else float(value) for key, value in finalize(self.stats).items()}
+
+
+class GroupedRegressionMetrics:
+    """RegressionMetrics per group key (entity, time bucket), memory grows with the groups, not the rows."""
+
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        self.stats = pd.DataFrame(columns=STAT_COLS, dtype='float64')
+
+    def update(self, groups: pd.DataFrame, y_true: np.ndarray, y_pred: np.ndarray):
+        y_true = np.asarray(y_true, dtype='float64')
+        errors = y_true - np.asarray(y_pred, dtype='float64')
+        frame = groups.loc[:, self.keys].assign(abs_err=np.abs(errors), sq_err=np.square(errors), y=y_true)
+        grouped = frame.groupby(self.keys, dropna=False, observed=True)
+        chunk = grouped.agg(n=('y', 'size'), abs_err=('abs_err', 'sum'), sq_err=('sq_err', 'sum'),
+                            y_mean=('y', 'mean'))
+        chunk['y_m2'] = grouped['y'].var(ddof=0) * chunk['n']
+        chunk = chunk.astype('float64')
+
+        if self.stats.empty:
+            self.stats = chunk
+            return
+        index = self.stats.index.union(chunk.index)
+        previous = self.stats.reindex(index, fill_value=0.0)
+        current = chunk.reindex(index, fill_value=0.0)
+        self.stats = pd.DataFrame(merge_stats(previous, current), index=index)[STAT_COLS]
+
+    def result(self) -> pd.DataFrame:
+        if self.stats.empty:
+            return pd.DataFrame(columns=self.keys + ['n', 'mae', 'mse', 'r2'])
+        result = pd.DataFrame(finalize(self.stats), index=self.stats.index)
+        result['n'] = result['n'].astype('int64')
+        return result.reset_index()
+
+
+class StreamingEvaluator:
+    """Evaluate a model on test artifacts read in chunks.
+
+    x_test/y_test (and optionally a metadata CSV with the entity and `_time` columns of the same
+    rows) are read `chunk_size` rows at a time, predicted per chunk and folded into overall,
+    per-entity and per-time-bucket accumulators, so memory stays flat whatever the test set size.
+    """
+
+    def __init__(self, predict_fn: Callable[[pd.DataFrame], np.ndarray], chunk_size: int = 100_000,
+                 entity_cols: Optional[List[str]] = None, time_col: str = '_time', time_bucket: str = '1h'):
+        self.predict_fn = predict_fn
+        self.chunk_size = chunk_size
+        self.entity_cols = entity_cols or []
+        self.time_col = time_col
+        self.time_bucket = time_bucket
+        self.overall = RegressionMetrics()
+        self.per_entity = GroupedRegressionMetrics(self.entity_cols)
+        self.per_time = GroupedRegressionMetrics(['time_bucket'])
+        self.chunks = 0
+
+    def update(self, X: pd.DataFrame, y_true: np.ndarray, meta: Optional[pd.DataFrame] = None):
+        y_pred = np.asarray(self.predict_fn(X), dtype='float64').ravel()
+        self.overall.update(y_true, y_pred)
+        if meta is not None:
+            if self.entity_cols:
+                self.per_entity.update(meta, y_true, y_pred)
+            if self.time_col in meta:
+                buckets = pd.to_datetime(meta[self.time_col], utc=True, format='mixed').dt.floor(self.time_bucket)
+                self.per_time.update(pd.DataFrame({'time_bucket': buckets}), y_true, y_pred)
+        self.chunks += 1
+
+    def evaluate(self, x_path: str, y_path: str, meta_path: Optional[str] = None) -> Dict[str, float]:
+        readers = [pd.read_csv(x_path, chunksize=self.chunk_size), pd.read_csv(y_path, chunksize=self.chunk_size)]
+        if meta_path:
+            readers.append(pd.read_csv(meta_path, chunksize=self.chunk_size))
+        rows = 0
+        # zip() would stop silently at the shortest artifact, a missing chunk means the row counts differ
+        for chunks in zip_longest(*readers):
+            if any(chunk is None for chunk in chunks) or len({len(chunk) for chunk in chunks}) > 1:
+                lengths = [0 if chunk is None else len(chunk) for chunk in chunks]
+                raise ValueError(f"Test artifacts have different numbers of rows (chunk at row {rows}: "
+                                 f"{', '.join(str(n) for n in lengths)} rows)")
+            X, y = chunks[0], chunks[1].iloc[:, 0].to_numpy(dtype='float64')
+            self.update(X, y, chunks[2] if meta_path else None)
+            rows += len(X)
+        return self.overall.result()
+
+
+@click.command()
+@click.option('--model', 'model_path', required=True, help='Trained model (output_model artifact or forest export)')
+@click.option('--kind', type=click.Choice(['rf', 'forest', 'mlp']), required=True, help='Model type, as for serve-model')
+@click.option('--x-test', required=True, help='output_x_test artifact of preprocess_data')
+@click.option('--y-test', required=True, help='output_y_test artifact of preprocess_data')
+@click.option('--meta-test', default=None, help='output_meta_test artifact (entity and _time columns) for the breakdowns')
+@click.option('--entity-cols', default=None, help='Comma separated entity columns of --meta-test, e.g. vm_id or namespace')
+@click.option('--time-bucket', default='1h', show_default=True, help='Time bucket for the per-time metrics')
+@click.option('--chunk-size', default=100_000, show_default=True, help='Rows read and predicted per chunk')
+@click.option('--output-dir', default='.', show_default=True, help='Where to write metrics.json and the breakdown CSVs')
+def main(model_path, kind, x_test, y_test, meta_test, entity_cols, time_bucket, chunk_size, output_dir):
+    """Stream a UC1 test set through a trained model and report overall/per-entity/per-time metrics."""
+    import os
+
+    from neuronet.serving.predictors import load_predictor
+
+    predictor = load_predictor(model_path, kind)
+    evaluator = StreamingEvaluator(predictor.predict, chunk_size=chunk_size,
+                                   entity_cols=entity_cols.split(',') if entity_cols else None,
+                                   time_bucket=time_bucket)
+    metrics = evaluator.evaluate(x_test, y_test, meta_test)
+    click.echo(f"MAE: {metrics['mae']:.4f}\nMSE: {metrics['mse']:.4f}\nR2: {metrics['r2']:.4f}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    if meta_test:
+        evaluator.per_entity.result().to_csv(os.path.join(output_dir, 'entity_metrics.csv'), index=False)
+        evaluator.per_time.result().to_csv(os.path.join(output_dir, 'time_metrics.csv'), index=False)
+    click.echo(f"✅ {metrics['n']} rows in {evaluator.chunks} chunks, metrics saved to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import json
+import time
+from typing import Dict, List, Optional
+
+import click
+import numpy as np
+
+# Arrays stored in a flattened forest (.npz), one entry per node of every tree
+NODE_ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'missing_left']
+
+
+def flatten_forest(model) -> Dict[str, np.ndarray]:
+    """Flatten a fitted scikit-learn RandomForestRegressor into contiguous node arrays.
+
+    Child indices are global (offset per tree) and leaves point to themselves with an infinite
+    threshold, so a batch can be pushed down every tree for `max_depth` steps without branching.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    if trees[0].n_outputs != 1:
+        raise ValueError("Only single-output regression forests can be flattened")
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    feature, threshold, left, right, value, missing_left = [], [], [], [], [], []
+    for tree, offset in zip(trees, roots):
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        value.append(tree.value[:, 0, 0])
+        # Side taken by NaN at each split (recorded by scikit-learn >= 1.3)
+        missing = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None else (missing.astype(bool) & ~is_leaf))
+
+    return {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'missing_left': np.concatenate(missing_left),
+        'roots': roots.astype(np.int32),
+        'max_depth': np.int32(max(tree.max_depth for tree in trees)),
+        'n_features': np.int32(model.n_features_in_),
+        'feature_names': np.array(list(getattr(model, 'feature_names_in_', [])), dtype=str),
+    }
+
+
+def export_forest(model, path: str) -> Dict[str, np.ndarray]:
+    arrays = flatten_forest(model)
+    with open(path, 'wb') as f:  # np.savez would append .npz to a bare KFP artifact path
+        np.savez(f, **arrays)
+    return arrays
+
+
+class NumpyForest:
+    """numpy-only RandomForest predictor over the arrays written by `export_forest`.
+
+    Each batch walks all trees at once: the (tree, row) paths still inside a tree are advanced
+    one level at a time with fancy indexing over the flattened node arrays, and every path that
+    reaches a leaf is dropped, so a level costs only the paths that are still descending. Inputs
+    are compared as float32 and tree outputs are summed in estimator order, like scikit-learn, so
+    predictions match `model.predict` exactly.
+
+    The level-by-level walk wins on small batches, where scikit-learn's per-call overhead dominates,
+    while its compiled per-tree traversal wins on large ones: with the fitted `model` given (alone it
+    is flattened in memory), batches of `model_rows` rows or more are routed to `model.predict`.
+    """
+
+    def __init__(self, path: Optional[str] = None, chunk_size: int = 16384, model=None, model_rows: int = 512):
+        if path is not None:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        elif model is not None:
+            arrays = flatten_forest(model)
+        else:
+            raise ValueError("Either an exported forest path or a fitted model is required")
+        for name in NODE_ARRAYS:
+            setattr(self, name, np.ascontiguousarray(arrays[name]))
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+        self.feature_names: Optional[List[str]] = [str(name) for name in arrays['feature_names']] or None
+        self.is_leaf = self.left == np.arange(len(self.left))
+        # Child of node i is children[2 * i + went_left]
+        self.children = np.stack([self.right, self.left], axis=1).ravel()
+        self.chunk_size = chunk_size
+        self.model = model
+        self.model_rows = model_rows
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        # One path per (tree, row), tree-major: path p runs row p % n_rows down tree p // n_rows
+        nodes = np.repeat(self.roots, n_rows).astype(np.int64)
+        offsets = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        paths = np.arange(len(nodes))
+        leaf_values = np.empty(len(nodes))
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        while len(nodes):
+            # Paths that reached a leaf keep its value and leave the walk
+            done = self.is_leaf[nodes]
+            if done.any():
+                leaf_values[paths[done]] = self.value[nodes[done]]
+                descending = ~done
+                nodes, offsets, paths = nodes[descending], offsets[descending], paths[descending]
+                if not len(nodes):
+                    break
+            x = flat[offsets + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if has_nan:
+                missing = np.isnan(x)
+                go_left[missing] = self.missing_left[nodes[missing]]
+            nodes = self.children[2 * nodes + go_left]
+        # Summing over the leading (tree) axis adds the trees one after the other, in estimator order
+        return leaf_values.reshape(self.n_trees, n_rows).sum(axis=0) / self.n_trees
+
+    def predict(self, X) -> np.ndarray:
+        if self.model is not None and len(X) >= self.model_rows:
+            return np.asarray(self.model.predict(X), dtype=np.float64)
+        if hasattr(X, 'columns') and self.feature_names is not None:
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows with {self.n_features} features, got shape {X.shape}")
+        X = np.ascontiguousarray(X)
+        return np.concatenate([self.predict_chunk(X[start:start + self.chunk_size])
+                               for start in range(0, len(X), self.chunk_size)] or [np.empty(0)])
+
+
+@click.command()
+@click.option('--model', 'model_path', required=True, help='joblib RandomForest saved by the energy train_model component')
+@click.option('--output', required=True, help='Where to write the flattened forest (.npz)')
+@click.option('--verify', default=None, help='CSV with feature rows (e.g. the x_test artifact) to check predictions against model.predict')
+def main(model_path, output, verify):
+    """Export the energy RandomForest to numpy node arrays for the dependency-light predictor."""
+    import joblib
+    import pandas as pd
+
+    model = joblib.load(model_path)
+    arrays = export_forest(model, output)
+    click.echo(f"✅ Exported {len(arrays['roots'])} trees / {len(arrays['value'])} nodes "
+               f"(max depth {int(arrays['max_depth'])}) to {output}")
+
+    if verify:
+        X = pd.read_csv(verify)
+        forest = NumpyForest(output)
+        started = time.perf_counter()
+        expected = model.predict(X)
+        sklearn_s = time.perf_counter() - started
+        started = time.perf_counter()
+        actual = forest.predict(X)
+        numpy_s = time.perf_counter() - started
+        if not np.array_equal(expected, actual):
+            raise click.ClickException(f"Exported forest differs from model.predict "
+                                       f"(max abs diff {np.max(np.abs(expected - actual))})")
+        click.echo(json.dumps({'rows': len(X), 'sklearn_s': sklearn_s, 'numpy_s': numpy_s}))
+        click.echo(f"✅ Predictions match model.predict exactly on {len(X)} rows")
+
+
+if __name__ == '__main__':
+    main()
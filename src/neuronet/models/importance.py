@@ -0,0 +1,196 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.models.evaluation import chunk_stats, finalize
+
+# Score of a permuted copy minus the baseline score, positive when shuffling the feature hurts the model
+SCORES = {'mae': 1, 'mse': 1, 'r2': -1}
+
+# Test split and model of the current worker process, set once by the pool initializer
+SHARED_TEST: Dict[str, Any] = {}
+
+
+def load_shared_test(split_dir: str, model_path: str, kind: str):
+    """Process pool initializer: map the cached test split read-only and load the model once per worker."""
+    from neuronet.serving.predictors import load_predictor
+
+    SHARED_TEST['x'] = np.load(os.path.join(split_dir, 'x_test.npy'), mmap_mode='r')
+    SHARED_TEST['y'] = np.load(os.path.join(split_dir, 'y_test.npy'), mmap_mode='r')
+    # One thread per worker, the pool already keeps every core busy
+    SHARED_TEST['predictor'] = load_predictor(model_path, kind, num_threads=1)
+
+
+def score_copies(y_true: np.ndarray, y_pred: np.ndarray, copies: int) -> List[Dict[str, float]]:
+    """MAE/MSE/R² of each of the `copies` test sets stacked in `y_pred`."""
+    return [{key: float(value) for key, value in finalize(chunk_stats(y_true, part)).items() if key != 'n'}
+            for part in np.split(y_pred, copies)]
+
+
+def predict_batched(X: np.ndarray, batch_rows: int) -> np.ndarray:
+    predictor = SHARED_TEST['predictor']
+    return np.concatenate([predictor.predict(X[start:start + batch_rows]) for start in range(0, len(X), batch_rows)])
+
+
+def permute_feature(column: Optional[int], n_repeats: int, seed: int, batch_rows: int) -> Dict[str, Any]:
+    """Scores of the test split with `column` shuffled `n_repeats` times (column None scores the unshuffled split).
+
+    The shuffled copies are stacked into batches of about `batch_rows` rows, so each predict call amortizes the
+    model overhead over several repeats instead of running one full evaluation per repeat.
+    """
+    X, y = SHARED_TEST['x'], np.asarray(SHARED_TEST['y'])
+    started = time.perf_counter()
+    if column is None:
+        scores = score_copies(y, predict_batched(np.asarray(X), batch_rows), 1)
+        return {'column': None, 'scores': scores, 'predict_s': time.perf_counter() - started}
+
+    rng = np.random.default_rng([seed, column])
+    copies_per_batch = max(1, batch_rows // len(X))
+    scores = []
+    for first in range(0, n_repeats, copies_per_batch):
+        copies = min(copies_per_batch, n_repeats - first)
+        stacked = np.tile(X, (copies, 1))
+        stacked[:, column] = np.concatenate([rng.permutation(X[:, column]) for _ in range(copies)])
+        scores += score_copies(y, predict_batched(stacked, batch_rows), copies)
+    return {'column': column, 'scores': scores, 'predict_s': time.perf_counter() - started}
+
+
+class PermutationImportance:
+    """Permutation feature importance of a trained UC1 model on its test split, in a process pool.
+
+    The test split is cached once as .npy files and memory-mapped read-only by every worker, each worker
+    loads the model once and shuffles whole features, so the job costs one vectorized prediction pass
+    per repeat and feature. Features whose shuffling changes the score by less than `prune_below`
+    (relative to the baseline) are suggested for removal.
+    """
+
+    def __init__(self, model_path: str, kind: str, x_test: str, y_test: str, n_repeats: int = 5,
+                 max_rows: Optional[int] = None, batch_rows: int = 200_000, scoring: str = 'mse',
+                 prune_below: float = 0.01, max_workers: Optional[int] = None, random_state: int = 42):
+        if scoring not in SCORES:
+            raise ValueError(f"Unknown scoring: {scoring} (expected one of {', '.join(SCORES)})")
+        self.model_path = model_path
+        self.kind = kind
+        self.paths = {'x_test': x_test, 'y_test': y_test}
+        self.n_repeats = n_repeats
+        self.max_rows = max_rows
+        self.batch_rows = batch_rows
+        self.scoring = scoring
+        self.prune_below = prune_below
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.random_state = random_state
+        self.baseline: Dict[str, float] = {}
+        self.features: List[str] = []
+        self.importances = pd.DataFrame()
+
+    def cache_test(self, split_dir: str) -> int:
+        X = pd.read_csv(self.paths['x_test'])
+        y = pd.read_csv(self.paths['y_test']).iloc[:, 0].to_numpy(dtype='float64')
+        if len(X) != len(y):
+            raise ValueError("Test artifacts have different numbers of rows")
+        if self.max_rows and len(X) > self.max_rows:
+            rows = np.sort(np.random.default_rng(self.random_state).choice(len(X), self.max_rows, replace=False))
+            X, y = X.iloc[rows], y[rows]
+        self.features = list(X.columns)
+        np.save(os.path.join(split_dir, 'x_test.npy'), X.to_numpy(dtype='float64'))
+        np.save(os.path.join(split_dir, 'y_test.npy'), y)
+        return len(X)
+
+    def rank(self, results: List[Dict[str, Any]]) -> pd.DataFrame:
+        rows = []
+        for result in results:
+            row = {'feature': self.features[result['column']]}
+            for metric, sign in SCORES.items():
+                deltas = sign * (np.array([s[metric] for s in result['scores']]) - self.baseline[metric])
+                row[f'{metric}_increase' if sign > 0 else f'{metric}_decrease'] = deltas.mean()
+                row[f'{metric}_std'] = deltas.std()
+            rows.append(row)
+        ranked = pd.DataFrame(rows)
+        key = f'{self.scoring}_increase' if SCORES[self.scoring] > 0 else f'{self.scoring}_decrease'
+        # R² is already relative to the target variance, MAE/MSE are relative to the baseline error
+        scale = 1.0 if self.scoring == 'r2' else max(abs(self.baseline[self.scoring]), np.finfo('float64').tiny)
+        ranked['relative_importance'] = ranked[key] / scale
+        ranked['keep'] = ranked['relative_importance'] >= self.prune_below
+        ranked = ranked.sort_values(key, ascending=False).reset_index(drop=True)
+        ranked.index.name = 'rank'
+        return ranked
+
+    def run(self) -> pd.DataFrame:
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as split_dir:
+            n_rows = self.cache_test(split_dir)
+            click.echo(f"🔄 {len(self.features)} features x {self.n_repeats} repeats on {n_rows} test rows")
+            columns = [None] + list(range(len(self.features)))
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(columns)), initializer=load_shared_test,
+                                     initargs=(split_dir, self.model_path, self.kind)) as executor:
+                futures = [executor.submit(permute_feature, column, self.n_repeats, self.random_state, self.batch_rows)
+                           for column in columns]
+                results = []
+                for future in futures:
+                    result = future.result()
+                    if result['column'] is None:
+                        self.baseline = result['scores'][0]
+                        click.echo(f"📊 Baseline: {json.dumps(self.baseline)}")
+                    else:
+                        results.append(result)
+                        click.echo(f"🔄 {self.features[result['column']]}: {result['predict_s']:.2f}s")
+
+        self.importances = self.rank(results)
+        click.echo(f"✅ {len(results)} features in {time.perf_counter() - started:.1f}s")
+        return self.importances
+
+    def summary(self) -> Dict[str, Any]:
+        keep = self.importances['keep']
+        return {
+            'model': self.model_path,
+            'kind': self.kind,
+            'scoring': self.scoring,
+            'n_repeats': self.n_repeats,
+            'prune_below': self.prune_below,
+            'baseline': self.baseline,
+            'keep': self.importances.loc[keep, 'feature'].tolist(),
+            'prune': self.importances.loc[~keep, 'feature'].tolist(),
+        }
+
+
+@click.command()
+@click.option('--model', 'model_path', required=True, help='Trained model (output_model artifact or forest export)')
+@click.option('--kind', type=click.Choice(['rf', 'forest', 'mlp']), required=True, help='Model type, as for serve-model')
+@click.option('--x-test', required=True, help='output_x_test artifact of preprocess_data')
+@click.option('--y-test', required=True, help='output_y_test artifact of preprocess_data')
+@click.option('--repeats', default=5, show_default=True, help='Shuffles per feature')
+@click.option('--max-rows', default=None, type=int, help='Score a random sample of this many test rows')
+@click.option('--batch-rows', default=200_000, show_default=True, help='Rows per predict call, shuffled copies are stacked up to this size')
+@click.option('--scoring', type=click.Choice(list(SCORES)), default='mse', show_default=True, help='Metric used to rank and prune')
+@click.option('--prune-below', default=0.01, show_default=True, help='Suggest pruning features changing the score by less than this fraction of the baseline')
+@click.option('--workers', default=None, type=int, help='Process pool size (default: CPU count)')
+@click.option('--random-state', default=42, show_default=True, help='Seed of the shuffles and the row sample')
+@click.option('--output', default='feature_importance.csv', show_default=True, help='Where to save the ranked importances')
+@click.option('--summary', 'summary_path', default=None, help='Also write the baseline and the keep/prune feature lists as JSON')
+def main(model_path, kind, x_test, y_test, repeats, max_rows, batch_rows, scoring, prune_below, workers, random_state,
+         output, summary_path):
+    """Rank the features of a trained UC1 model by permutation importance and suggest which ones to prune."""
+    importance = PermutationImportance(model_path, kind, x_test, y_test, n_repeats=repeats, max_rows=max_rows,
+                                       batch_rows=batch_rows, scoring=scoring, prune_below=prune_below,
+                                       max_workers=workers, random_state=random_state)
+    importances = importance.run()
+    importances.to_csv(output)
+    click.echo(importances.to_string())
+    summary = importance.summary()
+    if summary['prune']:
+        click.echo(f"⚠️ Candidates for pruning: {', '.join(summary['prune'])}")
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+    click.echo(f"✅ Importances saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.models.mlp import MLP
+
+
+def grow_forest(model, X, y, n_new_estimators: int, max_estimators: int = 0):
+    """Add `n_new_estimators` trees fitted on a new window (X, y) to a fitted RandomForestRegressor.
+
+    Only the new trees are fitted (`warm_start`), so the cost scales with the window, not the history.
+    With `max_estimators` the oldest trees beyond the cap are evicted, so old windows age out.
+    """
+    # fit() resets the fitted feature names, so a window with other columns would silently mix models
+    columns = list(getattr(X, 'columns', []))
+    expected = list(getattr(model, 'feature_names_in_', columns))
+    if columns != expected or np.shape(X)[1] != model.n_features_in_:
+        raise ValueError(f"New window features {columns or np.shape(X)[1]} do not match the forest's "
+                         f"{expected or model.n_features_in_}")
+    # warm_start draws the new trees' seeds after skipping len(estimators_) draws, which repeats seeds of trees
+    # still in the forest once trees were evicted: derive a fresh random_state from the update counter instead
+    model.n_updates_ = getattr(model, 'n_updates_', 0) + 1
+    base_seed = model.random_state if isinstance(model.random_state, (int, np.integer)) else 0
+    seed = int(np.random.SeedSequence([int(base_seed), model.n_updates_]).generate_state(1)[0])
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_estimators, random_state=seed)
+    model.fit(X, y)
+    if max_estimators and len(model.estimators_) > max_estimators:
+        # estimators_ is in fit order, the oldest trees come first
+        model.estimators_ = model.estimators_[-max_estimators:]
+        model.n_estimators = max_estimators
+    return model
+
+
+class ReplayBuffer:
+    """Fixed-size uniform sample (reservoir sampling) of every training row seen so far.
+
+    Stored in the MLP checkpoint next to the weights, so a fine-tune on a new window can mix in
+    old rows without reading the full history again.
+    """
+
+    def __init__(self, capacity: int, X: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None,
+                 seen: int = 0, seed: int = 42):
+        self.capacity = capacity
+        self.X = np.empty((0, 0), dtype=np.float32) if X is None else np.asarray(X, dtype=np.float32)
+        self.y = np.empty(0, dtype=np.float32) if y is None else np.asarray(y, dtype=np.float32)
+        self.seen = seen
+        self.rng = np.random.default_rng(seed + seen)
+
+    def __len__(self):
+        return len(self.y)
+
+    def add(self, X, y):
+        X, y = np.asarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32).ravel()
+        if not len(self):
+            self.X = np.empty((0, X.shape[1]), dtype=np.float32)
+        # Fill the free slots first
+        n_fill = min(self.capacity - len(self), len(y))
+        self.X = np.concatenate([self.X, X[:n_fill]])
+        self.y = np.concatenate([self.y, y[:n_fill]])
+        # Then row t (0-based over everything seen) replaces a random slot with probability capacity / (t + 1)
+        positions = self.seen + np.arange(n_fill, len(y))
+        slots = self.rng.integers(0, positions + 1)
+        keep = slots < self.capacity
+        self.X[slots[keep]] = X[n_fill:][keep]
+        self.y[slots[keep]] = y[n_fill:][keep]
+        self.seen += len(y)
+
+    def sample(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        idx = self.rng.choice(len(self), size=min(n, len(self)), replace=False)
+        return self.X[idx], self.y[idx]
+
+    def state_dict(self) -> Dict:
+        return {'replay_x': self.X, 'replay_y': self.y, 'replay_seen': self.seen}
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: Dict, capacity: int) -> 'ReplayBuffer':
+        """Buffer saved in a checkpoint, empty for checkpoints written before replay existed."""
+        if 'replay_x' not in checkpoint:
+            return cls(capacity)
+        buffer = cls(capacity, checkpoint['replay_x'], checkpoint['replay_y'], checkpoint['replay_seen'])
+        if len(buffer) > capacity:
+            buffer.X, buffer.y = buffer.sample(capacity)
+        return buffer
+
+
+def fine_tune_mlp(model: MLP, scaler, replay: ReplayBuffer, X_new, y_new, epochs: int, lr: float,
+                  replay_ratio: float = 1.0, log: Callable[[str], None] = print,
+                  **fit_kwargs) -> Tuple[MLP, List[Dict[str, float]]]:
+    """Continue training `model` on the new rows plus `replay_ratio` times as many replayed old rows.
+
+    The scaler of the previous checkpoint is kept (the weights were trained on its scaling); the new
+    rows are added to the replay buffer after the fine-tune.
+    """
+    from neuronet.models.training import fit_mlp
+
+    X_new = np.asarray(X_new, dtype=np.float32)
+    y_new = np.asarray(y_new, dtype=np.float32).ravel()
+    X_old, y_old = replay.sample(int(len(y_new) * replay_ratio))
+    log(f"Fine-tuning on {len(y_new)} new rows + {len(y_old)} replayed rows")
+    # Same column names as the scaler was fitted with, if any
+    X = scaler.transform(pd.DataFrame(np.concatenate([X_new, X_old]), columns=getattr(scaler, 'feature_names_in_', None)))
+    model, history = fit_mlp(X, np.concatenate([y_new, y_old]), epochs=epochs, lr=lr, model=model, log=log,
+                             **fit_kwargs)
+    replay.add(X_new, y_new)
+    return model, history
+
+
+@click.command()
+@click.option('--kind', type=click.Choice(['rf', 'mlp']), required=True, help='Energy RandomForest (joblib) or VM power MLP checkpoint')
+@click.option('--model', 'model_path', required=True, help='Previous model (train_model output)')
+@click.option('--x', 'x_path', required=True, help='Features CSV of the new window')
+@click.option('--y', 'y_path', required=True, help='Target CSV of the new window')
+@click.option('--output', required=True, help='Where to write the updated model')
+@click.option('--n-estimators', default=20, show_default=True, help='RF: trees added for the new window')
+@click.option('--max-estimators', default=0, show_default=True, help='RF: evict the oldest trees beyond this size (0: no cap)')
+@click.option('--epochs', default=5, show_default=True, help='MLP: fine-tuning epochs')
+@click.option('--lr', default=1e-4, show_default=True, help='MLP: fine-tuning learning rate')
+@click.option('--replay-size', default=10000, show_default=True, help='MLP: rows kept in the replay buffer')
+@click.option('--replay-ratio', default=1.0, show_default=True, help='MLP: replayed rows per new row')
+def main(kind, model_path, x_path, y_path, output, n_estimators, max_estimators, epochs, lr, replay_size, replay_ratio):
+    """Update a trained UC1 model on a new data window instead of retraining on the full history."""
+    X = pd.read_csv(x_path)
+    y = pd.read_csv(y_path).squeeze("columns")
+    started = time.perf_counter()
+    if kind == 'rf':
+        import joblib
+
+        model = grow_forest(joblib.load(model_path), X, y, n_estimators, max_estimators)
+        joblib.dump(model, output)
+        summary = f"{len(model.estimators_)} trees"
+    else:
+        import torch
+
+        checkpoint = torch.load(model_path, map_location=torch.device("cpu"), weights_only=False)
+        model = MLP(checkpoint['input_dim'])
+        model.load_state_dict(checkpoint['model_state_dict'])
+        replay = ReplayBuffer.from_checkpoint(checkpoint, replay_size)
+        model, _ = fine_tune_mlp(model, checkpoint['scaler'], replay, X, y, epochs=epochs, lr=lr,
+                                 replay_ratio=replay_ratio, log=click.echo)
+        torch.save({'model_state_dict': model.state_dict(), 'scaler': checkpoint['scaler'],
+                    'input_dim': checkpoint['input_dim'], **replay.state_dict()}, output)
+        summary = f"replay buffer {len(replay)}/{replay.seen} rows"
+    click.echo(f"✅ Updated {kind} on {len(X)} new rows in {time.perf_counter() - started:.2f}s ({summary}), "
+               f"saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
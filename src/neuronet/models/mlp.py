@@ -0,0 +1,38 @@
+import torch
+import torch.nn as nn
+
+
+class MLP(nn.Module):
+    """VM power regression MLP, same structure as the vm_power_prediction train_model component."""
+
+    def __init__(self, input_dim):
+        super().__init__()
+        self.model = nn.Sequential(
+            nn.Linear(input_dim, 128),
+            nn.ReLU(),
+            nn.Linear(128, 64),
+            nn.ReLU(),
+            nn.Linear(64, 1)
+        )
+
+    def forward(self, x):
+        return self.model(x)
+
+
+def load_checkpoint(path: str):
+    """Load a train_model checkpoint, returning the MLP in eval mode and its fitted scaler."""
+    # The checkpoint pickles the StandardScaler next to the weights
+    checkpoint = torch.load(path, map_location=torch.device("cpu"), weights_only=False)
+    model = MLP(checkpoint['input_dim'])
+    model.load_state_dict(checkpoint['model_state_dict'])
+    model.eval()
+    return model, checkpoint['scaler']
+
+
+def save_checkpoint(model: MLP, scaler, path: str):
+    """Save the MLP in the checkpoint format of the train_model component."""
+    torch.save({
+        'model_state_dict': model.state_dict(),
+        'scaler': scaler,
+        'input_dim': model.model[0].in_features
+    }, path)
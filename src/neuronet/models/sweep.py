@@ -0,0 +1,199 @@
+import itertools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import click
+import numpy as np
+import pandas as pd
+
+# Default search spaces over the existing UC1 training parameters
+DEFAULT_GRIDS = {
+    'rf': {'n_estimators': [50, 100, 200, 400]},
+    'mlp': {'lr': [1e-4, 1e-3, 1e-2], 'epochs': [20, 50], 'batch_size': [256, 1024]},
+}
+# Random search spaces: a list is sampled uniformly, {"low", "high", "log"} from a range (integers when both bounds are)
+DEFAULT_RANGES = {
+    'rf': {'n_estimators': {'low': 50, 'high': 400}},
+    'mlp': {'lr': {'low': 1e-4, 'high': 1e-2, 'log': True}, 'epochs': {'low': 20, 'high': 50},
+            'batch_size': [256, 512, 1024]},
+}
+DEFAULT_RANDOM_TRIALS = 10
+
+
+def sample_value(spec, rng: np.random.Generator):
+    if not isinstance(spec, dict):
+        return spec[int(rng.integers(len(spec)))]
+    low, high = spec['low'], spec['high']
+    if spec.get('log'):
+        value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    else:
+        value = float(rng.uniform(low, high))
+    return int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+
+# Read-only splits of the current worker process, memory-mapped from the .npy files written by the parent
+SHARED_SPLITS: Dict[str, np.ndarray] = {}
+
+
+def load_shared_splits(split_dir: str):
+    """Process pool initializer: map the cached splits once per worker, pages are shared by all workers."""
+    for name in ['x_train', 'y_train', 'x_test', 'y_test']:
+        SHARED_SPLITS[name] = np.load(os.path.join(split_dir, f'{name}.npy'), mmap_mode='r')
+
+
+def run_trial(model_type: str, params: Dict[str, Any], random_state: int) -> Dict[str, Any]:
+    """Train one model on the shared splits and score it on the test split."""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    X_train, y_train = SHARED_SPLITS['x_train'], SHARED_SPLITS['y_train']
+    X_test, y_test = SHARED_SPLITS['x_test'], SHARED_SPLITS['y_test']
+
+    started = time.perf_counter()
+    if model_type == 'rf':
+        from sklearn.ensemble import RandomForestRegressor
+
+        model = RandomForestRegressor(random_state=random_state, n_jobs=1, **params)
+        model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - started
+        y_pred = model.predict(X_test)
+    else:
+        from sklearn.preprocessing import StandardScaler
+        from neuronet.models.training import fit_mlp
+        import torch
+
+        scaler = StandardScaler()
+        mlp_params = dict(params)
+        model, _ = fit_mlp(scaler.fit_transform(X_train), y_train, epochs=mlp_params.pop('epochs', 20),
+                           lr=mlp_params.pop('lr', 1e-3), num_threads=1, seed=random_state, log=lambda _: None,
+                           **mlp_params)
+        fit_time = time.perf_counter() - started
+        with torch.no_grad():
+            y_pred = model(torch.as_tensor(scaler.transform(X_test), dtype=torch.float32)).numpy().ravel()
+    predict_time = time.perf_counter() - started - fit_time
+
+    return {
+        **params,
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'mse': float(mean_squared_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+        'fit_s': fit_time,
+        'predict_s': predict_time,
+    }
+
+
+class HyperparameterSweep:
+    """Grid or random search over the UC1 training parameters in a process pool.
+
+    The preprocessed splits are read once, cached as .npy files and memory-mapped read-only by
+    every worker, so trials never rerun get_data/preprocess_data or copy the data per trial.
+    """
+
+    def __init__(self, model_type: str, x_train: str, y_train: str, x_test: str, y_test: str,
+                 param_grid: Optional[Dict[str, List[Any]]] = None, search: str = 'grid',
+                 n_trials: Optional[int] = None, time_budget: Optional[float] = None,
+                 max_workers: Optional[int] = None, random_state: int = 42):
+        if model_type not in DEFAULT_GRIDS:
+            raise ValueError(f"Unknown model type: {model_type} (expected 'rf' or 'mlp')")
+        self.model_type = model_type
+        self.paths = {'x_train': x_train, 'y_train': y_train, 'x_test': x_test, 'y_test': y_test}
+        if search not in ('grid', 'random'):
+            raise ValueError(f"Unknown search: {search} (expected 'grid' or 'random')")
+        self.param_grid = param_grid or (DEFAULT_RANGES if search == 'random' else DEFAULT_GRIDS)[model_type]
+        if search == 'grid' and any(isinstance(values, dict) for values in self.param_grid.values()):
+            raise ValueError("Ranges ({'low', 'high'}) need --search random, a grid takes lists of values")
+        self.search = search
+        self.n_trials = n_trials
+        self.time_budget = time_budget
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.random_state = random_state
+        self.leaderboard = pd.DataFrame()
+
+    def trials(self) -> List[Dict[str, Any]]:
+        if self.search == 'random':
+            # Independent draws from each parameter's values or range, not a reordering of a grid
+            rng = np.random.default_rng(self.random_state)
+            return [{key: sample_value(spec, rng) for key, spec in self.param_grid.items()}
+                    for _ in range(self.n_trials or DEFAULT_RANDOM_TRIALS)]
+        keys = list(self.param_grid)
+        grid = [dict(zip(keys, values)) for values in itertools.product(*self.param_grid.values())]
+        return grid[:self.n_trials] if self.n_trials else grid
+
+    def cache_splits(self, split_dir: str):
+        for name, path in self.paths.items():
+            values = pd.read_csv(path)
+            array = values.squeeze("columns").to_numpy(dtype='float64') if name.startswith('y') else values.to_numpy(dtype='float64')
+            np.save(os.path.join(split_dir, f'{name}.npy'), array)
+
+    def run(self) -> pd.DataFrame:
+        started = time.perf_counter()
+        trials = self.trials()
+        results = []
+        with tempfile.TemporaryDirectory() as split_dir:
+            self.cache_splits(split_dir)
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=load_shared_splits,
+                                     initargs=(split_dir,)) as executor:
+                pending, queued, submitted = set(), iter(trials), {}
+                # Keep at most max_workers trials in flight so the time budget stops new submissions
+                while True:
+                    out_of_time = self.time_budget is not None and time.perf_counter() - started > self.time_budget
+                    while not out_of_time and len(pending) < self.max_workers:
+                        params = next(queued, None)
+                        if params is None:
+                            break
+                        future = executor.submit(run_trial, self.model_type, params, self.random_state)
+                        submitted[future] = params
+                        pending.add(future)
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            results.append({**future.result(), 'status': 'ok', 'error': None})
+                            click.echo(f"🔄 Trial {len(results)}/{len(trials)}: {json.dumps(results[-1])}")
+                        except Exception as e:
+                            # A failing trial is recorded and the sweep goes on with the others
+                            results.append({**submitted[future], 'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+                            click.echo(f"❌ Trial {len(results)}/{len(trials)} failed: {json.dumps(results[-1])}")
+
+        self.leaderboard = pd.DataFrame(results)
+        if not self.leaderboard.empty:
+            # Failed trials have no metrics and sort last
+            self.leaderboard = self.leaderboard.reindex(columns=list(dict.fromkeys(
+                list(self.leaderboard.columns) + ['mae', 'mse'])))
+            self.leaderboard = self.leaderboard.sort_values(['mae', 'mse'], na_position='last').reset_index(drop=True)
+            self.leaderboard.index.name = 'rank'
+        failed = sum(result['status'] == 'failed' for result in results)
+        click.echo(f"✅ {len(results) - failed}/{len(trials)} trials in {time.perf_counter() - started:.1f}s"
+                   + (f", {failed} failed" if failed else ""))
+        return self.leaderboard
+
+
+@click.command()
+@click.option('--model', 'model_type', type=click.Choice(['rf', 'mlp']), required=True, help='rf (energy RandomForest) or mlp (VM power MLP)')
+@click.option('--x-train', required=True, help='output_x_train artifact of preprocess_data')
+@click.option('--y-train', required=True, help='output_y_train artifact of preprocess_data')
+@click.option('--x-test', required=True, help='output_x_test artifact of preprocess_data')
+@click.option('--y-test', required=True, help='output_y_test artifact of preprocess_data')
+@click.option('--grid', default=None, help='JSON search space, e.g. \'{"n_estimators": [100, 200]}\', random search also takes \'{"lr": {"low": 1e-4, "high": 1e-2, "log": true}}\' (defaults per model)')
+@click.option('--search', type=click.Choice(['grid', 'random']), default='grid', show_default=True, help='Search strategy')
+@click.option('--n-trials', default=None, type=int, help=f'Maximum number of grid trials, or random draws (default {DEFAULT_RANDOM_TRIALS})')
+@click.option('--time-budget', default=None, type=float, help='Stop starting new trials after this many seconds')
+@click.option('--workers', default=None, type=int, help='Process pool size (default: CPU count)')
+@click.option('--random-state', default=42, show_default=True, help='Seed for the models and the random search')
+@click.option('--output', default='leaderboard.csv', show_default=True, help='Where to save the ranked leaderboard')
+def main(model_type, x_train, y_train, x_test, y_test, grid, search, n_trials, time_budget, workers, random_state, output):
+    """Run a hyperparameter sweep for a UC1 model on already preprocessed train/test splits."""
+    sweep = HyperparameterSweep(model_type, x_train, y_train, x_test, y_test,
+                                param_grid=json.loads(grid) if grid else None, search=search, n_trials=n_trials,
+                                time_budget=time_budget, max_workers=workers, random_state=random_state)
+    leaderboard = sweep.run()
+    leaderboard.to_csv(output)
+    click.echo(leaderboard.to_string())
+    click.echo(f"✅ Leaderboard saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
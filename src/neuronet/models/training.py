@@ -0,0 +1,86 @@
+import copy
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+from neuronet.models.mlp import MLP
+
+
+def fit_mlp(X: np.ndarray, y: np.ndarray, epochs: int, lr: float, batch_size: int = 1024,
+            num_threads: Optional[int] = None, val_fraction: float = 0.1, patience: int = 5, seed: int = 42,
+            model: Optional[MLP] = None, log: Callable[[str], None] = print) -> Tuple[MLP, List[Dict[str, float]]]:
+    """Train the VM power MLP on pre-materialized tensors.
+
+    Each epoch shuffles with a single index permutation and slices mini-batches with index_select,
+    so there is no DataLoader/TensorDataset per-sample overhead. A `val_fraction` held-out split
+    drives early stopping: training stops after `patience` epochs without improvement and the best
+    weights are restored. Pass `model` to continue training an existing MLP.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    torch.manual_seed(seed)
+    generator = torch.Generator().manual_seed(seed)
+
+    X_all = torch.tensor(np.asarray(X), dtype=torch.float32)
+    y_all = torch.tensor(np.asarray(y), dtype=torch.float32).view(-1, 1)
+
+    # Held-out split for early stopping
+    split = torch.randperm(len(X_all), generator=generator)
+    n_val = int(len(X_all) * val_fraction) if patience > 0 else 0
+    X_val, y_val = X_all[split[:n_val]], y_all[split[:n_val]]
+    X_train, y_train = X_all[split[n_val:]], y_all[split[n_val:]]
+    n_train = len(X_train)
+
+    model = model or MLP(input_dim=X_all.shape[1])
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+
+    history: List[Dict[str, float]] = []
+    best_loss, best_state, bad_epochs = float('inf'), None, 0
+    for epoch in range(epochs):
+        model.train()
+        started = time.perf_counter()
+        order = torch.randperm(n_train, generator=generator)
+        running_loss = torch.zeros(())
+        for start in range(0, n_train, batch_size):
+            idx = order[start:start + batch_size]
+            batch_x, batch_y = X_train.index_select(0, idx), y_train.index_select(0, idx)
+            optimizer.zero_grad(set_to_none=True)
+            loss = criterion(model(batch_x), batch_y)
+            loss.backward()
+            optimizer.step()
+            # Accumulate on the tensor, no per-batch .item() sync
+            running_loss += loss.detach() * len(idx)
+        elapsed = time.perf_counter() - started
+
+        epoch_stats = {
+            'epoch': epoch + 1,
+            'loss': float(running_loss) / max(n_train, 1),
+            'samples_per_s': n_train / elapsed if elapsed > 0 else 0.0,
+        }
+        if n_val:
+            model.eval()
+            with torch.no_grad():
+                epoch_stats['val_loss'] = float(criterion(model(X_val), y_val))
+        history.append(epoch_stats)
+        log(f"Epoch [{epoch + 1}/{epochs}], Loss: {epoch_stats['loss']:.4f}"
+            + (f", Val loss: {epoch_stats['val_loss']:.4f}" if n_val else "")
+            + f", {epoch_stats['samples_per_s']:.0f} samples/s")
+
+        if n_val:
+            if epoch_stats['val_loss'] < best_loss:
+                best_loss, best_state, bad_epochs = epoch_stats['val_loss'], copy.deepcopy(model.state_dict()), 0
+            else:
+                bad_epochs += 1
+                if bad_epochs >= patience:
+                    log(f"Early stopping after {epoch + 1} epochs, best val loss: {best_loss:.4f}")
+                    break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    model.eval()
+    return model, history
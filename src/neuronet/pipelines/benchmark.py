@@ -0,0 +1,369 @@
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import click
+import pandas as pd
+
+from neuronet.pipelines.local import PIPELINES, pipeline_defaults
+
+# Processor classes, run on a directory of raw exports
+PROCESSORS = {
+    'k8s': ('neuronet.preprocessing.k8s', 'K8SProcessor'),
+    'kepler': ('neuronet.preprocessing.kepler', 'KeplerPreprocessor'),
+    'pdu': ('neuronet.preprocessing.pdu', 'PDUDataProcessor'),
+    'proxmox': ('neuronet.preprocessing.proxmox', 'ProxmoxDataProcessor'),
+    'scaphandre': ('neuronet.preprocessing.scaphandre', 'ScaphandreProcessor'),
+}
+# Dataset builders and the processed CSVs they are built from
+BUILDERS = {
+    'energy': ('neuronet.datasets.energy_dataset', 'EnergyDatasetBuilder', ['k8s_processed.csv', 'kepler_processed.csv']),
+    'vm_power': ('neuronet.datasets.vm_power_dataset', 'VmPowerDatasetBuilder',
+                 ['proxmox_processed.csv', 'vm_scaphandre_processed.csv']),
+    'host_power': ('neuronet.datasets.host_power_dataset', 'HostPowerDatasetBuilder',
+                   ['pdu_processed.csv', 'host_scaphandre_processed.csv', 'proxmox_processed.csv']),
+}
+# Stages in dependency order: the builders read the processor outputs, the training steps the built datasets
+STAGES = ([f'process_{name}' for name in PROCESSORS] + [f'build_{name}' for name in BUILDERS]
+          + [f'train_{name}' for name in PIPELINES])
+
+# Measurements compared between two result files
+COMPARED = ['seconds', 'peak_rss_mb']
+
+# Startup benchmark: modules imported in a fresh interpreter, and the heavy dependencies reported when loaded
+STARTUP_MODULES = ['neuronet', 'neuronet.influxdb.influxdb_query']
+HEAVY_MODULES = ['numpy', 'pandas', 'influxdb_client', 'dotenv', 'sklearn', 'torch']
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process so far.
+
+    On Linux ru_maxrss keeps the peak of the parent across fork + exec, so VmHWM (which starts afresh
+    in every spawned process) is read from /proc; elsewhere ru_maxrss is used (in bytes on macOS).
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def load_class(module: str, name: str):
+    return getattr(importlib.import_module(module), name)
+
+
+def prepare_process(name: str, data_dir: str, params: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+    processor = load_class(*PROCESSORS[name])(data_dir)
+
+    def run():
+        processor.run()
+        # The Scaphandre processor keeps the host and VM exports apart
+        frames = processor.dataframes if hasattr(processor, 'dataframes') else processor.dataframes_host + processor.dataframes_vm
+        return {'rows_in': sum(len(df) for df in frames)}
+
+    return run
+
+
+def prepare_build(name: str, data_dir: str, params: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+    module, cls, inputs = BUILDERS[name]
+    frames = [pd.read_csv(os.path.join(data_dir, 'processed', file)) for file in inputs]
+    builder = load_class(module, cls)(*frames)
+
+    def run():
+        dataset = builder.build()
+        # Saved for the training stages, outside of the timed call
+        run.dataset = dataset
+        return {'rows_in': sum(len(df) for df in frames), 'rows_out': len(dataset)}
+
+    run.dataset = None
+    return run
+
+
+def prepare_train(name: str, data_dir: str, params: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+    """The train_model step of a UC1 pipeline on the split preprocess_data would produce."""
+    from sklearn.model_selection import train_test_split
+
+    p = params[name]
+    dataset = pd.read_csv(os.path.join(data_dir, 'processed', f'{name}_dataset.csv'))
+    X_train, _, y_train, _ = train_test_split(dataset[p['features']], dataset[p['target']],
+                                              test_size=p['test_size'], random_state=p['random_state'])
+
+    if name == 'energy':
+        from sklearn.ensemble import RandomForestRegressor
+
+        def run():
+            RandomForestRegressor(n_estimators=p['n_estimators'], random_state=p['random_state']).fit(X_train, y_train)
+            return {'rows_in': len(X_train)}
+    else:
+        from sklearn.preprocessing import StandardScaler
+
+        from neuronet.models.training import fit_mlp
+
+        def run():
+            X = StandardScaler().fit_transform(X_train)
+            fit_mlp(X, y_train.values, epochs=p['epochs'], lr=p['lr'], batch_size=p['batch_size'],
+                    num_threads=p['num_threads'] or None, val_fraction=p['val_fraction'], patience=p['patience'],
+                    log=lambda message: None)
+            return {'rows_in': len(X_train)}
+    return run
+
+
+def run_stage(stage: str, data_dir: str, params: Dict[str, Any], trace_memory: bool = False) -> Dict[str, Any]:
+    """Run one stage in this (fresh) process: inputs are loaded first, then only the stage itself is
+    timed, with the peak RSS before and after it and optionally the tracemalloc peak of the stage."""
+    kind, name = stage.split('_', 1)
+    prepare = {'process': prepare_process, 'build': prepare_build, 'train': prepare_train}[kind]
+    run = prepare(name, data_dir, params)
+    base_rss = rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - started
+    if trace_memory:
+        result['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    dataset = getattr(run, 'dataset', None)
+    if dataset is not None:
+        dataset.to_csv(os.path.join(data_dir, 'processed', f'{name}_dataset.csv'), index=False)
+    return {'seconds': seconds, 'base_rss_mb': base_rss, 'peak_rss_mb': rss_mb(), **result}
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and package versions the results were measured with."""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    packages = {}
+    for package in ['numpy', 'pandas', 'sklearn', 'torch']:
+        try:
+            packages[package] = importlib.import_module(package).__version__
+        except ImportError:
+            packages[package] = None
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'packages': packages}
+
+
+class BenchmarkSuite:
+    """Time and memory-profile the processors, the dataset builders and the UC1 training steps on
+    generated raw exports at several scales.
+
+    Every stage runs in a freshly spawned process, so its peak RSS is not inflated by earlier stages,
+    and only the stage itself is timed (reading its inputs is not). The generated data of each scale
+    is kept under `workdir` and reused while the generator settings are unchanged.
+    """
+
+    def __init__(self, workdir: str, scales: Sequence[int] = (1, 10, 100), stages: Sequence[str] = STAGES,
+                 generator: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None,
+                 pipelines_dir: str = 'experiment/UC1', trace_memory: bool = False, repeat: int = 1,
+                 log: Callable[[str], None] = print):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)} (expected some of {STAGES})")
+        self.workdir = workdir
+        self.scales = list(scales)
+        # Keep the dependency order whatever order the stages were given in
+        self.stages = [stage for stage in STAGES if stage in stages]
+        self.generator = generator or {}
+        # Training parameters: the pipeline defaults with the overrides applied to both pipelines
+        self.params = {name: {**pipeline_defaults(os.path.join(pipelines_dir, directory, 'pipeline.py')), **(params or {})}
+                       for name, directory in PIPELINES.items()}
+        self.trace_memory = trace_memory
+        self.repeat = repeat
+        self.log = log
+        self.results = pd.DataFrame()
+
+    def data_dir(self, scale: int) -> Tuple[str, float]:
+        """Directory with the raw exports of `scale`, generated unless already there; returns it with the
+        generation time (0 when reused)."""
+        from neuronet.datasets.synthetic import TelemetryGenerator
+
+        data_dir = os.path.join(self.workdir, f'x{scale}')
+        config = {**self.generator, 'scale': scale}
+        config_path = os.path.join(data_dir, 'generator.json')
+        if os.path.exists(config_path):
+            with open(config_path) as f:
+                if json.load(f) == config:
+                    self.log(f"🔄 Reusing the x{scale} exports in {data_dir}")
+                    return data_dir, 0.0
+        started = time.perf_counter()
+        TelemetryGenerator(**config).generate(data_dir, log=self.log)
+        with open(config_path, 'w') as f:
+            json.dump(config, f)
+        return data_dir, time.perf_counter() - started
+
+    def run(self) -> pd.DataFrame:
+        rows = []
+        spawn = multiprocessing.get_context('spawn')
+        for scale in self.scales:
+            data_dir, generate_s = self.data_dir(scale)
+            raw_mb = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir)
+                         if f.endswith('.csv')) / 1024 ** 2
+            for stage in self.stages:
+                runs = []
+                for _ in range(self.repeat):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                        runs.append(pool.submit(run_stage, stage, data_dir, self.params, self.trace_memory).result())
+                # Fastest run and largest memory peak over the repeats
+                result = {**runs[0], 'seconds': min(r['seconds'] for r in runs),
+                          'peak_rss_mb': max(r['peak_rss_mb'] for r in runs)}
+                rows.append({'scale': scale, 'stage': stage, 'raw_mb': raw_mb, 'generate_s': generate_s, **result})
+                self.log(f"✅ x{scale} {stage}: {result['seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB")
+        self.results = pd.DataFrame(rows)
+        return self.results
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({**environment(), 'scales': self.scales, 'generator': self.generator, 'params': self.params,
+                       'repeat': self.repeat, 'trace_memory': self.trace_memory, 'results': self.results.to_dict(orient='records')}, f, indent=2,
+                      default=str)
+
+
+def load_results(path: str) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """Settings and results of a saved benchmark run."""
+    with open(path) as f:
+        saved = json.load(f)
+    return saved, pd.DataFrame(saved.pop('results'))
+
+
+def compare(baseline: pd.DataFrame, current: pd.DataFrame, threshold: float = 0.2) -> pd.DataFrame:
+    """Current/baseline ratio of the time and peak RSS of every (scale, stage) measured in both, with a
+    `regression` flag where a ratio exceeds 1 + threshold."""
+    merged = baseline.merge(current, on=['scale', 'stage'], suffixes=('_baseline', '_current'))
+    for metric in COMPARED:
+        merged[f'{metric}_ratio'] = merged[f'{metric}_current'] / merged[f'{metric}_baseline']
+    merged['regression'] = (merged[[f'{metric}_ratio' for metric in COMPARED]] > 1 + threshold).any(axis=1)
+    return merged[['scale', 'stage'] + [f'{metric}_{suffix}' for metric in COMPARED
+                                        for suffix in ['baseline', 'current', 'ratio']] + ['regression']]
+
+
+@click.command()
+@click.option('--workdir', default='benchmark_data', show_default=True, help='Where the generated exports are kept')
+@click.option('--scales', default='1,10,100', show_default=True, help='Comma-separated scale factors')
+@click.option('--stage', 'stages', multiple=True, type=click.Choice(STAGES), help='Stages to run (default: all)')
+@click.option('--servers', default=4, show_default=True, help='Servers at 1x')
+@click.option('--vms-per-server', default=4, show_default=True, help='VMs per server')
+@click.option('--pods', default=40, show_default=True, help='k8s pods at 1x')
+@click.option('--containers-per-pod', default=2, show_default=True, help='Containers per pod')
+@click.option('--duration', default='1h', show_default=True, help='Time span of the generated exports')
+@click.option('--interval', default='60s', show_default=True, help='Sampling interval of the generated exports')
+@click.option('--seed', default=42, show_default=True, help='Generator seed')
+@click.option('--pipelines-dir', default='experiment/UC1', show_default=True, help='Directory with the UC1 pipeline folders (training defaults)')
+@click.option('--param', 'overrides', multiple=True, help='Training parameter override KEY=VALUE (VALUE parsed as JSON when possible)')
+@click.option('--tracemalloc', 'trace_memory', is_flag=True, help='Also record the tracemalloc peak of every stage (slows the stages down)')
+@click.option('--repeat', default=1, show_default=True, help='Runs per stage, the fastest is reported')
+@click.option('--output', default=None, help='Results JSON (default: <workdir>/results-<commit>.json)')
+@click.option('--compare', 'baseline', default=None, help='Results JSON of an earlier commit to compare against')
+@click.option('--threshold', default=0.2, show_default=True, help='Relative slowdown or memory growth reported as a regression')
+def main(workdir, scales, stages, servers, vms_per_server, pods, containers_per_pod, duration, interval, seed,
+         pipelines_dir, overrides, trace_memory, repeat, output, baseline, threshold):
+    """Benchmark the processors, dataset builders and UC1 training steps on generated data at several scales."""
+    params: Dict[str, Any] = {}
+    for override in overrides:
+        key, value = override.split('=', 1)
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    generator = {'servers': servers, 'vms_per_server': vms_per_server, 'pods': pods,
+                 'containers_per_pod': containers_per_pod, 'duration': duration, 'interval': interval, 'seed': seed}
+    suite = BenchmarkSuite(workdir, scales=[int(s) for s in scales.split(',')], stages=stages or STAGES,
+                           generator=generator, params=params, pipelines_dir=pipelines_dir,
+                           trace_memory=trace_memory, repeat=repeat, log=click.echo)
+    results = suite.run()
+    output = output or os.path.join(workdir, f"results-{environment()['commit'][:12] or 'local'}.json")
+    suite.save(output)
+    columns = [c for c in ['scale', 'stage', 'rows_in', 'rows_out', 'seconds', 'base_rss_mb', 'peak_rss_mb',
+                           'traced_peak_mb'] if c in results.columns]
+    click.echo(results[columns].round(2).to_string(index=False))
+    click.echo(f"✅ Results saved to {output}")
+
+    if baseline:
+        saved, baseline_results = load_results(baseline)
+        if saved.get('trace_memory', False) != trace_memory:
+            click.echo("⚠️ Only one of the runs used --tracemalloc, its timings are not comparable")
+        comparison = compare(baseline_results, results, threshold)
+        click.echo(comparison.round(2).to_string(index=False))
+        regressions = comparison[comparison['regression']]
+        if len(regressions):
+            click.echo(f"⚠️ {len(regressions)} regressions over {threshold:.0%} against {baseline}")
+            sys.exit(1)
+        click.echo(f"✅ No regressions over {threshold:.0%} against {baseline}")
+
+
+def import_profile(module: str) -> Dict[str, Any]:
+    """Import `module` in a fresh interpreter with -X importtime: its cumulative import time, the
+    heavy dependencies it loaded and its five most expensive imports."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    imports = []
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and not line.rstrip().endswith('imported package'):
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                imports.append((name.strip(), int(cumulative) / 1000))
+    own = dict(imports).get(module, 0.0)
+    top = sorted((item for item in imports if item[0] != module), key=lambda item: -item[1])[:5]
+    return {'import_ms': own, 'wall_s': wall, 'heavy_modules': [m for m in proc.stdout.strip().split(',') if m],
+            'top_imports': [{'module': name, 'ms': ms} for name, ms in top]}
+
+
+def command_seconds(args: Sequence[str], repeat: int) -> float:
+    """Fastest wall-clock time of running `python <args>` to completion."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@click.command()
+@click.option('--module', 'modules', multiple=True, help=f'Modules to import (default: {", ".join(STARTUP_MODULES)})')
+@click.option('--repeat', default=5, show_default=True, help='Runs per measurement, the fastest is reported')
+@click.option('--output', default=None, help='Results JSON (default: print only)')
+def imports(modules, repeat, output):
+    """Benchmark interpreter startup: import time of the neuronet modules and of `query-influxdb --help`."""
+    rows = []
+    for module in modules or STARTUP_MODULES:
+        profiles = [import_profile(module) for _ in range(repeat)]
+        best = min(profiles, key=lambda profile: profile['import_ms'])
+        rows.append({'target': f'import {module}', **best, 'wall_s': min(p['wall_s'] for p in profiles)})
+    rows.append({'target': 'query-influxdb --help',
+                 'wall_s': command_seconds(['-m', 'neuronet.influxdb.influxdb_query', '--help'], repeat)})
+    rows.append({'target': 'python (baseline)', 'wall_s': command_seconds(['-c', 'pass'], repeat)})
+
+    for row in rows:
+        heavy = ', '.join(row.get('heavy_modules', [])) or '-'
+        import_ms = f"{row['import_ms']:.0f} ms import, " if 'import_ms' in row else ''
+        click.echo(f"⏱️ {row['target']}: {import_ms}{row['wall_s'] * 1000:.0f} ms wall (heavy modules: {heavy})")
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump({**environment(), 'repeat': repeat, 'results': rows}, f, indent=2)
+        click.echo(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
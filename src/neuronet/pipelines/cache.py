@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence
+
+import click
+import pandas as pd
+
+# Environment variable enabling the cache when a step is not given a cache directory
+CACHE_DIR_ENV = 'NEURONET_CACHE_DIR'
+
+
+def hash_path(path: str, digest=None, ignore: Sequence[str] = ()):
+    """Hash the content of a file, or of every file of a directory with its relative path."""
+    digest = digest or hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in ignore)
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                hash_path(file_path, digest)
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """Hash of the installed neuronet sources, so changes to the processors or builders invalidate the entries."""
+    import neuronet
+
+    package_dir = os.path.dirname(os.path.abspath(neuronet.__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, package_dir).encode())
+                hash_path(file_path, digest)
+    return digest.hexdigest()
+
+
+def copy_path(src: str, dst: str):
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+    else:
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        shutil.copy2(src, dst)
+
+
+class ArtifactCache:
+    """Content-addressed store for the outputs of pipeline steps.
+
+    A step's key hashes its name, its parameters (canonical JSON), the content of its input
+    artifacts and the neuronet sources that produce the outputs. On a hit the stored outputs are copied to the step's output paths instead of
+    recomputing them; every lookup is appended to `events.jsonl` with hit/miss and the time saved
+    (the duration of the run that produced the entry). Works on any local or mounted directory,
+    inside or outside Kubeflow.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, 'entries'), exist_ok=True)
+
+    @classmethod
+    def from_env(cls, cache_dir: Optional[str] = None) -> Optional['ArtifactCache']:
+        """Cache at `cache_dir` or $NEURONET_CACHE_DIR, None (caching disabled) if neither is set."""
+        root = cache_dir or os.environ.get(CACHE_DIR_ENV)
+        return cls(root) if root else None
+
+    def key(self, step: str, params: Optional[Dict] = None, inputs: Optional[Dict[str, str]] = None,
+            ignore: Sequence[str] = ()) -> str:
+        """Content hash of a step; `ignore` skips subdirectories of the inputs (e.g. derived outputs)."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'step': step, 'params': params or {}, 'code': code_fingerprint()},
+                                 sort_keys=True, default=str).encode())
+        for name, path in sorted((inputs or {}).items()):
+            digest.update(name.encode())
+            hash_path(path, digest, ignore)
+        return digest.hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, 'entries', key[:2], key)
+
+    def lookup(self, key: str, outputs: Dict[str, str]) -> Optional[Dict]:
+        """Restore the outputs of `key` to their paths, returning the entry metadata on a hit."""
+        entry = self.entry_dir(key)
+        meta_path = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if set(meta['outputs']) != set(outputs):
+            return None
+        for name, path in outputs.items():
+            copy_path(os.path.join(entry, 'outputs', name), path)
+        return meta
+
+    def store(self, key: str, step: str, outputs: Dict[str, str], elapsed: float):
+        # Write to a temporary entry and rename it, so concurrent steps never see a partial entry
+        entry = self.entry_dir(key)
+        staging = os.path.join(self.root, 'entries', f'.tmp-{uuid.uuid4().hex}')
+        for name, path in outputs.items():
+            copy_path(path, os.path.join(staging, 'outputs', name))
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'step': step, 'outputs': sorted(outputs), 'elapsed_s': elapsed, 'created': time.time()}, f)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        try:
+            os.rename(staging, entry)
+            return
+        except OSError:
+            pass
+        meta_path = os.path.join(entry, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if set(json.load(f)['outputs']) == set(outputs):
+                    shutil.rmtree(staging, ignore_errors=True)  # another run stored the same key first
+                    return
+        # The existing entry holds another output set (or is incomplete) and would never be hit: replace it
+        stale = os.path.join(self.root, 'entries', f'.stale-{uuid.uuid4().hex}')
+        try:
+            os.rename(entry, stale)
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(stale, ignore_errors=True)
+
+    def record(self, step: str, key: str, hit: bool, time_saved: float, elapsed: float):
+        event = {'step': step, 'key': key, 'hit': hit, 'time_saved_s': time_saved, 'elapsed_s': elapsed,
+                 'timestamp': time.time()}
+        with open(os.path.join(self.root, 'events.jsonl'), 'a') as f:
+            f.write(json.dumps(event) + '\n')
+
+    def restore(self, step: str, key: str, outputs: Dict[str, str]) -> bool:
+        """Copy a cached entry to `outputs` and record the hit, False (nothing recorded) on a miss."""
+        started = time.perf_counter()
+        meta = self.lookup(key, outputs)
+        if meta is None:
+            return False
+        elapsed = time.perf_counter() - started
+        time_saved = max(meta['elapsed_s'] - elapsed, 0.0)
+        self.record(step, key, True, time_saved, elapsed)
+        print(f"♻️ {step}: cache hit {key[:12]}, saved {time_saved:.1f}s")
+        return True
+
+    def save(self, step: str, key: str, outputs: Dict[str, str], elapsed: float):
+        """Store freshly computed `outputs` and record the miss with the time it took."""
+        self.store(key, step, outputs, elapsed)
+        self.record(step, key, False, 0.0, elapsed)
+        print(f"💾 {step}: cache miss {key[:12]}, stored after {elapsed:.1f}s")
+
+    def run(self, step: str, fn: Callable[[], None], outputs: Dict[str, str], params: Optional[Dict] = None,
+            inputs: Optional[Dict[str, str]] = None, ignore: Sequence[str] = ()) -> bool:
+        """Run `fn` (which writes `outputs`) unless an entry for the same step/params/inputs exists.
+
+        Returns True on a cache hit.
+        """
+        started = time.perf_counter()
+        key = self.key(step, params, inputs, ignore)
+        if self.restore(step, key, outputs):
+            return True
+        fn()
+        self.save(step, key, outputs, time.perf_counter() - started)
+        return False
+
+    def summary(self) -> pd.DataFrame:
+        """Hits, misses and time saved per step from the event log."""
+        events_path = os.path.join(self.root, 'events.jsonl')
+        if not os.path.exists(events_path):
+            return pd.DataFrame(columns=['step', 'lookups', 'hits', 'misses', 'hit_rate', 'time_saved_s'])
+        events = pd.read_json(events_path, lines=True)
+        summary = events.groupby('step').agg(lookups=('hit', 'size'), hits=('hit', 'sum'),
+                                             time_saved_s=('time_saved_s', 'sum'))
+        summary['misses'] = summary['lookups'] - summary['hits']
+        summary['hit_rate'] = summary['hits'] / summary['lookups']
+        return summary.reset_index()[['step', 'lookups', 'hits', 'misses', 'hit_rate', 'time_saved_s']]
+
+    def clear(self):
+        shutil.rmtree(self.root)
+        os.makedirs(os.path.join(self.root, 'entries'), exist_ok=True)
+
+
+@click.command()
+@click.option('--cache-dir', default=None, help=f'Cache directory (default: ${CACHE_DIR_ENV})')
+@click.option('--clear', is_flag=True, help='Delete all cached artifacts and the event log')
+def main(cache_dir, clear):
+    """Show hit/miss and time saved per pipeline step for a local artifact cache."""
+    cache = ArtifactCache.from_env(cache_dir)
+    if cache is None:
+        raise click.UsageError(f"Pass --cache-dir or set ${CACHE_DIR_ENV}")
+    if clear:
+        cache.clear()
+        click.echo(f"✅ Cleared {cache.root}")
+        return
+    click.echo(cache.summary().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+import ast
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import click
+import pandas as pd
+
+# Pipeline directories under experiment/UC1
+PIPELINES = {'energy': 'energy_prediction', 'vm_power': 'vm_power_prediction'}
+
+
+class LocalArtifact:
+    """Local stand-in for a KFP Input/Output artifact: a path, metadata and logged metrics."""
+
+    def __init__(self, path: str, name: str = ''):
+        self.path = path
+        self.uri = path
+        self.name = name
+        self.metadata: Dict[str, Any] = {}
+
+    def log_metric(self, metric: str, value: float):
+        self.metadata[metric] = value
+
+
+class StepOutput(NamedTuple):
+    step: str
+    name: str
+
+
+class Step(NamedTuple):
+    name: str
+    component: Tuple[str, str]  # (component file, function name), importable in any worker process
+    outputs: List[str]
+    kwargs: Dict[str, Any]
+
+
+class ArtifactType:
+    """Input[...]/Output[...] annotation of the kfp.dsl stand-in, subscripting returns the class itself."""
+
+    def __class_getitem__(cls, item):
+        return cls
+
+
+def component(func=None, **_):
+    """@component and @component(base_image=..., packages_to_install=...) of the kfp.dsl stand-in."""
+    return func if func is not None else (lambda f: f)
+
+
+def install_kfp_stub():
+    """Register a minimal `kfp.dsl` module when kfp is not installed, the components only import it for their
+    decorators and annotations, which the local runner does not need."""
+    if 'kfp.dsl' in sys.modules or importlib.util.find_spec('kfp') is not None:
+        return
+    import types
+
+    dsl = types.ModuleType('kfp.dsl')
+    dsl.component = component
+    for artifact in ['Input', 'Output', 'Dataset', 'Model', 'Metrics', 'Artifact']:
+        setattr(dsl, artifact, type(artifact, (ArtifactType,), {}))
+    kfp = types.ModuleType('kfp')
+    kfp.dsl = dsl
+    sys.modules.setdefault('kfp', kfp)
+    sys.modules['kfp.dsl'] = dsl
+
+
+def load_component(path: str, name: str):
+    """Import a component module by file (both UC1 pipelines have a `components` package) and
+    return the plain Python function behind the @component decorator."""
+    module_name = 'neuronet_local_' + os.path.splitext(os.path.relpath(path))[0].replace(os.sep, '_').replace('.', '_')
+    module = sys.modules.get(module_name)
+    if module is None:
+        install_kfp_stub()
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+    component = getattr(module, name)
+    return getattr(component, 'python_func', component)
+
+
+def call_component(component: Tuple[str, str], kwargs: Dict[str, Any]) -> Tuple[float, float, Dict[str, Dict]]:
+    """Run one component function, returning its wall-clock start, its duration and the metadata of its artifacts."""
+    func = load_component(*component)
+    started_at = time.time()
+    started = time.perf_counter()
+    func(**kwargs)
+    elapsed = time.perf_counter() - started
+    return started_at, elapsed, {name: value.metadata for name, value in kwargs.items()
+                                 if isinstance(value, LocalArtifact)}
+
+
+class LocalPipelineRunner:
+    """Run UC1 component functions in-process, without compiling or submitting to Kubeflow.
+
+    Steps are added in pipeline order with `add`, referencing earlier outputs as in the KFP DSL.
+    `run` starts every step as soon as its inputs exist, so independent branches run concurrently
+    in a thread or process pool, and reports the start, end and duration of every step.
+    """
+
+    def __init__(self, workdir: str, max_workers: Optional[int] = None, executor: str = 'thread'):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor: {executor} (expected 'thread' or 'process')")
+        self.workdir = workdir
+        self.max_workers = max_workers
+        self.executor = executor
+        self.steps: Dict[str, Step] = {}
+        self.metadata: Dict[str, Dict[str, Dict]] = {}
+        self.timings = pd.DataFrame()
+
+    def add(self, name: str, component: Tuple[str, str], outputs: Sequence[str] = (), **kwargs) -> Dict[str, StepOutput]:
+        if name in self.steps:
+            raise ValueError(f"Duplicate step name: {name}")
+        self.steps[name] = Step(name, component, list(outputs), kwargs)
+        return {output: StepOutput(name, output) for output in outputs}
+
+    def artifact(self, step: str, output: str) -> LocalArtifact:
+        return LocalArtifact(os.path.join(self.workdir, step, output), name=output)
+
+    def resolve(self, step: Step) -> Dict[str, Any]:
+        kwargs = {key: self.artifact(*value) if isinstance(value, StepOutput) else value
+                  for key, value in step.kwargs.items()}
+        for output in step.outputs:
+            kwargs[output] = self.artifact(step.name, output)
+            os.makedirs(os.path.dirname(kwargs[output].path), exist_ok=True)
+        return kwargs
+
+    def dependencies(self, step: Step) -> set:
+        return {value.step for value in step.kwargs.values() if isinstance(value, StepOutput)}
+
+    def run(self) -> pd.DataFrame:
+        started, started_at = time.perf_counter(), time.time()
+        done, rows = set(), []
+        pending: Dict[Future, str] = {}
+        waiting = dict(self.steps)
+        pool_cls = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+        # By default every ready step starts at once: the fetch steps mostly wait on InfluxDB and subprocesses
+        with pool_cls(max_workers=self.max_workers or len(self.steps) or 1) as pool:
+            while waiting or pending:
+                for name, step in list(waiting.items()):
+                    if self.dependencies(step) <= done:
+                        click.echo(f"🔄 Starting {name}")
+                        future = pool.submit(call_component, step.component, self.resolve(step))
+                        pending[future] = name
+                        del waiting[name]
+                if not pending:
+                    raise ValueError(f"Steps with unknown dependencies: {sorted(waiting)}")
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = pending.pop(future)
+                    try:
+                        step_start, elapsed, metadata = future.result()
+                    except Exception:
+                        click.echo(f"❌ {name} failed after {time.perf_counter() - started:.1f}s of the run")
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    self.metadata[name] = metadata
+                    done.add(name)
+                    # Start and end relative to the start of the run, as measured in the worker
+                    step_start -= started_at
+                    rows.append({'step': name, 'start_s': step_start, 'end_s': step_start + elapsed,
+                                 'duration_s': elapsed})
+                    click.echo(f"✅ {name} done in {elapsed:.1f}s")
+
+        self.timings = pd.DataFrame(rows)
+        wall = time.perf_counter() - started
+        click.echo(f"⏱️ {len(rows)} steps in {wall:.1f}s wall clock ({self.timings['duration_s'].sum():.1f}s of step time)")
+        with open(os.path.join(self.workdir, 'timings.json'), 'w') as f:
+            json.dump({'wall_s': wall, 'steps': rows, 'metadata': self.metadata}, f, indent=2, default=str)
+        return self.timings
+
+
+def pipeline_defaults(pipeline_file: str) -> Dict[str, Any]:
+    """Default parameters of the @dsl.pipeline function in a pipeline.py, read without importing kfp."""
+    with open(pipeline_file) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and any('pipeline' in ast.unparse(d) for d in node.decorator_list):
+            args = node.args.args
+            defaults = dict(zip([a.arg for a in args[len(args) - len(node.args.defaults):]], node.args.defaults))
+            return {name: ast.literal_eval(value) for name, value in defaults.items()}
+    raise ValueError(f"No @dsl.pipeline function in {pipeline_file}")
+
+
+def add_uc1_pipeline(runner: LocalPipelineRunner, pipeline: str, pipelines_dir: str, params: Dict[str, Any]):
+    """Add the steps of a UC1 pipeline, mirroring its pipeline.py, with `pipeline` as step prefix."""
+    directory = os.path.join(pipelines_dir, PIPELINES[pipeline])
+    p = {**pipeline_defaults(os.path.join(directory, 'pipeline.py')), **params}
+
+    def component(file: str, name: str) -> Tuple[str, str]:
+        return os.path.abspath(os.path.join(directory, 'components', file)), name
+
+    sources = ['kepler', 'k8s'] if pipeline == 'energy' else ['proxmox', 'scaphandre']
+    data = runner.add(f'{pipeline}/get_data', component('get_data.py', 'get_data'),
+                      outputs=[f'output_{s}_dir' for s in sources],
+                      token=p['token'], start=p['start'], stop=p['stop'], cache_dir=p.get('cache_dir', ''),
+                      influx_url=p.get('influx_url', ''), data_source=p.get('data_source', ''))
+    pre = runner.add(f'{pipeline}/preprocess_data', component('preprocessing.py', 'preprocess_data'),
+                     outputs=['output_x_train', 'output_x_test', 'output_y_train', 'output_y_test', 'output_meta_test',
+                              'output_quality_report', 'quality_metrics'],
+                     **{f'input_{s}_dir': data[f'output_{s}_dir'] for s in sources},
+                     features=p['features'], target=p['target'], test_size=p['test_size'],
+                     random_state=p['random_state'], cache_dir=p.get('cache_dir', ''))
+
+    if pipeline == 'energy':
+        train_params = {key: p[key] for key in ['n_estimators', 'random_state', 'previous_model', 'max_estimators']}
+    else:
+        train_params = {key: p[key] for key in ['epochs', 'lr', 'batch_size', 'in_memory', 'num_threads',
+                                                'val_fraction', 'patience', 'previous_model', 'replay_size',
+                                                'replay_ratio']}
+    train = runner.add(f'{pipeline}/train_model', component('training.py', 'train_model'), outputs=['output_model'],
+                       input_x_train=pre['output_x_train'], input_y_train=pre['output_y_train'], **train_params)
+
+    runner.add(f'{pipeline}/evaluate_model', component('evaluate.py', 'evaluate_model'),
+               outputs=['evaluation_metrics', 'output_entity_metrics', 'output_time_metrics'],
+               input_x_test=pre['output_x_test'], input_y_test=pre['output_y_test'],
+               input_meta_test=pre['output_meta_test'], input_model=train['output_model'],
+               streaming=p['streaming_eval'], chunk_size=p['eval_chunk_size'])
+    if pipeline == 'energy':
+        runner.add(f'{pipeline}/export_model', component('export.py', 'export_model'), outputs=['output_forest'],
+                   input_x_test=pre['output_x_test'], input_model=train['output_model'])
+
+
+@click.command()
+@click.option('--pipeline', 'pipelines', type=click.Choice(['energy', 'vm_power', 'all']), default='all', show_default=True, help='UC1 pipeline(s) to run, "all" runs both concurrently')
+@click.option('--pipelines-dir', default='experiment/UC1', show_default=True, help='Directory with the UC1 pipeline folders')
+@click.option('--workdir', default='local_run', show_default=True, help='Where step artifacts and timings.json are written')
+@click.option('--token', default=None, help='InfluxDB token (default: $INFLUXDB_TOKEN)')
+@click.option('--start', default=None, help='Range start (default: the pipeline default)')
+@click.option('--stop', default=None, help='Range stop (default: the pipeline default)')
+@click.option('--influx-url', default='', help='InfluxDB URL used by get_data')
+@click.option('--standin-data', default=None, help='Serve this directory or archive of query-influxdb CSVs with the local InfluxDB stand-in')
+@click.option('--cache-dir', default='', help='Artifact cache directory for get_data/preprocess_data')
+@click.option('--param', 'overrides', multiple=True, help='Pipeline parameter override KEY=VALUE (VALUE parsed as JSON when possible)')
+@click.option('--workers', default=None, type=int, help='Concurrent steps (default: no limit)')
+@click.option('--executor', type=click.Choice(['thread', 'process']), default='thread', show_default=True, help='Run steps in threads or worker processes')
+def main(pipelines, pipelines_dir, workdir, token, start, stop, influx_url, standin_data, cache_dir, overrides,
+         workers, executor):
+    """Run the UC1 pipelines locally, in-process, with independent steps in parallel and per-step timings."""
+    params: Dict[str, Any] = {'token': token or os.getenv('INFLUXDB_TOKEN') or 'local', 'cache_dir': cache_dir,
+                              'influx_url': influx_url}
+    if start:
+        params['start'] = start
+    if stop:
+        params['stop'] = stop
+    for override in overrides:
+        key, value = override.split('=', 1)
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+
+    standin = None
+    if standin_data:
+        from neuronet.influxdb.standin import InfluxStandIn
+
+        from neuronet.pipelines.cache import hash_path
+
+        standin = InfluxStandIn.from_csv_dir(standin_data)
+        params['influx_url'] = standin.start()
+        # The stand-in listens on a new port every run, cache get_data on the content it serves instead
+        params['data_source'] = f"standin:{hash_path(standin_data).hexdigest()}"
+        click.echo(f"✅ InfluxDB stand-in with {len(standin.points)} points on {params['influx_url']}")
+
+    runner = LocalPipelineRunner(os.path.abspath(workdir), max_workers=workers, executor=executor)
+    for pipeline in (list(PIPELINES) if pipelines == 'all' else [pipelines]):
+        add_uc1_pipeline(runner, pipeline, pipelines_dir, params)
+    try:
+        timings = runner.run()
+    finally:
+        if standin is not None:
+            standin.stop()
+    click.echo(timings.round(2).to_string(index=False))
+    for step, artifacts in runner.metadata.items():
+        metrics = artifacts.get('evaluation_metrics')
+        if metrics:
+            click.echo(f"📊 {step}: " + ", ".join(f"{k}={v:.4f}" for k, v in metrics.items()))
+
+
+if __name__ == '__main__':
+    main()
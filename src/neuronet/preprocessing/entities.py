@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Identifier columns repeated on every row of the processed plugin data
+ENTITY_COLUMNS = ['container_name', 'namespace', 'pod_name', 'node_name', 'vm_name', 'url', 'inventory-server-id']
+
+
+def entities_path(csv_path: str) -> str:
+    """Dictionary file saved next to a processed CSV, e.g. processed/k8s_processed.entities.json."""
+    return f'{os.path.splitext(csv_path)[0]}.entities.json'
+
+
+class EntityDictionary:
+    """Shared interned string <-> int32 id dictionary for entity identifier columns.
+
+    Processors encode their entity columns once, so pivots, groupbys and merges downstream
+    hash small integers instead of repeated Python strings. The same instance must be shared
+    by all processors whose outputs are joined, so equal names get equal ids.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for name in names or []:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        """Return the id of `name`, assigning the next free id to new names."""
+        entity_id = self.ids.get(name)
+        if entity_id is None:
+            entity_id = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.ids[name] = entity_id
+        return entity_id
+
+    def encode(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Replace the entity columns of `df` (in place) by their int32 ids, missing names become <NA>."""
+        for col in columns or [c for c in ENTITY_COLUMNS if c in df.columns]:
+            if pd.api.types.is_integer_dtype(df[col]):
+                continue  # already encoded
+            # Only the distinct values go through the dictionary, rows are mapped with the factorize codes
+            codes, uniques = pd.factorize(df[col])
+            lookup = np.array([self.add(str(name)) for name in uniques], dtype='int32')
+            encoded = lookup[codes] if len(lookup) else np.zeros(len(codes), dtype='int32')
+            if (codes < 0).any():
+                encoded = pd.array(encoded, dtype='Int32')
+                encoded[codes < 0] = pd.NA
+            df[col] = encoded
+        return df
+
+    def decode(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Replace the entity id columns of `df` (in place) by their names."""
+        names = np.array(self.names + [np.nan], dtype=object)
+        for col in columns or [c for c in ENTITY_COLUMNS if c in df.columns]:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                continue  # already names
+            codes = df[col].fillna(-1).to_numpy(dtype='int64')
+            df[col] = names[codes]
+        return df
+
+    def ids_matching(self, pattern: str) -> np.ndarray:
+        """Ids of the names containing the regex `pattern` (e.g. 'k8s' for the k8s VMs)."""
+        return np.flatnonzero(pd.Series(self.names, dtype=object).str.contains(pattern, na=False))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'names': self.names}, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'EntityDictionary':
+        with open(path) as f:
+            return cls(json.load(f)['names'])
+
+    @classmethod
+    def load_for(cls, csv_path: str) -> Optional['EntityDictionary']:
+        """Dictionary a processed CSV was encoded with, None when its ids were never encoded.
+
+        Outputs written before per-file dictionaries fall back to the directory's shared entities.json.
+        """
+        for path in [entities_path(csv_path), os.path.join(os.path.dirname(os.path.abspath(csv_path)), 'entities.json')]:
+            if os.path.exists(path):
+                return cls.load(path)
+        return None
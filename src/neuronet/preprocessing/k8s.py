@@ -1,22 +1,27 @@
 import os
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.sources import output_directory, read_csv_files
+
 
 class K8SProcessor:
-    def __init__(self, directory):
-        self.directory = directory
+    def __init__(self, directory, entities: Optional[EntityDictionary] = None, threads: int = 1):
+        # Raw exports can be a directory or a compressed archive, processed/ goes next to the archive
+        self.source = directory
+        self.directory = output_directory(directory)
+        self.threads = threads
         self.dataframes: List[pd.DataFrame] = []
         self.final_df: pd.DataFrame = pd.DataFrame()
+        # Shared entity dictionary, entity columns are saved as int32 ids when given
+        self.entities = entities
 
     def load_files(self):
-        """Load all CSV files starting with 'k8s' from the directory."""
-        for filename in os.listdir(self.directory):
-            if filename.startswith("k8s") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
-                self.dataframes.append(df)
+        """Load all CSV files starting with 'k8s' from the directory or archive."""
+        for _, df in read_csv_files(self.source, "k8s", threads=self.threads):
+            self.dataframes.append(df)
 
     def process_dataframes(self):
         """Process and pivot each raw K8S dataframe, then merge."""
@@ -26,6 +31,9 @@ class K8SProcessor:
             # Ensure proper timestamp format
             df['_time'] = pd.to_datetime(df['_time'])
             df = df.drop(columns=['result', 'table', '_start', '_stop', '_measurement', 'inventory-cluster-id', 'inventory-rack-id', 'inventory-server-id', 'plugin'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
             df = df[df['container_name'].notna()]
             df = df[df['pod_name'].notna()]
 
@@ -46,12 +54,16 @@ class K8SProcessor:
         """Save the final processed dataset to a CSV file."""
         self.final_df.to_csv(output_path, index=False)
 
-    def run(self, output_csv: str = "k8s_processed.csv"):
-        """Main execution method."""
+    def run(self, output_csv: str = "k8s_processed.csv", store=None):
+        """Main execution method, `store` (a TimeSeriesStore) also receives the processed frame."""
         self.load_files()
         self.process_dataframes()
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.save_to_csv(os.path.join(self.directory, 'processed', output_csv))
+        if self.entities is not None:
+            self.entities.save(entities_path(os.path.join(self.directory, 'processed', output_csv)))
+        if store is not None:
+            store.write('k8s', self.final_df, self.entities)
         print(f"✅ Processed data saved to: {os.path.join(self.directory, 'processed', output_csv)}")
 
 if __name__ == "__main__":
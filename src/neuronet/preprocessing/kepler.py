@@ -1,21 +1,27 @@
 import os
+from typing import Optional
 
 import pandas as pd
 
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.sources import output_directory, read_csv_files
+
 
 class KeplerPreprocessor:
-    def __init__(self, directory):
-        self.directory = directory
+    def __init__(self, directory, entities: Optional[EntityDictionary] = None, threads: int = 1):
+        # Raw exports can be a directory or a compressed archive, processed/ goes next to the archive
+        self.source = directory
+        self.directory = output_directory(directory)
+        self.threads = threads
         self.dataframes = []
         self.final_df = pd.DataFrame()
+        # Shared entity dictionary, entity columns are saved as int32 ids when given
+        self.entities = entities
 
     def load_files(self):
-        """Load all CSV files starting with 'kepler' from the directory."""
-        for filename in os.listdir(self.directory):
-            if filename.startswith("kepler") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
-                self.dataframes.append(df)
+        """Load all CSV files starting with 'kepler' from the directory or archive."""
+        for _, df in read_csv_files(self.source, "kepler", threads=self.threads):
+            self.dataframes.append(df)
 
     def process_dataframes(self):
         """Process and pivot each raw Kepler dataframe, then merge."""
@@ -24,6 +30,9 @@ class KeplerPreprocessor:
         for df in self.dataframes:
             # Ensure proper timestamp format
             df['_time'] = pd.to_datetime(df['_time'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
 
             # Pivot based on time and measurement field
             df_pivoted = df.pivot_table(
@@ -42,12 +51,16 @@ class KeplerPreprocessor:
         """Save the final processed dataset to a CSV file."""
         self.final_df.to_csv(output_path, index=False)
 
-    def run(self, output_csv: str = "kepler_processed.csv"):
-        """Main execution method."""
+    def run(self, output_csv: str = "kepler_processed.csv", store=None):
+        """Main execution method, `store` (a TimeSeriesStore) also receives the processed frame."""
         self.load_files()
         self.process_dataframes()
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.save_to_csv(os.path.join(self.directory, 'processed', output_csv))
+        if self.entities is not None:
+            self.entities.save(entities_path(os.path.join(self.directory, 'processed', output_csv)))
+        if store is not None:
+            store.write('kepler', self.final_df, self.entities)
         print(f"✅ Processed data saved to: {os.path.join(self.directory, 'processed', output_csv)}")
 
 if __name__ == "__main__":
@@ -1,21 +1,31 @@
 import os
 import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from neuronet.preprocessing.counters import CounterRateCalculator
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.sources import output_directory, read_csv_files
 
 
 class PDUDataProcessor:
-    def __init__(self, directory: str):
-        self.directory = directory
+    def __init__(self, directory: str, energy_rates: bool = False, max_gap: str = '5min',
+                 entities: Optional[EntityDictionary] = None, threads: int = 1):
+        # Raw exports can be a directory or a compressed archive, processed/ goes next to the archive
+        self.source = directory
+        self.directory = output_directory(directory)
+        self.threads = threads
+        # Derive average power per outlet from the cumulatedEnergy/partialEnergy (Wh) counters
+        self.energy_rates = energy_rates
+        self.max_gap = max_gap
         self.dataframes: List[pd.DataFrame] = []
         self.final_df: pd.DataFrame = pd.DataFrame()
+        # Shared entity dictionary, entity columns are saved as int32 ids when given
+        self.entities = entities
 
     def load_files(self):
-        """Load all CSV files starting with 'pdu' from the directory."""
-        for filename in os.listdir(self.directory):
-            if filename.startswith("pdu") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
-                self.dataframes.append(df)
+        """Load all CSV files starting with 'pdu' from the directory or archive."""
+        for _, df in read_csv_files(self.source, "pdu", threads=self.threads):
+            self.dataframes.append(df)
 
     def process_dataframes(self):
         """Process and pivot each raw PDU dataframe, then merge."""
@@ -24,6 +34,9 @@ class PDUDataProcessor:
         for df in self.dataframes:
             # Ensure proper timestamp format
             df['_time'] = pd.to_datetime(df['_time'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
 
             # Pivot based on time and measurement field
             df_pivoted = df.pivot_table(
@@ -33,6 +46,13 @@ class PDUDataProcessor:
                 aggfunc='mean'  # in case of duplicate rows
             ).reset_index()
 
+            if self.energy_rates:
+                counters = [c for c in ['cumulatedEnergy', 'partialEnergy'] if c in df_pivoted.columns]
+                calculator = CounterRateCalculator(['inventory-server-id', 'placement', 'url'],
+                                                   max_gap=self.max_gap, scale=3600)
+                rates = calculator.compute(df_pivoted, counters, suffix='_watts')
+                df_pivoted = pd.concat([df_pivoted, rates], axis=1)
+
             # Add URL or other metadata if desired
             if 'url' in df.columns:
                 meta = df[['inventory-server-id', 'url']].drop_duplicates()
@@ -47,12 +67,16 @@ class PDUDataProcessor:
         """Save the final processed dataset to a CSV file."""
         self.final_df.to_csv(output_path, index=False)
 
-    def run(self, output_csv: str = "pdu_processed.csv"):
-        """Main execution method."""
+    def run(self, output_csv: str = "pdu_processed.csv", store=None):
+        """Main execution method, `store` (a TimeSeriesStore) also receives the processed frame."""
         self.load_files()
         self.process_dataframes()
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.save_to_csv(os.path.join(self.directory, 'processed', output_csv))
+        if self.entities is not None:
+            self.entities.save(entities_path(os.path.join(self.directory, 'processed', output_csv)))
+        if store is not None:
+            store.write('pdu', self.final_df, self.entities)
         print(f"✅ Processed data saved to: {os.path.join(self.directory, output_csv)}")
 
 if __name__ == "__main__":
@@ -1,21 +1,26 @@
 import os
 import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.sources import output_directory, read_csv_files
 
 
 class ProxmoxDataProcessor:
-    def __init__(self, directory: str):
-        self.directory = directory
+    def __init__(self, directory: str, entities: Optional[EntityDictionary] = None, threads: int = 1):
+        # Raw exports can be a directory or a compressed archive, processed/ goes next to the archive
+        self.source = directory
+        self.directory = output_directory(directory)
+        self.threads = threads
         self.dataframes: List[pd.DataFrame] = []
         self.final_df: pd.DataFrame = pd.DataFrame()
+        # Shared entity dictionary, entity columns are saved as int32 ids when given
+        self.entities = entities
 
     def load_files(self):
-        """Load all CSV files starting with 'proxmox' from the directory."""
-        for filename in os.listdir(self.directory):
-            if filename.startswith("proxmox") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
-                self.dataframes.append(df)
+        """Load all CSV files starting with 'proxmox' from the directory or archive."""
+        for _, df in read_csv_files(self.source, "proxmox", threads=self.threads):
+            self.dataframes.append(df)
 
     def process_dataframes(self):
         """Process and pivot each raw Proxmox dataframe, then merge."""
@@ -23,6 +28,9 @@ class ProxmoxDataProcessor:
 
         for df in self.dataframes:
             df['_time'] = pd.to_datetime(df['_time'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
 
             df['_value'] = pd.to_numeric(df['_value'], errors='coerce')
 
@@ -52,12 +60,16 @@ class ProxmoxDataProcessor:
         """Save the final processed dataset to a CSV file."""
         self.final_df.to_csv(output_path, index=False)
 
-    def run(self, output_csv: str = "proxmox_processed.csv"):
-        """Main execution method."""
+    def run(self, output_csv: str = "proxmox_processed.csv", store=None):
+        """Main execution method, `store` (a TimeSeriesStore) also receives the processed frame."""
         self.load_files()
         self.process_dataframes()
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.save_to_csv(os.path.join(self.directory, 'processed', output_csv))
+        if self.entities is not None:
+            self.entities.save(entities_path(os.path.join(self.directory, 'processed', output_csv)))
+        if store is not None:
+            store.write('proxmox', self.final_df, self.entities)
         print(f"✅ Processed data saved to: {os.path.join(self.directory, 'processed', output_csv)}")
 
 
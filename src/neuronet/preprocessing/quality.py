@@ -0,0 +1,276 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+import pandas as pd
+
+# Columns of the per-entity report, after the plugin and entity columns
+REPORT_COLS = ['rows', 'first', 'last', 'interval_s', 'expected', 'coverage', 'duplicates', 'duplicate_rate', 'gaps',
+               'missing_intervals', 'max_gap_s', 'nan_rate', 'longest_nan_run', 'stuck_rate', 'counter_resets',
+               'out_of_range', 'out_of_range_rate']
+
+
+class PluginCheck(NamedTuple):
+    file: str
+    entity_cols: List[str]
+    counters: List[str]
+    # Valid (min, max) of value columns, None for an open bound
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+# Processed output of every plugin, as written by the processors to <dir>/processed/
+PLUGIN_CHECKS = {
+    'k8s': PluginCheck('k8s_processed.csv', ['namespace', 'pod_name', 'container_name'],
+                       ['cpu_usage_core_nanoseconds'],
+                       {'cpu_usage_nanocores': (0, None), 'memory_usage_bytes': (0, None),
+                        'logsfs_used_bytes': (0, None)}),
+    'kepler': PluginCheck('kepler_processed.csv', ['namespace', 'pod_name', 'container_name'],
+                          ['kepler_container_joules_total'],
+                          {'kepler_container_joules_total': (0, None),
+                           'kepler_container_microwatts_consumption_total': (0, None)}),
+    'pdu': PluginCheck('pdu_processed.csv', ['inventory-server-id', 'placement'], ['cumulatedEnergy'],
+                       {'activePower': (0, 5000), 'current': (0, 32), 'powerFactor': (0, 1)}),
+    'proxmox': PluginCheck('proxmox_processed.csv', ['vm_id'], ['uptime'],
+                           {'cpuload': (0, 1), 'mem_used_percentage': (0, 100), 'disk_used_percentage': (0, 100),
+                            'swap_used_percentage': (0, 100)}),
+    'scaphandre_host': PluginCheck('host_scaphandre_processed.csv', ['url'], [],
+                                   {'scaph_host_power_microwatts': (0, 5e9)}),
+    'scaphandre_vm': PluginCheck('vm_scaphandre_processed.csv', ['vm_id'],
+                                 ['scaph_process_disk_total_read_bytes', 'scaph_process_disk_total_write_bytes'],
+                                 {'scaph_process_cpu_usage_percentage': (0, None),
+                                  'scaph_process_power_consumption_microwatts': (0, 5e9)}),
+}
+
+
+def entity_quality(df: pd.DataFrame, entity_cols: List[str], interval: Optional[str] = None,
+                   counters: Sequence[str] = (), ranges: Optional[Dict[str, Tuple]] = None,
+                   start: Optional[str] = None, stop: Optional[str] = None, time_col: str = '_time') -> pd.DataFrame:
+    """Coverage, gaps, duplicates, NaN runs, stuck counters and out-of-range values of every entity.
+
+    Rows are ordered once by (entity, time) and every check is a numpy pass over the sorted arrays
+    aggregated with bincount, so the cost does not depend on the number of entities. `interval`
+    defaults to the median step between samples of the same entity; coverage is measured against
+    the [start, stop] window, by default the first and last sample of the frame.
+    """
+    ranges = {col: bounds for col, bounds in (ranges or {}).items() if col in df.columns}
+    counters = [col for col in counters if col in df.columns]
+    if df.empty:
+        return pd.DataFrame(columns=entity_cols + REPORT_COLS)
+
+    groups = df.groupby(entity_cols, sort=False, dropna=False).ngroup().to_numpy()
+    times = pd.to_datetime(df[time_col], utc=True).to_numpy(dtype='datetime64[ns]').view('int64')
+    order = np.lexsort((times, groups))
+    codes, t = groups[order], times[order]
+    n, n_rows = groups.max() + 1, len(order)
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:] - 1, n_rows - 1]
+    same = codes[1:] == codes[:-1]
+    step = np.diff(t)
+    nxt = codes[1:]
+
+    if interval:
+        interval_ns = pd.Timedelta(interval).value
+    else:
+        positive = step[same & (step > 0)]
+        interval_ns = int(np.median(positive)) if len(positive) else pd.Timedelta('1min').value
+    window_start = pd.Timestamp(start).value if start else t.min()
+    window_stop = pd.Timestamp(stop).value if stop else t.max()
+    expected = (window_stop - window_start) // interval_ns + 1
+
+    rows = np.bincount(codes, minlength=n)
+    duplicate = same & (step == 0)
+    duplicates = np.bincount(nxt[duplicate], minlength=n)
+    gap = same & (step > 1.5 * interval_ns)
+    gaps = np.bincount(nxt[gap], minlength=n)
+    missing = np.bincount(nxt[gap], weights=np.round(step[gap] / interval_ns) - 1, minlength=n)
+    # Intervals missing before the first and after the last sample of the entity count too
+    missing += np.maximum((t[starts] - window_start) // interval_ns, 0)
+    missing += np.maximum((window_stop - t[ends]) // interval_ns, 0)
+    max_gap = np.zeros(n)
+    np.maximum.at(max_gap, nxt[gap], step[gap] / 1e9)
+
+    # NaN in any value column: rate and longest run of consecutive NaN rows per entity
+    value_cols = [c for c in df.columns if c != time_col and c not in entity_cols
+                  and pd.api.types.is_numeric_dtype(df[c])]
+    values = df[value_cols].to_numpy(dtype='float64')[order] if value_cols else np.empty((n_rows, 0))
+    nan_row = np.isnan(values).any(axis=1)
+    idx = np.arange(n_rows)
+    entity_start = np.zeros(n_rows, dtype=bool)
+    entity_start[starts] = True
+    last_valid = np.maximum.accumulate(np.where(~nan_row, idx, np.where(entity_start, idx - 1, -1)))
+    nan_run = np.where(nan_row, idx - last_valid, 0)
+    longest_nan = np.zeros(n, dtype='int64')
+    np.maximum.at(longest_nan, codes, nan_run)
+
+    # Counters that do not move between two distinct timestamps, and counter decreases (resets)
+    stuck = np.zeros(n)
+    resets = np.zeros(n)
+    advancing = same & (step > 0)
+    for col in counters:
+        delta = np.diff(values[:, value_cols.index(col)])
+        stuck += np.bincount(nxt[advancing & (delta == 0)], minlength=n)
+        resets += np.bincount(nxt[advancing & (delta < 0)], minlength=n)
+    steps = np.maximum(rows - 1 - duplicates, 1)
+
+    out_of_range = np.zeros(n)
+    for col, (low, high) in ranges.items():
+        column = values[:, value_cols.index(col)]
+        bad = np.zeros(n_rows, dtype=bool)
+        if low is not None:
+            bad |= column < low
+        if high is not None:
+            bad |= column > high
+        out_of_range += np.bincount(codes[bad], minlength=n)
+
+    report = df[entity_cols].iloc[order[starts]].reset_index(drop=True)
+    distinct = rows - duplicates
+    report['rows'] = rows
+    report['first'] = pd.to_datetime(t[starts], utc=True)
+    report['last'] = pd.to_datetime(t[ends], utc=True)
+    report['interval_s'] = interval_ns / 1e9
+    report['expected'] = expected
+    report['coverage'] = np.minimum(distinct / expected, 1.0)
+    report['duplicates'] = duplicates
+    report['duplicate_rate'] = duplicates / rows
+    report['gaps'] = gaps
+    report['missing_intervals'] = missing.astype('int64')
+    report['max_gap_s'] = max_gap
+    report['nan_rate'] = np.bincount(codes, weights=nan_row, minlength=n) / rows
+    report['longest_nan_run'] = longest_nan
+    report['stuck_rate'] = stuck / (steps * len(counters)) if counters else 0.0
+    report['counter_resets'] = resets.astype('int64')
+    report['out_of_range'] = out_of_range.astype('int64')
+    report['out_of_range_rate'] = out_of_range / (rows * len(ranges)) if ranges else 0.0
+    return report
+
+
+def summarize(report: pd.DataFrame, min_coverage: float = 0.9) -> Dict[str, float]:
+    """Plugin-level numbers of a per-entity report (rates weighted by rows)."""
+    rows = report['rows'].sum()
+    if not rows:
+        return {'entities': 0, 'rows': 0}
+    weighted = lambda col: float((report[col] * report['rows']).sum() / rows)  # noqa: E731
+    return {
+        'entities': int(len(report)),
+        'rows': int(rows),
+        'coverage_mean': float(report['coverage'].mean()),
+        'coverage_min': float(report['coverage'].min()),
+        'low_coverage_entities': int((report['coverage'] < min_coverage).sum()),
+        'missing_intervals': int(report['missing_intervals'].sum()),
+        'max_gap_s': float(report['max_gap_s'].max()),
+        'duplicate_rate': float(report['duplicates'].sum() / rows),
+        'nan_rate': weighted('nan_rate'),
+        'longest_nan_run': int(report['longest_nan_run'].max()),
+        'stuck_rate': weighted('stuck_rate'),
+        'counter_resets': int(report['counter_resets'].sum()),
+        'out_of_range_rate': weighted('out_of_range_rate'),
+    }
+
+
+class DataQualityReport:
+    """Data-quality report over the processed output of several plugins.
+
+    `entities` holds one row per entity (plugin, entity, then REPORT_COLS); `metrics` flattens the
+    plugin summaries to `<plugin>_<name>` numbers, logged to a KFP Metrics artifact with `log_to`
+    or written in the KFP metrics JSON format with `save_metrics`.
+    """
+
+    def __init__(self, min_coverage: float = 0.9, interval: Optional[str] = None, start: Optional[str] = None,
+                 stop: Optional[str] = None):
+        self.min_coverage = min_coverage
+        self.interval = interval
+        self.start = start
+        self.stop = stop
+        self.entities = pd.DataFrame(columns=['plugin', 'entity'] + REPORT_COLS)
+
+    def add(self, plugin: str, df: pd.DataFrame, check: Optional[PluginCheck] = None) -> pd.DataFrame:
+        check = check or PLUGIN_CHECKS[plugin]
+        report = entity_quality(df, check.entity_cols, self.interval, check.counters, check.ranges,
+                                self.start, self.stop)
+        report.insert(0, 'entity', report[check.entity_cols].astype(str).agg('/'.join, axis=1) if len(report)
+                      else pd.Series(dtype=object))
+        report.insert(0, 'plugin', plugin)
+        report = report.drop(columns=check.entity_cols)
+        self.entities = report if self.entities.empty else pd.concat([self.entities, report], ignore_index=True)
+        return report
+
+    def add_dir(self, directory: str, plugins: Optional[Sequence[str]] = None) -> List[str]:
+        """Scan the processed CSVs found in `directory` (or its `processed/` subdirectory), returning the plugins found."""
+        if os.path.isdir(os.path.join(directory, 'processed')):
+            directory = os.path.join(directory, 'processed')
+        found = []
+        for plugin in plugins or PLUGIN_CHECKS:
+            path = os.path.join(directory, PLUGIN_CHECKS[plugin].file)
+            if os.path.exists(path):
+                self.add(plugin, pd.read_csv(path))
+                found.append(plugin)
+        return found
+
+    @classmethod
+    def load(cls, path: str, min_coverage: float = 0.9) -> 'DataQualityReport':
+        report = cls(min_coverage)
+        report.entities = pd.read_csv(path, dtype={'entity': str})
+        return report
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {plugin: summarize(entities, self.min_coverage)
+                for plugin, entities in self.entities.groupby('plugin', sort=False)}
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        return {f'{plugin}_{name}': value for plugin, summary in self.summary().items()
+                for name, value in summary.items()}
+
+    def log_to(self, metrics_artifact):
+        """Log every metric to a KFP Output[Metrics] (or anything with log_metric)."""
+        for name, value in self.metrics.items():
+            metrics_artifact.log_metric(name, value)
+
+    def save(self, path: str):
+        self.entities.to_csv(path, index=False)
+
+    def save_metrics(self, path: str):
+        """Write the metrics as a KFP metrics file (mlpipeline-metrics.json format)."""
+        with open(path, 'w') as f:
+            json.dump({'metrics': [{'name': name.lower().replace('_', '-'), 'numberValue': value, 'format': 'RAW'}
+                                   for name, value in self.metrics.items()]}, f, indent=2)
+
+    def worst(self, n: int = 10) -> pd.DataFrame:
+        """Entities with the lowest coverage."""
+        return self.entities.sort_values(['coverage', 'missing_intervals'], ascending=[True, False]).head(n)
+
+
+@click.command()
+@click.option('--dir', 'directories', multiple=True, required=True, help='Directory with processed CSVs (or with a processed/ subdirectory)')
+@click.option('--plugin', 'plugins', multiple=True, type=click.Choice(list(PLUGIN_CHECKS)), help='Plugins to check (default: all found)')
+@click.option('--interval', default=None, help='Expected sampling interval (default: median step per plugin)')
+@click.option('--start', default=None, help='Window start coverage is measured against (default: first sample)')
+@click.option('--stop', default=None, help='Window stop coverage is measured against (default: last sample)')
+@click.option('--min-coverage', default=0.9, show_default=True, help='Entities below this coverage are counted as low coverage')
+@click.option('--output', default=None, help='Per-entity report CSV')
+@click.option('--metrics', 'metrics_path', default=None, help='KFP metrics JSON (mlpipeline-metrics format)')
+def main(directories, plugins, interval, start, stop, min_coverage, output, metrics_path):
+    """Check coverage, gaps, duplicates, NaN runs, stuck counters and out-of-range values of processed telemetry."""
+    report = DataQualityReport(min_coverage, interval, start, stop)
+    for directory in directories:
+        found = report.add_dir(directory, plugins or None)
+        click.echo(f"🔄 {directory}: {', '.join(found) or 'no processed CSVs'}")
+    for plugin, summary in report.summary().items():
+        icon = '⚠️' if summary.get('low_coverage_entities') else '✅'
+        click.echo(f"{icon} {plugin}: " + ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                                                 for k, v in summary.items()))
+    click.echo(report.worst()[['plugin', 'entity', 'rows', 'coverage', 'missing_intervals', 'duplicate_rate',
+                               'nan_rate', 'stuck_rate', 'out_of_range_rate']].round(4).to_string(index=False))
+    if output:
+        report.save(output)
+        click.echo(f"✅ Report saved to {output}")
+    if metrics_path:
+        report.save_metrics(metrics_path)
+        click.echo(f"✅ Metrics saved to {metrics_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,32 @@
 import os
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.sources import output_directory, read_csv_files
+
 
 class ScaphandreProcessor:
-    def __init__(self, directory: str):
-        self.directory: str = directory
+    def __init__(self, directory: str, entities: Optional[EntityDictionary] = None, threads: int = 1):
+        # Raw exports can be a directory or a compressed archive, processed/ goes next to the archive
+        self.source = directory
+        self.directory: str = output_directory(directory)
+        self.threads = threads
         self.dataframes_host: List[pd.DataFrame] = []
         self.dataframes_vm: List[pd.DataFrame] = []
         self.final_df_host: pd.DataFrame = pd.DataFrame()
         self.final_df_vms: pd.DataFrame = pd.DataFrame()
+        # Shared entity dictionary, entity columns are saved as int32 ids when given
+        self.entities = entities
 
     def load_files(self):
-        """Load all CSV files starting with 'scaphandre' from the directory."""
-        for filename in os.listdir(self.directory):
-            if filename.startswith("scaphandre_flux") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
+        """Load all CSV files starting with 'scaphandre' from the directory or archive."""
+        # Host and VM exports are read in the same pass over an archive
+        for filename, df in read_csv_files(self.source, ("scaphandre_flux", "scaphandre_neuronet"), threads=self.threads):
+            if filename.startswith("scaphandre_flux"):
                 self.dataframes_host.append(df)
-            elif filename.startswith("scaphandre_neuronet") and filename.endswith(".csv"):
-                file_path = os.path.join(self.directory, filename)
-                df = pd.read_csv(file_path)
+            else:
                 self.dataframes_vm.append(df)
 
     def process_dataframes(self):
@@ -32,6 +37,9 @@ class ScaphandreProcessor:
         for df in self.dataframes_host:
             # Ensure proper timestamp format
             df['_time'] = pd.to_datetime(df['_time'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
 
             # Pivot based on time and measurement field
             df_pivoted = df.pivot_table(
@@ -46,6 +54,9 @@ class ScaphandreProcessor:
         for df in self.dataframes_vm:
             # Ensure proper timestamp format
             df['_time'] = pd.to_datetime(df['_time'])
+            if self.entities is not None:
+                # Pivot and join on integer ids instead of repeated name strings
+                self.entities.encode(df)
 
             # Pivot based on time and measurement field
             df_pivoted = df.pivot_table(
@@ -57,7 +68,11 @@ class ScaphandreProcessor:
 
             processed_dfs_vm.append(df_pivoted)
 
-        # Concatenate all processed frames
+        # Concatenate all processed frames (a directory may hold only VM or only host exports)
+        if not processed_dfs_host:
+            processed_dfs_host = [pd.DataFrame(columns=['_time', 'url'])]
+        if not processed_dfs_vm:
+            processed_dfs_vm = [pd.DataFrame(columns=['_time', 'url', 'uuid', 'vm_id', 'vm_name'])]
         self.final_df_host = pd.concat(processed_dfs_host, ignore_index=True).sort_values('_time')
         # drop rows with nans
         self.final_df_host.dropna(inplace=True)
@@ -76,13 +91,19 @@ class ScaphandreProcessor:
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.final_df_host.to_csv(host_file, index=False)
         self.final_df_vms.to_csv(vm_file, index=False)
+        if self.entities is not None:
+            for path in [host_file, vm_file]:
+                self.entities.save(entities_path(path))
 
-    def run(self, output_csv: str = "scaphandre_processed.csv"):
-        """Main execution method."""
+    def run(self, output_csv: str = "scaphandre_processed.csv", store=None):
+        """Main execution method, `store` (a TimeSeriesStore) also receives the processed frames."""
         self.load_files()
         self.process_dataframes()
         os.makedirs(os.path.join(self.directory, 'processed'), exist_ok=True)
         self.save_to_csv(output_csv)
+        if store is not None:
+            store.write('scaphandre_host', self.final_df_host, self.entities)
+            store.write('scaphandre_vm', self.final_df_vms, self.entities)
         print(f"Processed data saved to: {os.path.join(self.directory, 'processed', output_csv)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+"""Read raw query-influxdb CSV exports from a directory or straight out of a compressed archive.
+
+Archive members are streamed into the parser without extracting them to disk: tar archives are read in a single
+sequential pass (``tarfile`` stream mode) and zip members are opened individually.
+"""
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Iterator, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+# Archive suffix -> compression, '' is an uncompressed tar
+ARCHIVE_FORMATS = {
+    '.tar.xz': 'xz', '.txz': 'xz',
+    '.tar.gz': 'gz', '.tgz': 'gz',
+    '.tar.bz2': 'bz2', '.tbz2': 'bz2',
+    '.tar': '', '.zip': 'zip',
+}
+
+# External decompressors writing to stdout, used for tar archives when threads > 1
+PARALLEL_DECOMPRESSORS = {
+    'xz': lambda threads: ['xz', f'-T{threads}', '-dc'],
+    'gz': lambda threads: ['pigz', '-p', str(threads), '-dc'],
+    'bz2': lambda threads: ['pbzip2', f'-p{threads}', '-dc'],
+}
+
+Reader = Callable[[Union[str, IO[bytes]]], pd.DataFrame]
+
+
+def archive_format(path: Optional[str]) -> Optional[str]:
+    """Compression of the archive at `path` ('' for a plain tar), or None when it is not an archive."""
+    if not path or os.path.isdir(path):
+        return None
+    for suffix, compression in ARCHIVE_FORMATS.items():
+        if path.lower().endswith(suffix):
+            return compression
+    return None
+
+
+def output_directory(source: Optional[str]) -> Optional[str]:
+    """Directory the processors write `processed/` into: the source itself, or the folder holding the archive."""
+    if archive_format(source) is None:
+        return source
+    return os.path.dirname(os.path.abspath(source))
+
+
+def matches(name: str, prefixes: Sequence[str]) -> bool:
+    filename = os.path.basename(name)
+    return filename.startswith(tuple(prefixes)) and filename.endswith('.csv')
+
+
+class MemberStream(io.RawIOBase):
+    """Forward-only view of a streamed tar member, tarfile's stream mode objects cannot answer seekable()."""
+
+    def __init__(self, member: IO[bytes]):
+        super().__init__()
+        self.member = member
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.member.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_tar(path: str, compression: str, prefixes: Sequence[str], read: Reader,
+             threads: int) -> Iterator[Tuple[str, pd.DataFrame]]:
+    command = PARALLEL_DECOMPRESSORS.get(compression)
+    process = None
+    if threads > 1 and command and shutil.which(command(threads)[0]):
+        # Decompress in a separate process so it overlaps with parsing (and uses several cores for multi-block files)
+        process = subprocess.Popen(command(threads) + [path], stdout=subprocess.PIPE)
+        archive = tarfile.open(fileobj=process.stdout, mode='r|')
+    else:
+        archive = tarfile.open(path, mode='r|*')
+    try:
+        with archive:
+            for member in archive:
+                if member.isfile() and matches(member.name, prefixes):
+                    yield os.path.basename(member.name), read(io.BufferedReader(MemberStream(archive.extractfile(member)), 1 << 20))
+    finally:
+        if process is not None:
+            # The tar end marker can come before the decompressor exits, corrupt input fails in tarfile instead
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+
+def read_zip_member(path: str, name: str, read: Reader) -> pd.DataFrame:
+    # One handle per call, zip members are compressed independently and can be read concurrently
+    with zipfile.ZipFile(path) as archive, archive.open(name) as member:
+        return read(member)
+
+
+def read_zip(path: str, prefixes: Sequence[str], read: Reader, threads: int) -> Iterator[Tuple[str, pd.DataFrame]]:
+    with zipfile.ZipFile(path) as archive:
+        names = [info.filename for info in archive.infolist() if not info.is_dir() and matches(info.filename, prefixes)]
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            frames = executor.map(lambda name: read_zip_member(path, name, read), names)
+            yield from ((os.path.basename(name), frame) for name, frame in zip(names, frames))
+    else:
+        for name in names:
+            yield os.path.basename(name), read_zip_member(path, name, read)
+
+
+def read_csv_files(source: str, prefixes: Union[str, Sequence[str]], threads: int = 1,
+                   read: Reader = pd.read_csv) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Yield (filename, dataframe) for every CSV in the `source` directory or archive whose name starts with a prefix.
+
+    `threads` > 1 decompresses zip members concurrently, and pipes tar archives through xz -T/pigz/pbzip2 when installed.
+    """
+    prefixes = (prefixes,) if isinstance(prefixes, str) else tuple(prefixes)
+    compression = archive_format(source)
+    if compression == 'zip':
+        yield from read_zip(source, prefixes, read, threads)
+    elif compression is not None:
+        yield from read_tar(source, compression, prefixes, read, threads)
+    else:
+        for filename in os.listdir(source):
+            if matches(filename, prefixes):
+                yield filename, read(os.path.join(source, filename))
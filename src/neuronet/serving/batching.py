@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class LatencyStats:
+    """Thread-safe request latency and throughput recorder."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, latency: float, rows: int):
+        with self.lock:
+            self.latencies.append(latency)
+            self.rows += rows
+
+    def record_batch(self):
+        with self.lock:
+            self.batches += 1
+
+    def reset(self):
+        with self.lock:
+            self.latencies = []
+            self.rows = 0
+            self.batches = 0
+            self.started = time.perf_counter()
+
+    def summary(self) -> Dict[str, float]:
+        with self.lock:
+            latencies = np.asarray(self.latencies) * 1000
+            elapsed = time.perf_counter() - self.started
+            requests, rows, batches = len(latencies), self.rows, self.batches
+        return {
+            'requests': requests,
+            'rows': rows,
+            'batches': batches,
+            'mean_batch_rows': rows / batches if batches else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)) if requests else 0.0,
+            'p99_ms': float(np.percentile(latencies, 99)) if requests else 0.0,
+            'requests_per_s': requests / elapsed if elapsed > 0 else 0.0,
+            'rows_per_s': rows / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into micro-batches for one model.
+
+    A single worker thread takes pending requests until `max_batch_size` rows are collected or
+    `max_wait_ms` has passed since the first one, runs one vectorized `predict_fn` call on the
+    stacked rows and hands every request back its own slice of the predictions. A request larger than
+    `max_batch_size` runs as a batch of its own; malformed requests fail alone, never their batch.
+    Requests submitted before `close()` are still predicted, later ones fail right away.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, n_features: Optional[int] = None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.n_features = n_features
+        # Request taken from the queue that did not fit in the previous batch
+        self.carry: Optional[Tuple[np.ndarray, Future, float]] = None
+        self.max_wait = max_wait_ms / 1000
+        self.stats = LatencyStats()
+        self.requests: "queue.Queue[Tuple[np.ndarray, Future, float]]" = queue.Queue()
+        self.running = True
+        # Orders submit() against close(), so no request is queued behind the stop marker
+        self.lock = threading.Lock()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, rows: np.ndarray) -> Future:
+        """Queue a 2D array of feature rows, the future resolves to their predictions."""
+        future: Future = Future()
+        try:
+            rows = np.atleast_2d(np.asarray(rows, dtype='float64'))
+            if rows.ndim != 2:
+                raise ValueError(f"Expected a 2D array of feature rows, got {rows.ndim} dimensions")
+            if self.n_features is not None and rows.shape[1] != self.n_features:
+                raise ValueError(f"Expected {self.n_features} features per row, got {rows.shape[1]}")
+        except (TypeError, ValueError) as e:
+            future.set_exception(e)
+            return future
+        with self.lock:
+            if not self.running:
+                future.set_exception(RuntimeError("MicroBatcher is closed"))
+                return future
+            self.requests.put((rows, future, time.perf_counter()))
+        return future
+
+    def predict(self, rows: np.ndarray, timeout: float = 30.0) -> np.ndarray:
+        return self.submit(rows).result(timeout=timeout)
+
+    def collect(self) -> Optional[List[Tuple[np.ndarray, Future, float]]]:
+        """Next batch of requests, None once the stop marker is reached."""
+        first, self.carry = self.carry or self.requests.get(), None
+        if first[1] is None:
+            return None
+        batch, size = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[1] is None:
+                self.requests.put(item)  # let run() see the stop marker
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                self.carry = item  # first request of the next batch
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            if batch is None:
+                return
+            # Without n_features, requests whose width differs from the first one's fail on their own
+            width = batch[0][0].shape[1]
+            for rows, future, _ in batch:
+                if rows.shape[1] != width:
+                    future.set_exception(ValueError(f"Expected {width} features per row, got {rows.shape[1]}"))
+            batch = [item for item in batch if item[0].shape[1] == width]
+            n_rows = sum(len(rows) for rows, _, _ in batch)
+            try:
+                predictions = np.asarray(self.predict_fn(np.concatenate([rows for rows, _, _ in batch])))
+                if len(predictions) != n_rows:
+                    raise ValueError(f"predict_fn returned {len(predictions)} predictions for {n_rows} rows")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.stats.record_batch()
+            offset = 0
+            now = time.perf_counter()
+            for rows, future, submitted in batch:
+                future.set_result(predictions[offset:offset + len(rows)])
+                offset += len(rows)
+                self.stats.record_request(now - submitted, len(rows))
+
+    def close(self):
+        with self.lock:
+            self.running = False
+            self.requests.put((np.empty((0, 0)), None, 0.0))
+        self.worker.join()
+        # Nothing should be left behind the stop marker, fail anything that is so no caller waits forever
+        leftover = [self.carry] if self.carry else []
+        self.carry = None
+        while True:
+            try:
+                leftover.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+        for _, future, _ in leftover:
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError("MicroBatcher closed before the request was predicted"))
@@ -0,0 +1,63 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RandomForestPredictor:
+    """Energy RandomForest saved with joblib by the energy_prediction train_model component.
+
+    Small batches (single requests, micro-batches) are walked by its in-memory numpy export,
+    larger ones go to `model.predict`.
+    """
+
+    def __init__(self, path: str):
+        import joblib
+
+        from neuronet.models.forest import NumpyForest
+
+        self.model = joblib.load(path)
+        self.forest = NumpyForest(model=self.model)
+        self.feature_names: Optional[List[str]] = list(getattr(self.model, 'feature_names_in_', [])) or None
+        self.n_features = self.model.n_features_in_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # The forest was fitted on a DataFrame, keep the column names to match it
+        if self.feature_names is not None:
+            X = pd.DataFrame(X, columns=self.feature_names)
+        return self.forest.predict(X)
+
+
+class MLPPredictor:
+    """VM power MLP checkpoint (weights + scaler) saved with torch.save by the vm_power_prediction train_model component."""
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        import torch
+
+        from neuronet.models.mlp import load_checkpoint
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.torch = torch
+        self.model, self.scaler = load_checkpoint(path)
+        self.feature_names: Optional[List[str]] = list(getattr(self.scaler, 'feature_names_in_', [])) or None
+        self.n_features = self.model.model[0].in_features
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = self.scaler.transform(pd.DataFrame(X, columns=self.feature_names) if self.feature_names else X)
+        with self.torch.no_grad():
+            y = self.model(self.torch.as_tensor(X, dtype=self.torch.float32))
+        return y.numpy().ravel().astype('float64')
+
+
+def load_predictor(path: str, kind: str, num_threads: Optional[int] = None):
+    """Load a trained UC1 model: kind is 'rf' (joblib RandomForest), 'forest' (numpy export) or 'mlp' (torch checkpoint)."""
+    if kind == 'rf':
+        return RandomForestPredictor(path)
+    if kind == 'forest':
+        from neuronet.models.forest import NumpyForest
+
+        return NumpyForest(path)
+    if kind == 'mlp':
+        return MLPPredictor(path, num_threads=num_threads)
+    raise ValueError(f"Unknown model kind: {kind} (expected 'rf', 'forest' or 'mlp')")
@@ -0,0 +1,375 @@
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.influxdb.influxdb_query import build_query
+
+# InfluxDB plugins polled for each UC1 model
+SOURCES = {'energy': ['k8s'], 'vm_power': ['proxmox', 'scaphandre']}
+
+# Entity tags of the written estimates
+ENTITY_COLS = {'energy': ['namespace', 'pod_name', 'container_name'], 'vm_power': ['vm_id']}
+
+# Default features of each UC1 pipeline, used when the model does not record its feature names
+DEFAULT_FEATURES = {
+    'energy': ['cpu_millicores', 'memory_usage_mb', 'logsfs_usage_percent'],
+    'vm_power': ['cpuload', 'mem_used_percentage', 'swap_used_percentage', 'disk_used_percentage', 'uptime_hours',
+                 'scaph_process_cpu_usage_percentage', 'scaph_process_memory_bytes',
+                 'scaph_process_memory_virtual_bytes', 'scaph_process_disk_total_read_bytes',
+                 'scaph_process_disk_total_write_bytes'],
+}
+
+
+def format_range(start: pd.Timestamp, stop: pd.Timestamp) -> str:
+    return f"start: {start.strftime('%Y-%m-%dT%H:%M:%SZ')}, stop: {stop.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+
+class TelemetryPoller:
+    """Query the latest points of a plugin with the same Flux filters as query-influxdb.
+
+    Returns the long-format frame run_query would save (one row per record), so the
+    preprocessing processors can pivot it unchanged.
+    """
+
+    def __init__(self, url: str, token: str, org: str, bucket: str, vm_name_filter: str = '^neuronet-'):
+        from influxdb_client import InfluxDBClient
+
+        self.client = InfluxDBClient(url=url, token=token, org=org)
+        self.query_api = self.client.query_api()
+        self.bucket = bucket
+        self.vm_name_filter = vm_name_filter
+
+    def query(self, plugin: str, start: pd.Timestamp, stop: pd.Timestamp) -> pd.DataFrame:
+        flux_query, _ = build_query(self.bucket, format_range(start, stop), plugin, vm_name_filter=self.vm_name_filter)
+        records = [record.values for table in self.query_api.query(flux_query) for record in table.records]
+        return pd.DataFrame(records)
+
+    def close(self):
+        self.client.close()
+
+
+def energy_features(raw: Dict[str, pd.DataFrame], interval: str) -> pd.DataFrame:
+    """Container feature rows from raw k8s points: K8SProcessor pivot, then EnergyDatasetBuilder features."""
+    from neuronet.datasets.energy_dataset import EnergyDatasetBuilder
+    from neuronet.preprocessing.k8s import K8SProcessor
+
+    processor = K8SProcessor(directory=None)
+    processor.dataframes = [raw['k8s']]
+    processor.process_dataframes()
+    # A window may miss a field entirely, its rows are then dropped like incomplete rows
+    k8s_df = processor.final_df.reindex(columns=processor.final_df.columns.union(EnergyDatasetBuilder.k8s_cols))
+    return EnergyDatasetBuilder(k8s_df, pd.DataFrame(), interval=interval).build_features()
+
+
+def vm_power_features(raw: Dict[str, pd.DataFrame], interval: str) -> pd.DataFrame:
+    """VM feature rows from raw Proxmox and Scaphandre points, with the processors and VmPowerDatasetBuilder."""
+    from neuronet.datasets.vm_power_dataset import VmPowerDatasetBuilder
+    from neuronet.preprocessing.proxmox import ProxmoxDataProcessor
+    from neuronet.preprocessing.scaphandre import ScaphandreProcessor
+
+    proxmox = ProxmoxDataProcessor(directory=None)
+    proxmox.dataframes = [raw['proxmox']]
+    proxmox.process_dataframes()
+    scaphandre = ScaphandreProcessor(directory=None)
+    scaphandre.dataframes_vm = [raw['scaphandre']]
+    scaphandre.process_dataframes()
+    proxmox_df = proxmox.final_df.reindex(
+        columns=proxmox.final_df.columns.union(VmPowerDatasetBuilder.prox_cols, sort=False))
+    scaphandre_df = scaphandre.final_df_vms.reindex(
+        columns=scaphandre.final_df_vms.columns.union(list(VmPowerDatasetBuilder.scaphandre_agg_cols), sort=False))
+    return VmPowerDatasetBuilder(proxmox_df, scaphandre_df, interval=interval).build()
+
+
+FEATURE_BUILDERS: Dict[str, Callable[[Dict[str, pd.DataFrame], str], pd.DataFrame]] = {
+    'energy': energy_features,
+    'vm_power': vm_power_features,
+}
+
+
+def escape_tag(values: pd.Series) -> pd.Series:
+    return (values.astype(str).str.replace('\\', '\\\\', regex=False).str.replace(',', '\\,', regex=False)
+            .str.replace('=', '\\=', regex=False).str.replace(' ', '\\ ', regex=False))
+
+
+def to_line_protocol(df: pd.DataFrame, measurement: str, tag_cols: List[str], field: str, value_col: str,
+                     static_tags: Optional[Dict[str, str]] = None) -> List[str]:
+    """One line protocol point per row, built with vectorized string operations."""
+    key = pd.Series(measurement, index=df.index)
+    for tag, value in sorted((static_tags or {}).items()):
+        key = key + f',{tag}=' + escape_tag(pd.Series(value, index=df.index))
+    for tag in tag_cols:
+        key = key + f',{tag}=' + escape_tag(df[tag])
+    values = df[value_col].map(repr)
+    timestamps = pd.to_datetime(df['_time'], utc=True).astype('int64').astype(str)
+    return (key + f' {field}=' + values + ' ' + timestamps).tolist()
+
+
+class LineProtocolWriter:
+    """Write points to InfluxDB as line protocol, `batch_size` lines per request."""
+
+    def __init__(self, url: str, token: str, org: str, bucket: str, batch_size: int = 5000):
+        from influxdb_client import InfluxDBClient
+        from influxdb_client.client.write_api import SYNCHRONOUS
+
+        self.client = InfluxDBClient(url=url, token=token, org=org)
+        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        self.org = org
+        self.bucket = bucket
+        self.batch_size = batch_size
+
+    def write(self, lines: List[str]) -> int:
+        """Write the lines, returning the number of requests."""
+        batches = 0
+        for start in range(0, len(lines), self.batch_size):
+            self.write_api.write(bucket=self.bucket, org=self.org, record=lines[start:start + self.batch_size])
+            batches += 1
+        return batches
+
+    def close(self):
+        self.client.close()
+
+
+class SystemClock:
+    def now(self) -> pd.Timestamp:
+        return pd.Timestamp.now(tz='UTC')
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class ReplayClock:
+    """Clock starting at `start` and running `speed` times faster than real time, to replay stored data."""
+
+    def __init__(self, start: pd.Timestamp, speed: float = 1.0):
+        self.start = start
+        self.speed = speed
+        self.started = time.perf_counter()
+
+    def now(self) -> pd.Timestamp:
+        return self.start + pd.Timedelta(seconds=(time.perf_counter() - self.started) * self.speed)
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds / self.speed)
+
+
+class LagStats:
+    """Per-cycle timings and the end-to-end latency of every estimated time bucket."""
+
+    def __init__(self, latency_target: float):
+        self.latency_target = latency_target
+        self.cycles: List[Dict[str, float]] = []
+        self.latencies: List[float] = []
+
+    def record(self, cycle: Dict[str, float], latencies: np.ndarray):
+        self.cycles.append(cycle)
+        self.latencies.extend(latencies.tolist())
+
+    def summary(self) -> Dict[str, float]:
+        latencies = np.asarray(self.latencies)
+        cycles = pd.DataFrame(self.cycles)
+        return {
+            'cycles': len(self.cycles),
+            'rows': int(cycles['rows'].sum()) if len(cycles) else 0,
+            'buckets': len(latencies),
+            'retries': int(cycles['retries'].sum()) if len(cycles) else 0,
+            'skipped_windows': int(cycles['skipped_windows'].sum()) if len(cycles) else 0,
+            'latency_target_s': self.latency_target,
+            'latency_p50_s': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            'latency_p95_s': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            'latency_max_s': float(latencies.max()) if len(latencies) else 0.0,
+            'within_target': float((latencies <= self.latency_target).mean()) if len(latencies) else 1.0,
+            'backlog_s': float(cycles['backlog_s'].iloc[-1]) if len(cycles) else 0.0,
+            **{f'mean_{stage}': float(cycles[stage].mean()) if len(cycles) else 0.0
+               for stage in ['query_s', 'build_s', 'predict_s', 'write_s', 'cycle_s']},
+        }
+
+
+class PowerEstimator:
+    """Near-real-time power estimation loop for one UC1 model.
+
+    Every `poll_interval` seconds the time buckets (`interval`) that closed at least `lateness`
+    ago and were not estimated yet are queried, turned into feature rows by the same processors
+    and dataset builders as the pipelines, predicted in one batch and written back as line
+    protocol. Each bucket is queried once, so the work per cycle follows the new data; after
+    downtime the backlog is caught up at most `max_window` per cycle. A window where a source
+    returned no points is queried again on the next `max_retries` polls before it is skipped and
+    counted in `skipped_windows`. The latency of a bucket is the time from its end to the write
+    of its estimates, the target bounds it at lateness + poll_interval + cycle time.
+    """
+
+    def __init__(self, kind: str, poller: TelemetryPoller, predictor, writer: LineProtocolWriter,
+                 features: Optional[List[str]] = None, interval: str = '1min', poll_interval: float = 60.0,
+                 lateness: str = '2min', max_window: str = '1h', latency_target: float = 240.0,
+                 measurement: str = 'power_estimate', clock=None, start: Optional[pd.Timestamp] = None,
+                 max_retries: int = 3, log: Callable[[str], None] = print):
+        if kind not in SOURCES:
+            raise ValueError(f"Unknown model kind: {kind} (expected one of {sorted(SOURCES)})")
+        self.kind = kind
+        self.poller = poller
+        self.predictor = predictor
+        self.writer = writer
+        self.features = getattr(predictor, 'feature_names', None) or features or DEFAULT_FEATURES[kind]
+        self.interval = pd.Timedelta(interval)
+        self.poll_interval = poll_interval
+        self.lateness = pd.Timedelta(lateness)
+        self.max_window = pd.Timedelta(max_window)
+        self.max_retries = max_retries
+        # Polls in a row where a source had no points for the current window
+        self.retries = 0
+        self.measurement = measurement
+        self.clock = clock or SystemClock()
+        self.log = log
+        self.stats = LagStats(latency_target)
+        # First bucket not estimated yet
+        self.next_bucket = (start or self.ready_until()).floor(self.interval)
+        worst = self.lateness.total_seconds() + poll_interval
+        if worst >= latency_target:
+            log(f"⚠️ lateness + poll interval ({worst:.0f}s) already exceed the latency target ({latency_target:.0f}s)")
+
+    def ready_until(self) -> pd.Timestamp:
+        """End of the closed buckets: every point up to here should have arrived."""
+        return (self.clock.now() - self.lateness).floor(self.interval)
+
+    def cycle(self) -> Dict[str, float]:
+        """Estimate the buckets closed since the last cycle, returning the cycle metrics."""
+        started = time.perf_counter()
+        stop = min(self.ready_until(), self.next_bucket + self.max_window)
+        metrics = {'start': self.next_bucket.isoformat(), 'stop': stop.isoformat(), 'rows': 0, 'batches': 0,
+                   'retries': 0, 'skipped_windows': 0, 'missing': '',
+                   'query_s': 0.0, 'build_s': 0.0, 'predict_s': 0.0, 'write_s': 0.0}
+        latencies = np.empty(0)
+        if stop > self.next_bucket:
+            raw = {plugin: self.poller.query(plugin, self.next_bucket, stop) for plugin in SOURCES[self.kind]}
+            metrics['query_s'] = time.perf_counter() - started
+
+            missing = [plugin for plugin, df in raw.items() if not len(df)]
+            metrics['missing'] = ','.join(missing)
+            if missing and self.retries < self.max_retries:
+                # Keep the window and query it again (grown by the new buckets) on the next poll
+                self.retries += 1
+                metrics['retries'] = 1
+                self.log(f"⚠️ {self.kind}: no {', '.join(missing)} points for {metrics['start']} - {metrics['stop']}, "
+                         f"retry {self.retries}/{self.max_retries}")
+                return self.finish(metrics, started, np.empty(0))
+
+            rows = pd.DataFrame()
+            if missing:
+                metrics['skipped_windows'] = 1
+                self.log(f"❌ {self.kind}: skipping {metrics['start']} - {metrics['stop']}, still no "
+                         f"{', '.join(missing)} points after {self.max_retries} retries")
+            else:
+                built = time.perf_counter()
+                rows = FEATURE_BUILDERS[self.kind](raw, f'{int(self.interval.total_seconds())}s')
+                rows = rows[(rows['_time'] >= self.next_bucket) & (rows['_time'] < stop)]
+                metrics['build_s'] = time.perf_counter() - built
+
+            if len(rows):
+                predicted = time.perf_counter()
+                rows = rows.assign(power_watts=self.predictor.predict(rows[self.features].to_numpy(dtype='float64')))
+                metrics['predict_s'] = time.perf_counter() - predicted
+
+                written = time.perf_counter()
+                lines = to_line_protocol(rows, self.measurement, ENTITY_COLS[self.kind], 'power_watts',
+                                         'power_watts', static_tags={'model': self.kind})
+                metrics['batches'] = self.writer.write(lines)
+                metrics['write_s'] = time.perf_counter() - written
+                metrics['rows'] = len(rows)
+
+                # Latency of every estimated bucket: from the end of the bucket to the write of its estimates
+                buckets = pd.to_datetime(rows['_time'].unique(), utc=True)
+                latencies = np.asarray((self.clock.now() - (buckets + self.interval)).total_seconds())
+            self.next_bucket = stop
+            self.retries = 0
+        return self.finish(metrics, started, latencies)
+
+    def finish(self, metrics: Dict, started: float, latencies: np.ndarray) -> Dict[str, float]:
+        metrics['cycle_s'] = time.perf_counter() - started
+        metrics['backlog_s'] = (self.ready_until() - self.next_bucket).total_seconds()
+        metrics['latency_max_s'] = float(latencies.max()) if len(latencies) else 0.0
+        self.stats.record(metrics, latencies)
+        return metrics
+
+    def run(self, cycles: Optional[int] = None, metrics_path: Optional[str] = None):
+        """Run `cycles` cycles (forever if None), writing the lag summary to `metrics_path` after each."""
+        done = 0
+        while cycles is None or done < cycles:
+            metrics = self.cycle()
+            done += 1
+            within = metrics['latency_max_s'] <= self.stats.latency_target
+            self.log(f"{'✅' if within else '⚠️'} {self.kind}: {metrics['rows']} estimates for "
+                     f"{metrics['start']} - {metrics['stop']} in {metrics['cycle_s']:.2f}s "
+                     f"(max latency {metrics['latency_max_s']:.0f}s, backlog {metrics['backlog_s']:.0f}s)")
+            if metrics_path:
+                with open(metrics_path, 'w') as f:
+                    json.dump({'summary': self.stats.summary(), 'last_cycle': metrics}, f, indent=2)
+            # Catch up without waiting while there is a backlog, a retried window waits for its late points
+            if (metrics['backlog_s'] <= 0 or metrics['retries']) and (cycles is None or done < cycles):
+                self.clock.sleep(max(self.poll_interval - metrics['cycle_s'], 0.0))
+        return self.stats.summary()
+
+
+@click.command()
+@click.option('--kind', type=click.Choice(sorted(SOURCES)), required=True, help='UC1 model: energy (per container) or vm_power (per VM)')
+@click.option('--model', 'model_path', required=True, help='Trained model (train_model output or exported forest)')
+@click.option('--model-kind', type=click.Choice(['rf', 'forest', 'mlp']), default=None, help='Model format (default: rf for energy, mlp for vm_power)')
+@click.option('--url', default='http://10.255.40.16:8086', show_default=True, help='InfluxDB server URL')
+@click.option('--token', default=None, help='Authorization token for InfluxDB (default: $INFLUXDB_TOKEN)')
+@click.option('--org', default='nextworks', show_default=True, help='InfluxDB organization name')
+@click.option('--bucket', default='monitoring', show_default=True, help='Bucket with the telemetry')
+@click.option('--output-bucket', default='power_estimates', show_default=True, help='Bucket the estimates are written to')
+@click.option('--vm-name-filter', default='^neuronet-', show_default=True, help='Regex filter for vm_name, as query-influxdb')
+@click.option('--interval', default='1min', show_default=True, help='Time bucket of the feature rows')
+@click.option('--poll-interval', default=60.0, show_default=True, help='Seconds between polls')
+@click.option('--lateness', default='2min', show_default=True, help='Wait this long after a bucket closes for late points')
+@click.option('--latency-target', default=240.0, show_default=True, help='Target seconds from bucket end to written estimate')
+@click.option('--batch-size', default=5000, show_default=True, help='Line protocol lines per write request')
+@click.option('--max-retries', default=3, show_default=True, help='Polls to wait for a source with no points before skipping the window')
+@click.option('--cycles', default=None, type=int, help='Stop after this many polls (default: run forever)')
+@click.option('--metrics', 'metrics_path', default=None, help='JSON file updated with the lag metrics after every poll')
+@click.option('--replay-start', default=None, help='Replay stored data from this time instead of following the wall clock')
+@click.option('--speed', default=1.0, show_default=True, help='Replay speed (with --replay-start)')
+@click.option('--standin-data', default=None, help='Serve this directory or archive of query-influxdb CSVs with the local InfluxDB stand-in')
+def main(kind, model_path, model_kind, url, token, org, bucket, output_bucket, vm_name_filter, interval,
+         poll_interval, lateness, latency_target, batch_size, max_retries, cycles, metrics_path, replay_start, speed, standin_data):
+    """Estimate container or VM power from live telemetry and write the estimates back to InfluxDB."""
+    from neuronet.serving.predictors import load_predictor
+
+    token = token or os.getenv('INFLUXDB_TOKEN') or 'local'
+    standin = None
+    if standin_data:
+        from neuronet.influxdb.standin import InfluxStandIn
+
+        standin = InfluxStandIn.from_csv_dir(standin_data)
+        url = standin.start()
+        click.echo(f"✅ InfluxDB stand-in with {len(standin.points)} points on {url}")
+
+    clock = SystemClock()
+    if replay_start:
+        replay_start = pd.Timestamp(replay_start)
+        clock = ReplayClock(replay_start.tz_localize('UTC') if replay_start.tzinfo is None
+                            else replay_start.tz_convert('UTC'), speed)
+    predictor = load_predictor(model_path, model_kind or ('rf' if kind == 'energy' else 'mlp'))
+    poller = TelemetryPoller(url, token, org, bucket, vm_name_filter)
+    writer = LineProtocolWriter(url, token, org, output_bucket, batch_size)
+    estimator = PowerEstimator(kind, poller, predictor, writer, interval=interval, poll_interval=poll_interval,
+                               lateness=lateness, latency_target=latency_target, clock=clock, max_retries=max_retries,
+                               log=click.echo)
+    try:
+        summary = estimator.run(cycles, metrics_path)
+        click.echo(json.dumps(summary))
+    except KeyboardInterrupt:
+        click.echo(json.dumps(estimator.stats.summary()))
+    finally:
+        poller.close()
+        writer.close()
+        if standin is not None:
+            standin.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib import request as urlrequest
+
+import click
+import numpy as np
+import pandas as pd
+
+from neuronet.serving.batching import LatencyStats, MicroBatcher
+from neuronet.serving.predictors import load_predictor
+
+
+def parse_instances(instances, feature_names) -> np.ndarray:
+    """Accept KServe v1 style instances: lists of feature values or dicts keyed by feature name."""
+    if instances and isinstance(instances[0], dict):
+        if not feature_names:
+            raise ValueError("Model has no feature names, send instances as lists of values")
+        return pd.DataFrame(instances)[feature_names].to_numpy(dtype='float64')
+    return np.atleast_2d(np.asarray(instances, dtype='float64'))
+
+
+class PredictionServer(ThreadingHTTPServer):
+    # Concurrent clients would get connection resets with the default listen backlog of 5
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_handler(batcher: MicroBatcher, feature_names):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self.send_json(200, {'status': 'ok'})
+            elif self.path == '/metrics':
+                self.send_json(200, batcher.stats.summary())
+            else:
+                self.send_json(404, {'error': f'Unknown path {self.path}'})
+
+        def do_POST(self):
+            # Same path as KServe (/v1/models/<name>:predict) or plain /predict
+            if not (self.path == '/predict' or self.path.endswith(':predict')):
+                self.send_json(404, {'error': f'Unknown path {self.path}'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                rows = parse_instances(payload['instances'], feature_names)
+                predictions = batcher.predict(rows)
+            except Exception as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            self.send_json(200, {'predictions': predictions.tolist()})
+
+        def log_message(self, format, *args):
+            pass  # keep the request log out of latency measurements
+
+    return PredictionHandler
+
+
+def run_load_test(X: np.ndarray, concurrency: int = 16, requests: int = 2000, rows_per_request: int = 1,
+                  batcher: Optional[MicroBatcher] = None, url: Optional[str] = None) -> Dict[str, float]:
+    """Fire `requests` concurrent requests at a batcher (in-process) or a running server `url`."""
+    picks = np.random.default_rng(0).integers(0, len(X), (requests, rows_per_request))
+    stats = LatencyStats()
+
+    def one_request(i):
+        rows = X[picks[i]]
+        started = time.perf_counter()
+        if batcher is not None:
+            batcher.predict(rows)
+        else:
+            body = json.dumps({'instances': rows.tolist()}).encode()
+            req = urlrequest.Request(f"{url}/predict", data=body, headers={'Content-Type': 'application/json'})
+            with urlrequest.urlopen(req) as response:
+                response.read()
+        stats.record_request(time.perf_counter() - started, len(rows))
+
+    stats.reset()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    return stats.summary()
+
+
+@click.command()
+@click.option('--model', 'model_path', required=True, help='Path to the trained model (joblib RandomForest or torch MLP checkpoint)')
+@click.option('--kind', type=click.Choice(['rf', 'forest', 'mlp']), required=True, help='Model type: rf (energy RandomForest), forest (its numpy export) or mlp (VM power MLP)')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', default=8080, show_default=True, help='Port to listen on')
+@click.option('--max-batch-size', default=64, show_default=True, help='Maximum number of rows per micro-batch')
+@click.option('--max-wait-ms', default=5.0, show_default=True, help='Maximum time to wait for a micro-batch to fill')
+@click.option('--threads', default=None, type=int, help='CPU threads used by torch (MLP only)')
+@click.option('--load-test', is_flag=True, help='Run an in-process load test instead of serving and print latency/throughput')
+@click.option('--data', default=None, help='CSV with feature rows for the load test (e.g. the x_test artifact), random rows otherwise')
+@click.option('--concurrency', default=16, show_default=True, help='Concurrent clients for the load test')
+@click.option('--requests', 'n_requests', default=2000, show_default=True, help='Number of requests for the load test')
+def main(model_path, kind, host, port, max_batch_size, max_wait_ms, threads, load_test, data, concurrency, n_requests):
+    """
+    Serve a trained UC1 model locally on CPU with micro-batching, or load-test it.
+
+    e.g., "serve-model --model output_model --kind rf --port 8080" then
+    POST {"instances": [[...], ...]} to http://127.0.0.1:8080/predict; GET /metrics for p50/p99 latency and throughput.
+    """
+    predictor = load_predictor(model_path, kind, num_threads=threads)
+    batcher = MicroBatcher(predictor.predict, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                           n_features=predictor.n_features)
+    click.echo(f"✅ Loaded {kind} model from {model_path}")
+
+    if load_test:
+        if data:
+            X = pd.read_csv(data).to_numpy(dtype='float64')
+        else:
+            X = np.random.default_rng(0).random((1000, predictor.n_features))
+        summary = run_load_test(X, concurrency=concurrency, requests=n_requests, batcher=batcher)
+        batch_summary = batcher.stats.summary()
+        summary['batches'] = batch_summary['batches']
+        summary['mean_batch_rows'] = batch_summary['mean_batch_rows']
+        for key, value in summary.items():
+            click.echo(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+        batcher.close()
+        return
+
+    server = PredictionServer((host, port), make_handler(batcher, predictor.feature_names))
+    click.echo(f"🔄 Serving on http://{host}:{port}/predict (max batch {max_batch_size}, max wait {max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == '__main__':
+    main()
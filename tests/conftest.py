@@ -0,0 +1,21 @@
+import shutil
+
+import pytest
+
+from neuronet.datasets.synthetic import TelemetryGenerator
+
+
+@pytest.fixture(scope='session')
+def telemetry_dir(tmp_path_factory):
+    """Raw exports of a small synthetic cluster in the query-influxdb layout, generated once per session."""
+    data_dir = str(tmp_path_factory.mktemp('telemetry'))
+    TelemetryGenerator(servers=2, vms_per_server=4, pods=4, duration='20min').generate(data_dir, log=lambda _: None)
+    return data_dir
+
+
+@pytest.fixture(scope='module')
+def telemetry_copy(telemetry_dir, tmp_path_factory):
+    """Private copy of the raw exports for a test module, processors write their outputs into <dir>/processed."""
+    data_dir = str(tmp_path_factory.mktemp('exports') / 'telemetry')
+    shutil.copytree(telemetry_dir, data_dir)
+    return data_dir
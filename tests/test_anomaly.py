@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.models.anomaly import ReconstructionScorer, StreamingAnomalyDetector
+
+
+def score_column(batch: pd.DataFrame) -> np.ndarray:
+    return batch['score'].to_numpy()
+
+
+def stream(detector, df, batch_size):
+    return pd.concat([detector.update(df.iloc[start:start + batch_size]) for start in range(0, len(df), batch_size)])
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'vm_id': np.tile([101, 102, 103], 200), 'score': rng.gamma(2.0, 1.0, 600)})
+
+
+def test_welford_state_matches_batch_statistics(scores):
+    detector = StreamingAnomalyDetector(score_column, k=1e9, warmup=1)
+    stream(detector, scores, 37)
+    expected = scores.groupby('vm_id')['score'].agg(['size', 'mean', 'var'])
+    state = detector.state.loc[expected.index]
+    np.testing.assert_allclose(state['count'], expected['size'])
+    np.testing.assert_allclose(state['mean'], expected['mean'])
+    np.testing.assert_allclose(state['m2'] / (state['count'] - 1), expected['var'])
+
+
+def test_ewma_state_matches_row_by_row_recursion(scores):
+    alpha, batch_size = 0.05, 30
+    detector = StreamingAnomalyDetector(score_column, method='ewma', alpha=alpha, k=1e9, warmup=1)
+    stream(detector, scores, batch_size)
+    for vm_id, rows in scores.groupby('vm_id')['score']:
+        values = rows.to_numpy()
+        first = batch_size // 3  # rows of this VM in the first batch
+        mean, square = values[:first].mean(), np.mean(values[:first] ** 2)
+        for value in values[first:]:
+            mean = (1 - alpha) * mean + alpha * value
+            square = (1 - alpha) * square + alpha * value ** 2
+        assert detector.state.loc[vm_id, 'ewm_mean'] == pytest.approx(mean)
+        assert detector.state.loc[vm_id, 'ewm_sq'] == pytest.approx(square)
+
+
+def test_anomalies_do_not_raise_their_own_threshold(scores):
+    detector = StreamingAnomalyDetector(score_column, k=3.0, warmup=30)
+    warm = stream(detector, scores, 60)
+    # Nothing is flagged until the VMs have `warmup` scores
+    assert not warm.iloc[:90]['is_anomaly'].any()
+    before = detector.state.copy()
+
+    burst = pd.DataFrame({'vm_id': [101] * 5, 'score': [100.0] * 5})
+    result = detector.update(burst)
+    assert result['is_anomaly'].all()
+    pd.testing.assert_frame_equal(detector.state, before)
+
+
+def test_new_vm_falls_back_to_global_threshold(scores):
+    detector = StreamingAnomalyDetector(score_column, k=3.0, warmup=30)
+    stream(detector, scores, 60)
+    result = detector.update(pd.DataFrame({'vm_id': [999, 999], 'score': [0.5, 100.0]}))
+    assert result['threshold'].notna().all()
+    assert result['is_anomaly'].tolist() == [False, True]
+
+
+def test_batch_with_only_missing_features_is_skipped():
+    rng = np.random.default_rng(0)
+    features = ['cpu', 'mem']
+    train = pd.DataFrame(rng.normal(size=(64, 2)), columns=features).assign(vm_id=1)
+    scorer = ReconstructionScorer.fit(train, features=features, epochs=1, log=lambda _: None)
+    detector = StreamingAnomalyDetector(scorer.score, warmup=1, features=features)
+
+    empty = detector.update(pd.DataFrame({'cpu': [np.nan, 1.0], 'mem': [0.5, np.nan], 'vm_id': [1, 2]}))
+    assert empty.empty and list(empty.columns) == ['vm_id', 'anomaly_score', 'threshold', 'is_anomaly']
+    assert detector.state.empty
+    # The stream carries on with the next batch
+    assert len(detector.update(train.iloc[:10])) == 10
@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from neuronet.serving.batching import MicroBatcher
+
+
+def row_sums(batches):
+    def predict(X):
+        batches.append(len(X))
+        return X.sum(axis=1)
+    return predict
+
+
+def test_batches_never_exceed_max_batch_size():
+    batches = []
+    release = threading.Event()
+
+    def predict(X):
+        release.wait(5)
+        return row_sums(batches)(X)
+
+    batcher = MicroBatcher(predict, max_batch_size=5, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(np.full((size, 2), i, dtype='float64')) for i, size in enumerate([3, 1, 3, 2, 7])]
+        release.set()
+        for i, (future, size) in enumerate(zip(futures, [3, 1, 3, 2, 7])):
+            np.testing.assert_array_equal(future.result(timeout=5), np.full(size, 2.0 * i))
+    finally:
+        batcher.close()
+    # The 7-row request runs alone, the others are packed without overflowing 5 rows
+    assert max(size for size in batches if size != 7) <= 5
+    assert sum(batches) == 16
+
+
+def test_malformed_requests_fail_alone():
+    batcher = MicroBatcher(row_sums([]), max_batch_size=8, max_wait_ms=20, n_features=2)
+    try:
+        good = batcher.submit([[1.0, 2.0]])
+        wide = batcher.submit([[1.0, 2.0, 3.0]])
+        cube = batcher.submit(np.zeros((1, 1, 2)))
+        text = batcher.submit([['a', 'b']])
+        np.testing.assert_array_equal(good.result(timeout=5), [3.0])
+        for future in [wide, cube, text]:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_width_mismatch_without_n_features():
+    batcher = MicroBatcher(row_sums([]), max_batch_size=8, max_wait_ms=50)
+    try:
+        futures = [batcher.submit([[1.0, 1.0]]), batcher.submit([[1.0, 1.0, 1.0]])]
+        np.testing.assert_array_equal(futures[0].result(timeout=5), [2.0])
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_wrong_prediction_count_fails_the_batch():
+    batcher = MicroBatcher(lambda X: X.sum(axis=1)[:-1], max_batch_size=8, max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError, match='predictions for 2 rows'):
+            batcher.predict(np.ones((2, 3)), timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_close_resolves_every_future():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda X: release.wait(5) and X.sum(axis=1), max_batch_size=2, max_wait_ms=1)
+    queued = [batcher.submit(np.ones((2, 2))) for _ in range(3)]
+    release.set()
+    batcher.close()
+    # Requests submitted before close() are still predicted, later ones fail immediately
+    for future in queued:
+        np.testing.assert_array_equal(future.result(timeout=0), [2.0, 2.0])
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.ones((1, 2))).result(timeout=0)
+
+
+def test_close_fails_requests_left_behind_the_stop_marker():
+    batcher = MicroBatcher(row_sums([]), max_batch_size=2, max_wait_ms=1)
+    # A request queued behind the stop marker, as a submit() racing close() could leave it
+    future: Future = Future()
+    batcher.requests.put((np.empty((0, 0)), None, 0.0))
+    batcher.requests.put((np.ones((1, 2)), future, 0.0))
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        future.result(timeout=0)
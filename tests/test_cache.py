@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from neuronet.pipelines import cache as cache_module
+from neuronet.pipelines.cache import ArtifactCache
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    write(str(tmp_path / 'raw' / 'k8s.csv'), 'a,b\n1,2\n')
+    write(str(tmp_path / 'raw' / 'processed' / 'k8s_processed.csv'), 'a\n1\n')
+    return str(tmp_path / 'raw')
+
+
+def test_key_depends_on_params_and_inputs(tmp_path, inputs):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    key = cache.key('step', {'a': 1, 'b': 2}, {'raw': inputs})
+    assert cache.key('step', {'b': 2, 'a': 1}, {'raw': inputs}) == key
+    assert cache.key('other', {'a': 1, 'b': 2}, {'raw': inputs}) != key
+    assert cache.key('step', {'a': 1, 'b': 3}, {'raw': inputs}) != key
+
+    # Ignored subdirectories (derived outputs) do not take part in the key
+    ignored = cache.key('step', {'a': 1, 'b': 2}, {'raw': inputs}, ignore=['processed'])
+    write(os.path.join(inputs, 'processed', 'k8s_processed.csv'), 'a\n2\n')
+    assert cache.key('step', {'a': 1, 'b': 2}, {'raw': inputs}) != key
+    assert cache.key('step', {'a': 1, 'b': 2}, {'raw': inputs}, ignore=['processed']) == ignored
+    write(os.path.join(inputs, 'k8s.csv'), 'a,b\n1,3\n')
+    assert cache.key('step', {'a': 1, 'b': 2}, {'raw': inputs}, ignore=['processed']) != ignored
+
+
+def test_code_fingerprint_invalidates_entries(tmp_path, inputs, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    key = cache.key('step', {}, {'raw': inputs})
+    monkeypatch.setattr(cache_module, 'code_fingerprint', lambda: 'edited sources')
+    assert cache.key('step', {}, {'raw': inputs}) != key
+
+
+def test_run_misses_then_restores(tmp_path, inputs):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    output = str(tmp_path / 'out' / 'result.txt')
+    runs = []
+
+    def step():
+        runs.append(1)
+        write(output, 'computed')
+
+    assert not cache.run('step', step, {'result': output}, {'a': 1}, {'raw': inputs})
+    os.remove(output)
+    assert cache.run('step', step, {'result': output}, {'a': 1}, {'raw': inputs})
+    assert len(runs) == 1
+    with open(output) as f:
+        assert f.read() == 'computed'
+    summary = cache.summary().set_index('step')
+    assert summary.loc['step', 'hits'] == 1 and summary.loc['step', 'misses'] == 1
+
+
+def test_store_replaces_entries_with_other_outputs(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    first, second = str(tmp_path / 'first.txt'), str(tmp_path / 'second.txt')
+    write(first, 'one')
+    write(second, 'two')
+    cache.store('key', 'step', {'first': first}, 1.0)
+    assert cache.lookup('key', {'first': first, 'second': second}) is None
+
+    cache.store('key', 'step', {'first': first, 'second': second}, 1.0)
+    assert cache.lookup('key', {'first': first, 'second': second}) is not None
+    assert not [name for name in os.listdir(os.path.join(cache.root, 'entries')) if name.startswith('.')]
@@ -0,0 +1,45 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.preprocessing.counters import CounterRateCalculator
+
+
+def counter_frame(times, values, entity='a'):
+    return pd.DataFrame({'entity': entity, '_time': pd.to_datetime(times, utc=True), 'energy': values})
+
+
+def test_rates_per_entity_in_time_order():
+    df = pd.concat([
+        counter_frame(['2025-01-01 00:01', '2025-01-01 00:00', '2025-01-01 00:02'], [160.0, 100.0, 280.0]),
+        counter_frame(['2025-01-01 00:00', '2025-01-01 00:01'], [0.0, 30.0], entity='b'),
+    ], ignore_index=True)
+    rates = CounterRateCalculator(['entity']).compute(df, ['energy'])
+    np.testing.assert_allclose(rates['energy_rate'].to_numpy(), [1.0, np.nan, 2.0, np.nan, 0.5])
+
+
+def test_duplicate_timestamps_are_nan_without_warnings():
+    df = counter_frame(['2025-01-01 00:00', '2025-01-01 00:01', '2025-01-01 00:01'], [0.0, 60.0, 90.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        rates = CounterRateCalculator(['entity']).compute(df, ['energy'], elapsed_col='elapsed')
+    np.testing.assert_allclose(rates['energy_rate'].to_numpy(), [np.nan, 1.0, np.nan])
+    np.testing.assert_allclose(rates['elapsed'].to_numpy(), [np.nan, 60.0, 0.0])
+
+
+def test_resets_glitches_and_gaps():
+    df = counter_frame(['2025-01-01 00:00', '2025-01-01 00:01', '2025-01-01 00:02', '2025-01-01 00:03',
+                        '2025-01-01 00:20'], [1000.0, 1060.0, 30.0, 20.0, 80.0])
+    calculator = CounterRateCalculator(['entity'], max_gap='5min', scale=60.0)
+    rates = calculator.compute(df, ['energy'])
+    # 1060 -> 30 is a reset (the new value is the delta), 30 -> 20 a glitch, the last sample follows a gap
+    np.testing.assert_allclose(rates['energy_rate'].to_numpy(), [np.nan, 60.0, 30.0, np.nan, np.nan])
+    assert calculator.resets == 1
+
+
+@pytest.mark.parametrize('suffix', ['_rate', '_w'])
+def test_empty_frame_keeps_columns(suffix):
+    rates = CounterRateCalculator(['entity']).compute(counter_frame([], []), ['energy'], suffix=suffix)
+    assert list(rates.columns) == [f'energy{suffix}'] and rates.empty
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.datasets.energy_cube import COUNTER, EnergyCube
+
+CONTAINERS = pd.DataFrame({'container_name': ['web', 'db', 'batch'], 'namespace': ['shop', 'shop', 'jobs'],
+                           'pod_name': ['web-1', 'db-1', 'job-1'], 'watts': [1.0, 2.0, 5.0]})
+PODS = pd.DataFrame({'namespace': ['shop', 'shop', 'jobs'], 'pod_name': ['web-1', 'db-1', 'job-1'],
+                     'node_name': ['node1', 'node1', 'node2']})
+
+
+@pytest.fixture(scope='module')
+def kepler():
+    times = pd.date_range('2025-08-04 00:00', periods=150, freq='1min', tz='UTC')
+    frames = [pd.DataFrame({'_time': times, **{c: row[c] for c in ['container_name', 'namespace', 'pod_name']},
+                            COUNTER: 1000.0 + row['watts'] * 60 * np.arange(len(times))})
+              for _, row in CONTAINERS.iterrows()]
+    return pd.concat(frames, ignore_index=True).sort_values('_time', kind='stable').reset_index(drop=True)
+
+
+def expected_energy(kepler, granularity, keys, start=None, stop=None):
+    """Brute force: counter delta of every sample, bucketed by the sample time."""
+    df = kepler.sort_values(['container_name', '_time']).merge(PODS, on=['namespace', 'pod_name'])
+    df['energy_joules'] = df.groupby('container_name')[COUNTER].diff()
+    df = df.dropna(subset=['energy_joules'])
+    if start is not None:
+        df = df[(df['_time'] >= pd.Timestamp(start, tz='UTC')) & (df['_time'] < pd.Timestamp(stop, tz='UTC'))]
+    df['_time'] = df['_time'].dt.floor(granularity)
+    return df.groupby(['_time'] + keys)['energy_joules'].sum().reset_index()
+
+
+def assert_energy_equal(result, expected, keys):
+    result = result.sort_values(['_time'] + keys).reset_index(drop=True)
+    expected = expected.sort_values(['_time'] + keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result[['_time'] + keys + ['energy_joules']], expected, check_dtype=False)
+
+
+@pytest.fixture(scope='module')
+def cube(kepler):
+    cube = EnergyCube(['1min', '1h'])
+    cube.update(kepler, PODS)
+    return cube
+
+
+@pytest.mark.parametrize('by, keys, granularity', [
+    ('cluster', [], '1h'), ('namespace', ['namespace'], '1h'), ('node', ['node_name'], '30min'),
+    ('container', ['node_name', 'namespace', 'pod_name', 'container_name'], '2h')])
+def test_query_matches_brute_force(cube, kepler, by, keys, granularity):
+    result = cube.query(by, granularity)
+    assert_energy_equal(result, expected_energy(kepler, granularity, keys), keys)
+    np.testing.assert_allclose(result['power_watts'], result['energy_joules'] / pd.Timedelta(granularity).total_seconds())
+
+
+def test_filters(cube, kepler):
+    result = cube.query('pod', '1h', node_name='node1')
+    assert set(result['pod_name']) == {'web-1', 'db-1'}
+    assert cube.query('namespace', '1h', namespace=['missing']).empty
+
+
+def test_incremental_updates_match_one_update(cube, kepler):
+    incremental = EnergyCube(['1min', '1h'])
+    # Overlapping windows: samples already counted are skipped
+    for start, stop in [(0, 200), (150, 320), (300, len(kepler))]:
+        incremental.update(kepler.iloc[start:stop], PODS)
+    for key, table in cube.tables.items():
+        pd.testing.assert_frame_equal(incremental.tables[key], table, check_dtype=False)
+
+
+def test_bounds_read_an_aligned_granularity(cube, kepler):
+    # 00:30 is not a 1h boundary: the 1min table is read and only [00:30, 01:30) is counted
+    result = cube.query('namespace', '1h', '2025-08-04T00:30:00Z', '2025-08-04T01:30:00Z')
+    expected = expected_energy(kepler, '1h', ['namespace'], '2025-08-04 00:30', '2025-08-04 01:30')
+    assert_energy_equal(result, expected, ['namespace'])
+    with pytest.raises(ValueError, match='aligned'):
+        cube.query('namespace', '1h', '2025-08-04T00:30:30Z', '2025-08-04T01:30:00Z')
+
+
+def test_save_load_round_trip(cube, tmp_path):
+    path = str(tmp_path / 'cube.npz')
+    cube.save(path)
+    loaded = EnergyCube.load(path)
+    pd.testing.assert_frame_equal(loaded.query('container', '1h'), cube.query('container', '1h'))
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from neuronet.preprocessing.entities import EntityDictionary, entities_path
+from neuronet.preprocessing.k8s import K8SProcessor
+from neuronet.preprocessing.proxmox import ProxmoxDataProcessor
+
+
+def test_encode_decode_round_trip(tmp_path):
+    names = pd.DataFrame({'vm_name': ['web', 'db', None, 'web'], 'namespace': ['a', 'a', 'b', None],
+                          'value': [1.0, 2.0, 3.0, 4.0]})
+    entities = EntityDictionary(['db'])
+    encoded = entities.encode(names.copy())
+    # Columns are encoded in ENTITY_COLUMNS order: namespace before vm_name, known names keep their id
+    assert entities.names == ['db', 'a', 'b', 'web']
+    assert encoded['vm_name'].tolist() == [3, 0, pd.NA, 3]
+    # Encoding twice keeps the ids
+    pd.testing.assert_frame_equal(entities.encode(encoded.copy()), encoded)
+
+    path = str(tmp_path / 'entities.json')
+    entities.save(path)
+    decoded = EntityDictionary.load(path).decode(encoded.copy())
+    pd.testing.assert_frame_equal(decoded.fillna(np.nan), names.fillna(np.nan))
+    np.testing.assert_array_equal(entities.ids_matching('^w'), [3])
+
+
+def test_load_for_prefers_the_file_dictionary(tmp_path):
+    csv_path = str(tmp_path / 'k8s_processed.csv')
+    assert entities_path(csv_path) == str(tmp_path / 'k8s_processed.entities.json')
+    assert EntityDictionary.load_for(csv_path) is None
+
+    EntityDictionary(['shared']).save(str(tmp_path / 'entities.json'))
+    assert EntityDictionary.load_for(csv_path).names == ['shared']
+    EntityDictionary(['own']).save(entities_path(csv_path))
+    assert EntityDictionary.load_for(csv_path).names == ['own']
+
+
+def test_processors_save_one_dictionary_per_output(telemetry_copy, tmp_path):
+    plain_dir = str(tmp_path / 'plain')
+    shutil.copytree(telemetry_copy, plain_dir)
+    # Separate dictionaries, as when the processors run in different pipeline steps
+    for processor in [K8SProcessor, ProxmoxDataProcessor]:
+        processor(telemetry_copy, entities=EntityDictionary()).run()
+        processor(plain_dir).run()
+
+    for name in ['k8s_processed.csv', 'proxmox_processed.csv']:
+        encoded_path = os.path.join(telemetry_copy, 'processed', name)
+        with open(entities_path(encoded_path)) as f:
+            assert json.load(f)['names']
+        decoded = EntityDictionary.load_for(encoded_path).decode(pd.read_csv(encoded_path))
+        expected = pd.read_csv(os.path.join(plain_dir, 'processed', name))
+        sort = list(expected.columns)
+        pd.testing.assert_frame_equal(decoded.sort_values(sort).reset_index(drop=True),
+                                      expected.sort_values(sort).reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from neuronet.models.evaluation import StreamingEvaluator
+
+
+def write_artifacts(tmp_path, n_x: int, n_y: int, n_meta: int = 0):
+    rng = np.random.default_rng(0)
+    paths = {'x': str(tmp_path / 'x_test.csv'), 'y': str(tmp_path / 'y_test.csv'), 'meta': str(tmp_path / 'meta.csv')}
+    pd.DataFrame({'a': rng.normal(size=n_x), 'b': rng.normal(size=n_x)}).to_csv(paths['x'], index=False)
+    pd.DataFrame({'target': rng.normal(size=n_y)}).to_csv(paths['y'], index=False)
+    times = pd.date_range('2025-08-04 06:00', periods=n_meta, freq='1min', tz='UTC')
+    pd.DataFrame({'vm_id': np.arange(n_meta) % 3, '_time': times}).to_csv(paths['meta'], index=False)
+    return paths
+
+
+def predict(X: pd.DataFrame) -> np.ndarray:
+    return X['a'].to_numpy() - X['b'].to_numpy()
+
+
+def test_streaming_metrics_match_full_batch(tmp_path):
+    paths = write_artifacts(tmp_path, 250, 250, 250)
+    evaluator = StreamingEvaluator(predict, chunk_size=60, entity_cols=['vm_id'], time_bucket='1h')
+    metrics = evaluator.evaluate(paths['x'], paths['y'], paths['meta'])
+
+    X, y = pd.read_csv(paths['x']), pd.read_csv(paths['y'])['target']
+    assert evaluator.chunks == 5 and metrics['n'] == 250
+    assert metrics['mae'] == pytest.approx(mean_absolute_error(y, predict(X)))
+    assert metrics['mse'] == pytest.approx(mean_squared_error(y, predict(X)))
+    assert metrics['r2'] == pytest.approx(r2_score(y, predict(X)))
+    per_entity = evaluator.per_entity.result()
+    assert sorted(per_entity['vm_id']) == [0, 1, 2] and per_entity['n'].sum() == 250
+    assert len(evaluator.per_time.result()) == 5  # 250 minutes from 06:00
+
+
+@pytest.mark.parametrize('n_x, n_y, n_meta', [(100, 150, 100), (150, 100, 150), (100, 100, 250), (100, 90, 100)])
+def test_mismatched_artifacts_raise(tmp_path, n_x, n_y, n_meta):
+    paths = write_artifacts(tmp_path, n_x, n_y, n_meta)
+    evaluator = StreamingEvaluator(predict, chunk_size=100, entity_cols=['vm_id'])
+    with pytest.raises(ValueError, match='different numbers of rows'):
+        evaluator.evaluate(paths['x'], paths['y'], paths['meta'])
@@ -0,0 +1,74 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from neuronet.models.forest import NumpyForest, export_forest
+from neuronet.serving.predictors import RandomForestPredictor
+
+
+def best_time(fn, X, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(6000, 6)), columns=[f'f{i}' for i in range(6)])
+    y = 3 * X['f0'] + np.sin(3 * X['f1']) + rng.normal(size=len(X))
+    X.iloc[::50, 2] = np.nan  # NaN splits go to the side recorded by scikit-learn
+    return X.iloc[:4000], y.iloc[:4000], X.iloc[4000:]
+
+
+@pytest.fixture(scope='module')
+def model(data):
+    X_train, y_train, _ = data
+    return RandomForestRegressor(n_estimators=30, random_state=0, n_jobs=1).fit(X_train, y_train)
+
+
+@pytest.mark.parametrize('chunk_size', [7, 16384])
+def test_export_matches_model_predict_exactly(tmp_path, model, data, chunk_size):
+    X_test = data[2]
+    path = str(tmp_path / 'forest.npz')
+    export_forest(model, path)
+    forest = NumpyForest(path, chunk_size=chunk_size)
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+    np.testing.assert_array_equal(forest.predict(X_test.iloc[:1]), model.predict(X_test.iloc[:1]))
+    assert forest.predict(X_test.iloc[:0]).shape == (0,)
+
+
+def test_large_batches_are_routed_to_the_model(model, data):
+    X_test = data[2]
+    forest = NumpyForest(model=model, model_rows=100)
+    calls = []
+
+    class Spy:
+        def predict(self, X):
+            calls.append(len(X))
+            return model.predict(X)
+
+    forest.model = Spy()
+    np.testing.assert_array_equal(forest.predict(X_test.iloc[:99]), model.predict(X_test.iloc[:99]))
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+    assert calls == [len(X_test)]
+
+
+@pytest.mark.parametrize('rows', [1, 64, 2000])
+def test_batch_inference_at_least_as_fast_as_sklearn(tmp_path, model, data, rows):
+    path = str(tmp_path / 'model.joblib')
+    joblib.dump(model, path)
+    predictor = RandomForestPredictor(path)
+    X = data[2].iloc[:rows]
+    np.testing.assert_array_equal(predictor.predict(X.to_numpy()), model.predict(X))
+    sklearn_s = best_time(model.predict, X)
+    predictor_s = best_time(predictor.predict, X.to_numpy())
+    # Some slack for timer noise on shared CI machines
+    assert predictor_s <= 1.25 * sklearn_s + 0.002, (predictor_s, sklearn_s)
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.datasets.lazy import LazyDataset, index_path
+from neuronet.datasets.store import TimeSeriesStore
+from neuronet.preprocessing.entities import EntityDictionary
+from neuronet.preprocessing.proxmox import ProxmoxDataProcessor
+
+
+def vm_frame(start='2025-08-04', periods=600):
+    times = pd.date_range(start, periods=periods, freq='1min', tz='UTC')
+    return pd.DataFrame({'_time': np.repeat(times, 3), 'vm_id': np.tile([100, 115, 120], periods),
+                         'vm_name': np.tile(['web', 'db', 'k8s'], periods),
+                         'cpuload': np.arange(3 * periods, dtype='float64')})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / 'vm_power_dataset.csv')
+    vm_frame().to_csv(path, index=False)
+    return path
+
+
+def test_time_and_entity_pushdown(csv_path):
+    df = pd.read_csv(csv_path, parse_dates=['_time'])
+    dataset = LazyDataset.csv(csv_path, group_rows=100).between('2025-08-04T02:00:00Z', '2025-08-04T03:00:00Z')
+    # Filter values match whatever their type: 115, '115' and 115.0 are the same vm_id
+    for vm_id in [115, '115', 115.0]:
+        result = dataset.where(vm_id=vm_id).to_pandas()
+        expected = df[(df['_time'] >= '2025-08-04 02:00') & (df['_time'] < '2025-08-04 03:00') & (df['vm_id'] == 115)]
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+    assert os.path.exists(index_path(csv_path))
+
+
+def test_scan_reads_only_matching_groups(csv_path):
+    dataset = LazyDataset.csv(csv_path, group_rows=100).between('2025-08-04T02:00:00Z', '2025-08-04T03:00:00Z')
+    dataset.to_pandas()
+    scan = dataset.last_scan
+    assert scan['groups'] == 18 and scan['groups_read'] <= 3 and scan['rows_scanned'] <= 300
+    assert scan['rows'] == 180
+
+
+def test_select_and_head(csv_path):
+    dataset = LazyDataset.csv(csv_path).where(vm_name=['web', 'db'], vm_id=[100, 120]).select('_time', 'cpuload')
+    result = dataset.head(5).to_pandas()
+    assert list(result.columns) == ['_time', 'cpuload'] and len(result) == 5
+    # Filters on several columns must all match: only web (vm 100) remains
+    np.testing.assert_array_equal(result['cpuload'], np.arange(0, 15, 3))
+    np.testing.assert_array_equal(dataset.to_numpy()[:2, 1], [0.0, 3.0])
+    assert dataset.where(vm_id=[120, 115]).to_pandas().empty
+    with pytest.raises(KeyError):
+        dataset.select('vm_id')
+    with pytest.raises(KeyError):
+        dataset.where(unknown=1)
+
+
+def test_stale_index_is_rebuilt(csv_path):
+    dataset = LazyDataset.csv(csv_path, group_rows=100).where(vm_id=100)
+    assert len(dataset.to_pandas()) == 600
+    vm_frame('2025-08-05', 10).to_csv(csv_path, mode='a', header=False, index=False)
+    assert len(dataset.to_pandas()) == 610
+
+
+def test_encoded_csv_filters_by_name(telemetry_copy):
+    ProxmoxDataProcessor(telemetry_copy, entities=EntityDictionary()).run()
+    path = os.path.join(telemetry_copy, 'processed', 'proxmox_processed.csv')
+    entities = EntityDictionary.load_for(path)
+    plain = entities.decode(pd.read_csv(path))
+    name = plain['vm_name'].iloc[0]
+
+    result = LazyDataset.csv(path).where(vm_name=name).to_pandas()
+    expected = plain[plain['vm_name'] == name].reset_index(drop=True)
+    assert len(result) == len(expected) > 0
+    assert (result['vm_name'] == name).all()
+    np.testing.assert_array_equal(result['vm_id'], expected['vm_id'])
+
+
+def test_store_source(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / 'store'))
+    store.write('proxmox', vm_frame())
+    dataset = LazyDataset.store(store.root, 'proxmox', resolution='1h').where(vm_id=['115']).select('_time', 'cpuload')
+    result = dataset.to_pandas()
+    assert len(result) == 10 and dataset.last_scan['groups'] == 1
+    expected = vm_frame().query('vm_id == 115').groupby(pd.Grouper(key='_time', freq='1h'))['cpuload'].mean()
+    np.testing.assert_allclose(result['cpuload'], expected.to_numpy())
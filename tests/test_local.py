@@ -0,0 +1,29 @@
+import json
+import os
+
+from click.testing import CliRunner
+
+from neuronet.pipelines.local import main
+
+PIPELINES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'experiment', 'UC1')
+
+
+def cache_events(cache_dir):
+    with open(os.path.join(cache_dir, 'events.jsonl')) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_standin_runs_hit_the_cache(telemetry_dir, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    for run in ['first', 'second']:
+        result = CliRunner().invoke(main, ['--pipeline', 'energy', '--pipelines-dir', PIPELINES_DIR,
+                                           '--workdir', str(tmp_path / run), '--standin-data', telemetry_dir,
+                                           '--cache-dir', cache_dir, '--start', '2025-08-04T06:00:00Z',
+                                           '--stop', '2025-08-04T06:20:00Z'])
+        assert result.exit_code == 0, result.output
+
+    # The stand-in listens on another port in the second run, get_data and preprocess_data still hit
+    events = cache_events(cache_dir)
+    steps = {'get_data/kepler', 'get_data/k8s', 'preprocess_data/energy'}
+    assert {event['step'] for event in events[:3]} == steps and not any(event['hit'] for event in events[:3])
+    assert {event['step'] for event in events[3:]} == steps and all(event['hit'] for event in events[3:])
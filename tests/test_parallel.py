@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.datasets.parallel import ShardedDatasetBuilder, shard_ids
+from neuronet.datasets.vm_power_dataset import VmPowerDatasetBuilder
+from neuronet.preprocessing.proxmox import ProxmoxDataProcessor
+from neuronet.preprocessing.scaphandre import ScaphandreProcessor
+
+
+@pytest.fixture(scope='module')
+def vm_inputs(telemetry_copy):
+    ProxmoxDataProcessor(telemetry_copy).run()
+    ScaphandreProcessor(telemetry_copy).run()
+    processed = os.path.join(telemetry_copy, 'processed')
+    return (pd.read_csv(os.path.join(processed, 'proxmox_processed.csv')),
+            pd.read_csv(os.path.join(processed, 'vm_scaphandre_processed.csv')))
+
+
+def test_shard_ids_ignore_key_dtype():
+    ints = pd.DataFrame({'vm_id': [100, 101, 102]})
+    floats = pd.DataFrame({'vm_id': [100.0, 101.0, 102.0]})
+    text = pd.DataFrame({'vm_id': ['100', '101', '102']})
+    expected = shard_ids(ints, ['vm_id'], 4)
+    np.testing.assert_array_equal(shard_ids(floats, ['vm_id'], 4), expected)
+    np.testing.assert_array_equal(shard_ids(text, ['vm_id'], 4), expected)
+
+
+def test_sharded_build_equals_build(vm_inputs):
+    proxmox_df, scaphandre_vm_df = vm_inputs
+    expected = VmPowerDatasetBuilder(proxmox_df, scaphandre_vm_df).build()
+    result = ShardedDatasetBuilder(VmPowerDatasetBuilder, proxmox_df, scaphandre_vm_df, n_shards=4,
+                                   max_workers=2).build()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_sharded_build_with_float_keys(vm_inputs):
+    proxmox_df, scaphandre_vm_df = vm_inputs
+    # A single missing vm_id turns the Scaphandre key column into float64
+    scaphandre_vm_df = scaphandre_vm_df.copy()
+    scaphandre_vm_df.loc[scaphandre_vm_df.index[0], 'vm_id'] = np.nan
+    assert scaphandre_vm_df['vm_id'].dtype == 'float64'
+    expected = VmPowerDatasetBuilder(proxmox_df, scaphandre_vm_df).build()
+    result = ShardedDatasetBuilder(VmPowerDatasetBuilder, proxmox_df, scaphandre_vm_df, n_shards=4,
+                                   max_workers=2).build()
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from neuronet.datasets.store import TimeSeriesStore
+
+
+def proxmox_frame(start='2025-08-01', days=3, offset=0.0):
+    times = pd.date_range(start, periods=days * 24 * 60, freq='1min', tz='UTC')
+    frames = []
+    for vm_id, name in [(101, 'neuronet-web'), (102, 'neuronet-k8s-1')]:
+        frames.append(pd.DataFrame({'_time': times, 'vm_id': vm_id, 'vm_name': name,
+                                    'cpuload': offset + vm_id + np.sin(np.arange(len(times)) / 30),
+                                    'uptime': np.arange(len(times)) * 60.0}))
+    return pd.concat(frames, ignore_index=True).sort_values('_time', kind='stable').reset_index(drop=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / 'store'), retention={'raw': None})
+    store.write('proxmox', proxmox_frame())
+    return store
+
+
+def test_raw_round_trip_and_filters(store):
+    expected = proxmox_frame()
+    pd.testing.assert_frame_equal(store.read('proxmox'), expected, check_dtype=False)
+
+    web = store.read('proxmox', '2025-08-02', '2025-08-02T06:00:00Z', vm_name='neuronet-web', columns=['cpuload'])
+    assert list(web.columns) == ['_time', 'cpuload', 'vm_name'] and len(web) == 360
+    assert (web['vm_name'] == 'neuronet-web').all()
+    # A reopened store reads the same partitions and names
+    reopened = TimeSeriesStore(store.root)
+    pd.testing.assert_frame_equal(reopened.read('proxmox', resolution='1h'), store.read('proxmox', resolution='1h'))
+
+
+@pytest.mark.parametrize('resolution, tier', [(None, 'raw'), ('30s', 'raw'), ('1min', '1min'), ('30min', '1min'),
+                                              ('1h', '1h'), ('1D', '1h')])
+def test_tier_for(store, resolution, tier):
+    assert store.tier_for(resolution) == tier
+
+
+def test_downsampled_tiers_match_pandas(store):
+    raw = proxmox_frame()
+    hourly = store.read('proxmox', resolution='1h')
+    grouped = raw.groupby([raw['_time'].dt.floor('1h'), 'vm_id', 'vm_name'])
+    expected = grouped.agg(cpuload=('cpuload', 'mean'), uptime=('uptime', 'last')).reset_index()
+    key = ['_time', 'vm_id']
+    pd.testing.assert_frame_equal(hourly.sort_values(key).reset_index(drop=True)[expected.columns],
+                                  expected.sort_values(key).reset_index(drop=True), check_dtype=False)
+
+
+def test_rewrites_replace_rows_and_reaggregate(store):
+    update = proxmox_frame(offset=1000.0)
+    update = update[(update['_time'] >= '2025-08-02 10:30') & (update['_time'] < '2025-08-02 11:30')]
+    store.write('proxmox', update)
+    raw = store.read('proxmox', '2025-08-02 10:00', '2025-08-02 12:00')
+    assert len(raw) == 2 * 120
+    hourly = store.read('proxmox', '2025-08-02 10:00', '2025-08-02 12:00', resolution='1h', vm_name='neuronet-web')
+    expected = raw[raw['vm_name'] == 'neuronet-web'].groupby(raw['_time'].dt.floor('1h'))['cpuload'].mean()
+    np.testing.assert_allclose(hourly['cpuload'], expected.to_numpy())
+    assert hourly['cpuload'].gt(500).all()  # half of each hour was rewritten with the offset
+
+
+def test_retention_drops_whole_partitions(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / 'store'), retention={'raw': '1D', '1min': '2D', '1h': None})
+    store.write('proxmox', proxmox_frame())
+    summary = store.summary().set_index('tier')
+    # Raw partitions span a day: only the ones overlapping the last day (from 08-02 23:59) remain
+    assert summary.loc['raw', 'first'] == pd.Timestamp('2025-08-02', tz='UTC')
+    assert summary.loc['1min', 'first'] == pd.Timestamp('2025-08-01', tz='UTC')
+    assert summary.loc['1h', 'rows'] == 2 * 72
+    assert len(os.listdir(os.path.join(store.root, 'raw', 'proxmox'))) == 2
+
+    # Rows older than the raw retention can no longer be downsampled and are dropped
+    assert store.write('proxmox', proxmox_frame(days=1)) == 0